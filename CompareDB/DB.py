@@ -1,62 +1,302 @@
 #!/usr/bin/python3
 
 import ibm_db
-import ibm_db_dbi
 import sys
+import io
+import os
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
 
 from DBTable import *
 from DBColumn import *
 from DBIndex import *
 from DBConstraint import *
+from DBHash import *
+from DBSnapshot import *
+from DBStatement import *
+import DBProfile
 #from DBView import *
 
 import argparse
+import atexit
+import json
+import resource
+
+# threads rendering and writing files in dump()
+DUMP_WORKERS = 8
+
+# longest list of tables read through an in-list, a longer one makes a statement beyond the
+# length and parameter marker limits of Db2 and is slower than a full read anyway
+MAX_TABLE_LIST = 1000
+
+# above this many changed tables a full read is cheaper than a long in-list
+SNAPSHOT_MAX_CHANGED = MAX_TABLE_LIST
+
+# catalog statistics read with stats=True, they are kept apart from the definitions and never compared
+TABLE_STATS = ("card", "npages", "fpages", "overflow", "avgrowsize", "stats_time", "pctpagessaved",
+               "(select pagesize from syscat.tablespaces s where s.tbspaceid = t.tbspaceid) as pagesize",
+               "timestampdiff(16, char(current timestamp - stats_time)) as stats_days",
+               "case when statistics_profile is null then 0 else 1 end as profile")
+INDEX_STATS = ("nleaf", "nlevels", "lastused", "stats_time", "pctpagessaved", "fullkeycard", "avgleafkeysize",
+               "avgnleafkeysize", "num_empty_leafs", "numrids_deleted", "pctfree", "clusterratio", "clusterfactor",
+               "(select pagesize from syscat.tablespaces s where s.tbspaceid = i.tbspaceid) as pagesize")
 
 
 class DB:
-    def __init__(self, hostname, dbname, port, username, password, schemaname=None, tablename=None):
+    def __init__(self, hostname, dbname, port, username, password, schemaname=None, tablename=None, conn=None,
+                 parallel=False, cachedir=None, tables=None, stats=False, fetchbuffer=None):
         self._tables_ = list()
         self._tabledict_ = dict()
         self._schemaname_ = schemaname
         self._tablename_ = tablename
+        self._only_ = None
+        self._tablelist_ = None if tables is None else sorted(set(tables))
         self._views_ = list() 
         self._triggers_ = list()
-       
-        cfg = (dbname, hostname, port, username, password)
-        ibm_db_conn = ibm_db.connect("DATABASE=%s;HOSTNAME=%s;PORT=%s;PROTOCOL=TCPIP;UID=%s;PWD=%s" % cfg, "", "")
-        conn = ibm_db_dbi.Connection(ibm_db_conn)
-        c1 = conn.cursor()
-        self._read_tables_(c1)
-#        self._read_views_(c1)
-        self._read_indexes_(c1)
-        self._read_constraints_(c1)
-#        self._read_triggers_(c1)
-
-    def _read_triggers_(self, c1):
-        pass
+        self._cfg_ = (dbname, hostname, port, username, password)
+        self._fetchbuffer_ = fetchbuffer
+
+        # conn is an already open ibm_db connection, reuse it if the caller has one, a connection
+        # opened here is closed again when the catalog has been read
+        # tables is a list of (schema, name) pairs, all of them are read in one batch
+        empty = self._tablelist_ is not None and len(self._tablelist_) == 0
+        own = conn is None and not empty
+        if own:
+            conn = self._connect_()
+        elif conn is not None and fetchbuffer is not None:
+            set_fetch_buffer(conn, fetchbuffer)
+        try:
+            if empty:
+                pass
+            elif cachedir is None:
+                self._read_(conn, parallel)
+            else:
+                self._read_cached_(conn, parallel, cachedir)
+            if stats and len(self._tables_) > 0:
+                self._read_stats_(conn)
+        finally:
+            if own:
+                forget(conn)
+                ibm_db.close(conn)
+        self._build_fk_index_()
+
+    def _read_cached_(self, conn, parallel, cachedir):
+        # with a cache only tables whose catalog stamp moved since the snapshot are read
+        dbname, hostname, port = self._cfg_[:3]
+        snapshot = DBSnapshot(cachedir, dbname, hostname, port, self._schemaname_, self._tablename_,
+                              self._tablelist_)
+        stamps = self._read_stamps_(conn)
+        if snapshot.load():
+            changed = snapshot.get_changed(stamps)
+            if len(changed) <= SNAPSHOT_MAX_CHANGED:
+                self._only_ = changed
+
+        if self._only_ is None or len(self._only_) > 0:
+            self._read_(conn, parallel)
+
+        if self._only_ is not None:
+            self._merge_snapshot_(snapshot.get_tables(), stamps)
+            self._only_ = None
+        snapshot.save(stamps, self._tables_)
+
+    def _read_(self, conn, parallel):
+        # parallel runs each catalog query on a separate connection and merges the result
+        if parallel:
+            indexes, constraints = self._read_parallel_(conn)
+        else:
+            self._read_tables_(conn)
+#            self._read_views_(conn)
+            indexes = self._read_indexes_(conn)
+            constraints = self._read_constraints_(conn)
+#            self._read_triggers_(conn)
+        self._attach_(indexes, constraints)
+
+    def _build_fk_index_(self):
+        # forward and reverse foreign key adjacency, keyed on (schema, name)
+        self._parents_ = dict()
+        self._children_ = dict()
+        for t in self._tables_:
+            key = t.get_key()
+            for c in t._constraints_:
+                if c._constraintype_ != "F":
+                    continue
+                ref = (c._reftabschema_, c._reftabname_)
+                self._parents_.setdefault(key, []).append(ref)
+                children = self._children_.setdefault(ref, [])
+                if key not in children:
+                    children.append(key)
+
+    def _read_stamps_(self, conn):
+        sql = f"""select rtrim(t.tabschema), rtrim(t.tabname), t.alter_time
+                 , (select max(i.create_time) from syscat.indexes i
+                     where (i.tabschema, i.tabname) = (t.tabschema, t.tabname))
+                 , (select count(*) from syscat.indexes i
+                     where (i.tabschema, i.tabname) = (t.tabschema, t.tabname))
+                 , (select count(*) from syscat.tabconst c
+                     where (c.tabschema, c.tabname) = (t.tabschema, t.tabname))
+                from syscat.tables t
+                where t.type = 'T'"""
+        params = []
+        sql += "\n and " + self._filter_("t.tabschema", "t.tabname", params)
+
+        stamps = dict()
+        for row in rows(conn, sql, params):
+            stamps[row[0], row[1]] = tuple(str(x) for x in row[2:])
+        return stamps
+
+    def _merge_snapshot_(self, cached, stamps):
+        # tables that were re-read replace their snapshot version, dropped tables disappear
+        for t in cached:
+            key = t.get_key()
+            if key in stamps and key not in self._tabledict_:
+                t.set_db(self)
+                self._tabledict_[key] = t
+
+        self._tables_ = [self._tabledict_[k] for k in sorted(self._tabledict_)]
+
+    def _read_stats_(self, conn):
+        # always read fresh, a snapshot only saves the definitions
+        params = []
+        sql = f"""select rtrim(t.tabschema), rtrim(t.tabname), {", ".join(TABLE_STATS)}
+                from syscat.tables t
+                where t.type = 'T'"""
+        sql += "\n and " + self._filter_("t.tabschema", "t.tabname", params)
+        names = [x.split()[-1] for x in TABLE_STATS]
+        for row in rows(conn, sql, params):
+            t = self._tabledict_.get((row[0], row[1]))
+            if t is not None:
+                t.set_stats(dict(zip(names, row[2:])))
 
-    def _read_views_(self, c1):
-        sql = f"""select viewschema, viewname, text 
-                  from syscat.views"""          
+        params = []
+        sql = f"""select rtrim(i.indschema), rtrim(i.indname), rtrim(i.tabschema), rtrim(i.tabname)
+                     , {", ".join("i." + x if x.isidentifier() else x for x in INDEX_STATS)}
+                from syscat.indexes i
+                join syscat.tables t
+                    using (tabschema, tabname)
+                where t.type = 'T'"""
+        sql += "\n and " + self._filter_("t.tabschema", "t.tabname", params)
+        names = [x.split()[-1] for x in INDEX_STATS]
+        indexes = {i.get_key(): i for t in self._tables_ for i in t._indexes_}
+        for row in rows(conn, sql, params):
+            i = indexes.get((row[0], row[1]))
+            if i is not None:
+                i.set_stats(dict(zip(names, row[4:])))
+
+        # column cardinalities and whether distribution statistics exist, kept with the table
+        params = []
+        sql = """select rtrim(c.tabschema), rtrim(c.tabname), rtrim(c.colname), c.colcard
+                     , case when exists (select 1 from syscat.coldist d
+                                          where (d.tabschema, d.tabname, d.colname)
+                                              = (c.tabschema, c.tabname, c.colname)
+                                            and d.type in ('F', 'Q') and d.colvalue is not null)
+                            then 1 else 0 end
+                from syscat.columns c
+                join syscat.tables t
+                    using (tabschema, tabname)
+                where t.type = 'T'"""
+        sql += "\n and " + self._filter_("t.tabschema", "t.tabname", params)
+        for row in rows(conn, sql, params):
+            t = self._tabledict_.get((row[0], row[1]))
+            if t is not None and t.get_stats() is not None:
+                t.get_stats().setdefault("columns", dict())[row[2]] = (row[3], row[4])
+
+        # rows changed since the last runstats, the monitor only counts while the database is
+        # active and needs a privilege the catalog does not
+        params = []
+        sql = """select rtrim(tabschema), rtrim(tabname), sum(stats_rows_modified)
+                from table(mon_get_table(cast(null as varchar(128)), cast(null as varchar(128)), -2)) m
+                where tab_type = 'USER_TABLE'"""
+        sql += "\n and " + self._filter_("tabschema", "tabname", params)
+        sql += "\n group by tabschema, tabname"
+        try:
+            for row in rows(conn, sql, params):
+                t = self._tabledict_.get((row[0], row[1]))
+                if t is not None and t.get_stats() is not None:
+                    t.get_stats()["modified"] = row[2]
+        except Exception as e:
+            print(f"{self._cfg_[0]}: no modification counters from mon_get_table: {e}", file=sys.stderr)
+
+    def _connect_(self):
+        conn = ibm_db.connect("DATABASE=%s;HOSTNAME=%s;PORT=%s;PROTOCOL=TCPIP;UID=%s;PWD=%s" % self._cfg_, "", "")
+        if self._fetchbuffer_ is not None:
+            set_fetch_buffer(conn, self._fetchbuffer_)
+        return conn
+
+    def _read_parallel_(self, conn):
+        # Every catalog query runs on a connection of its own. Only _read_tables_ touches
+        # self, the other readers return detached objects that _attach_ merges afterwards.
+        def run(reader, c):
+            own = c is None
+            if own:
+                c = self._connect_()
+            try:
+                return reader(c)
+            finally:
+                if own:
+                    forget(c)
+                    ibm_db.close(c)
+
+        readers = [self._read_tables_, self._read_indexes_, self._read_candidate_keys_,
+                   self._read_foreign_keys_, self._read_check_constraints_]
+        conns = [conn] + [None] * (len(readers) - 1)
+        with ThreadPoolExecutor(max_workers=len(readers)) as executor:
+            futures = [executor.submit(run, r, c) for r, c in zip(readers, conns)]
+            _, indexes, keys, foreign_keys, checks = [f.result() for f in futures]
+
+        return indexes, keys + foreign_keys + checks
+
+    def _attach_(self, indexes, constraints):
+        # attach in query order so the result is the same as for a serial read
+        for i in indexes:
+            self.get_table(i._tabschema_, i._tabname_).add_index(i)
+        for c in constraints:
+            self.get_table(c._tabschema_, c._tabname_).add_constraint(c)
+
+    def _filter_(self, schemacol, tablecol, params):
+        # restrict a catalog query to the tables this instance covers, the names go into params
+        # so the statement text only depends on which filters are in use
         if self._schemaname_ is None:
-            sql += f"\n where viewschema in (select schemaname from nya.validation_schemas)"
+            sql = f"{schemacol} in (select schemaname from nya.validation_schemas)"
         else:
-            sql += f"\n where viewschema = {self._schemaname_}"
+            sql = f"{schemacol} = ?"
+            params.append(self._schemaname_)
 
         if self._tablename_ is not None:
-            sql += f"\n and viewname = '{self._tablename_}'"
+            sql += f"\n and {tablecol} = ?"
+            params.append(self._tablename_)
+
+        for tablelist in (self._tablelist_, self._only_):
+            if tablelist is not None:
+                # pad to a power of two with the last pair, a handful of statements cover all list lengths
+                n = 1
+                while n < len(tablelist):
+                    n *= 2
+                for i in range(n):
+                    params.extend(tablelist[min(i, len(tablelist) - 1)])
+                markers = ", ".join(["(cast(? as varchar(128)), cast(? as varchar(128)))"] * n)
+                sql += f"\n and ({schemacol}, {tablecol}) in (values {markers})"
+
+        return sql
+
+    def _read_triggers_(self, conn):
+        pass
+
+    def _read_views_(self, conn):
+        sql = f"""select viewschema, viewname, text 
+                  from syscat.views"""          
+        params = []
+        sql += "\n where " + self._filter_("viewschema", "viewname", params)
 
         sql += f"\norder by viewschema, viewname"
 
 
 
-        c1.execute(sql)
-        for row in c1.fetchall():
+        for row in rows(conn, sql, params):
             tabschema, tabname, text = row
             v = DBView(tabschema, tabname, text)
             self._views_.append(v)
 
-    def _read_tables_(self, c1):
+    def _read_tables_(self, conn):
         # FIXME: read all table types
         sql = f"""select rtrim(t.tabschema) tabschema, rtrim(t.tabname) tabname, rtrim(c.colname) colname
                  , colno, rtrim(c.typename) typename
@@ -76,19 +316,13 @@ class DB:
                 join syscat.tables t
                     using (tabschema, tabname)
                 where type = 'T'"""
-        if self._schemaname_ is None:
-            sql += f"\n and t.tabschema in (select schemaname from nya.validation_schemas)"
-        else:
-            sql += f"\n and t.tabschema = '{self._schemaname_}'"
-
-        if self._tablename_ is not None:
-            sql += f"\n and t.tabname = '{self._tablename_}'"
+        params = []
+        sql += "\n and " + self._filter_("t.tabschema", "t.tabname", params)
 
         sql += " order by t.tabschema, t.tabname, c.colno"
 
-        c1.execute(sql)
         t = None
-        for row in c1.fetchall():
+        for row in rows(conn, sql, params):
             tabschema, tabname, colname, colno, typename, length, scale, nulls, bit_data, identity, \
                 generated, text, tbspace, index_tbspace, long_tbspace, append_mode, default, compression, \
                 rowcompmode, tableorg, table_comment, column_comment, inline_length = row
@@ -113,7 +347,7 @@ class DB:
                 self._tabledict_[t._tabschema_, t._tabname_] = t
                 self._tables_.append(t)
 
-    def _read_indexes_(self, c1):
+    def _read_indexes_(self, conn):
         sql = f"""select rtrim(i.tabschema), rtrim(i.tabname), rtrim(i.indschema), rtrim(i.indname)
                 , i.uniquerule, i.indextype, i.reverse_scans, i.pagesplit, i.collectstatistcs
                 , i.user_defined, i.compression
@@ -128,27 +362,21 @@ class DB:
                     using (indschema, indname)
                 where t.type = 'T'
                   and i.indextype in ('CLUS','REG','XVIL')""" 
-        if self._schemaname_ is None:
-            sql += f"\n and t.tabschema in (select schemaname from nya.validation_schemas)"
-        else:
-            sql += f"\n and t.tabschema = '{self._schemaname_}'"
-
-        if self._tablename_ is not None:
-            sql += f"\n and t.tabname = '{self._tablename_}'"
+        params = []
+        sql += "\n and " + self._filter_("t.tabschema", "t.tabname", params)
 
         sql += """\n order by rtrim(i.tabschema), rtrim(i.tabname)
                     , case i.uniquerule when 'P' then -999 when 'U' then -100 + iid else iid end
                     , ic.colseq"""
-        c1.execute(sql)
+        res = list()
         i = None
-        for row in c1.fetchall():
+        for row in rows(conn, sql, params):
             tabschema, tabname, indschema, indname, uniquerule, indextype, reverse_scans, pagesplit, \
              collectstatistcs, user_defined, compression, colname, colorder, colseq, comment, nullkeys, \
              typemodel, datatype, hashed, length, scale, pattern = row
 
             if colseq == 1:
                 # new index
-                t = self._tabledict_[(tabschema, tabname,)]
                 i = DBIndex(tabschema, tabname, indschema, indname, uniquerule, indextype, reverse_scans,
                             pagesplit, collectstatistcs, user_defined, compression, comment, nullkeys,
                             typemodel, datatype, hashed, length, scale, pattern)
@@ -156,7 +384,7 @@ class DB:
                     i.add_column(colname)
                 elif colorder == "D":
                     i.add_column(colname + " DESC")
-                t.add_index(i)
+                res.append(i)
 
             else:
                 # add columns / include
@@ -169,7 +397,9 @@ class DB:
                 else:
                     i.add_include(colname)
 
-    def _read_candidate_keys_(self, c1):
+        return res
+
+    def _read_candidate_keys_(self, conn):
         sql = """select rtrim(t.tabschema), rtrim(t.tabname), rtrim(t.constname), rtrim(k.colname) \
                     , t.type, t.enforced, t.enablequeryopt, k.colseq, t.remarks 
                  from syscat.keycoluse k 
@@ -179,33 +409,22 @@ class DB:
                     using (tabschema, tabname)
                  where x.type = 'T' and t.type in ('P','U')"""
 
-        if self._schemaname_ is None:
-            sql += f"\n and x.tabschema in (select schemaname from nya.validation_schemas)"
-        else:
-            sql += f"\n and x.tabschema = '{self._schemaname_}'"
-        
-        if self._tablename_ is not None:
-            sql += f"\n and x.tabname = '{self._tablename_}'"
+        params = []
+        sql += "\n and " + self._filter_("x.tabschema", "x.tabname", params)
 
         sql += "\n order by t.tabschema, t.tabname, t.type, t.constname, k.colseq"
 
-        t = None
-        c = None
-        c1.execute(sql)
-        for row in c1.fetchall():
+        res = list()
+        for row in rows(conn, sql, params):
             tabschema, tabname, constname, colname, consttype, enforced, enablequeryopt, colseq, comment = row
             if colseq == 1:
-                if t is not None:
-                    t.add_constraint(c)
-
-                t = self.get_table(tabschema, tabname)
                 c = DBCandidateKey(tabschema, tabname, constname, consttype, enforced, enablequeryopt, comment)
+                res.append(c)
             c.add_column(colname)
-        else:
-            if t is not None:
-                t.add_constraint(c)
 
-    def _read_foreign_keys_(self, c1):
+        return res
+
+    def _read_foreign_keys_(self, conn):
         sql = """select rtrim(r.tabschema), rtrim(r.tabname), rtrim(r.constname)
                       , rtrim(r.refkeyname), rtrim(r.reftabschema), rtrim(r.reftabname)
                       , r.deleterule, r.updaterule, rtrim(k1.colname), rtrim(k2.colname)
@@ -221,20 +440,13 @@ class DB:
                      = (k2.tabschema, k2.tabname, k2.constname)
                     and k1.colseq = k2.colseq"""
 
-        if self._schemaname_ is None:
-            sql += f"\n where r.tabschema in (select schemaname from nya.validation_schemas)"
-        else:
-            sql += f"\n where r.tabschema = '{self._schemaname_}'"
-
-        if self._tablename_ is not None:
-            sql += f"\n and r.tabname = '{self._tablename_}'"
+        params = []
+        sql += "\n where " + self._filter_("r.tabschema", "r.tabname", params)
 
-        sql += "order by r.tabschema, r.tabname, r.constname, k1.colseq"
+        sql += "\n order by r.tabschema, r.tabname, r.constname, k1.colseq"
 
-        t = None
-        f = None
-        c1.execute(sql)
-        for row in c1.fetchall():
+        res = list()
+        for row in rows(conn, sql, params):
             tabschema = row[0]
             tabname = row[1]
             constname = row[2]
@@ -250,55 +462,100 @@ class DB:
             comment = row[14]
 
             if colseq == 1:
-                # next constraint, add prev
-                if t is not None:
-                    t.add_constraint(f)
-                
-                t = self.get_table(tabschema, tabname)
+                # next constraint
                 f = DBForeignKey(tabschema, tabname, constname, refkeyname, reftabschema, reftabname,
                                  deleterule, updaterule, enforced, enablequeryopt, consttype, comment)
+                res.append(f)
             f.add_column(row[8])
             f.add_refcolumn(row[9])
-        else:
-            if t is not None:
-                t.add_constraint(f)
 
-    def _read_check_constraints_(self, c1):
+        return res
+
+    def _read_check_constraints_(self, conn):
         sql = """select rtrim(c.tabschema), rtrim(c.tabname), rtrim(c.constname)
                       , rtrim(c.type), ltrim(rtrim(c.text)), t.enforced, t.enablequeryopt, t.type, t.remarks
                 from syscat.checks c 
                 join syscat.tabconst t 
                     using (constname, tabschema, tabname)"""
-        if self._schemaname_ is None:
-            sql += f"\n where t.tabschema in (select schemaname from nya.validation_schemas)"
-        else:
-            sql += f"\n where t.tabschema = '{self._schemaname_}'"
-        
-        if self._tablename_ is not None:
-            sql += f"\n and t.tabname = '{self._tablename_}'"
+        params = []
+        sql += "\n where " + self._filter_("t.tabschema", "t.tabname", params)
 
         sql += "\n order by c.tabschema, c.tabname, c.constname"
 
-        c1.execute(sql)
-        for row in c1.fetchall():
+        res = list()
+        for row in rows(conn, sql, params):
             tabschema, tabname, constname, consttype, text, enforced, enablequeryopt, typex, comment = row
             if consttype == "S":
                 # System-generated check constraint for a GENERATED ALWAYS column
                 continue
 
-            t = self.get_table(tabschema, tabname)
             c = DBCheck(tabschema, tabname, constname, text, enforced, enablequeryopt, typex, comment)
-            t.add_constraint(c)
+            res.append(c)
+
+        return res
 
-    def _read_constraints_(self, c0):
-        self._read_candidate_keys_(c0)
-        self._read_foreign_keys_(c0)
-        self._read_check_constraints_(c0)
+    def _read_constraints_(self, conn):
+        res = self._read_candidate_keys_(conn)
+        res += self._read_foreign_keys_(conn)
+        res += self._read_check_constraints_(conn)
+        return res
+
+    def render(self, out):
+        """Write the DDL of all tables to a text stream, one table at a time"""
+        for n, t in enumerate(self._tables_):
+            if n > 0:
+                out.write("\n\n")
+            t.render(out)
+        # views are not read yet
 
     def __str__(self):
-        s = '\n\n'.join([(str(x)) for x in self._tables_])
-        # s += '\n\n'.join([(str(x)) for x in self._views_])
-        return s
+        out = io.StringIO()
+        self.render(out)
+        return out.getvalue()
+
+    def _covers_(self, tabschema, tabname):
+        if self._schemaname_ is not None and tabschema != self._schemaname_:
+            return False
+        if self._tablename_ is not None and tabname != self._tablename_:
+            return False
+        if self._tablelist_ is not None and (tabschema, tabname) not in self._tablelist_:
+            return False
+        return True
+
+    def dump(self, dumpdir, workers=DUMP_WORKERS, prune=False):
+        """Write one <schema>.<table>.sql file per table, files with unchanged content are not touched.
+
+        With prune, .sql files for tables that this instance covers but that no longer exist are
+        removed. Returns the number of files written, unchanged and pruned.
+        """
+        def write(t):
+            path = os.path.join(dumpdir, t._tabschema_ + "." + t._tabname_ + ".sql")
+            content = str(t).encode("utf-8")
+            try:
+                with open(path, "rb") as f:
+                    if hashlib.sha256(f.read()).digest() == hashlib.sha256(content).digest():
+                        return False
+            except FileNotFoundError:
+                pass
+            with open(path, "wb") as f:
+                f.write(content)
+            return True
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            written = sum(executor.map(write, self._tables_))
+
+        pruned = 0
+        if prune:
+            for name in os.listdir(dumpdir):
+                parts = name.split(".")
+                if len(parts) != 3 or parts[2] != "sql":
+                    continue
+                if (parts[0], parts[1]) in self._tabledict_ or not self._covers_(parts[0], parts[1]):
+                    continue
+                os.remove(os.path.join(dumpdir, name))
+                pruned += 1
+
+        return {"written": written, "unchanged": len(self._tables_) - written, "pruned": pruned}
 
     def get_table(self, tabschema, tabname):
         return self._tabledict_[tabschema, tabname]
@@ -309,9 +566,48 @@ class DB:
     def get_tables(self, tabschema):
         return [x for x in self._tables_ if x._tabschema_ == tabschema]
 
+    def get_parents(self, tabschema, tabname):
+        return self._parents_.get((tabschema, tabname), [])
+
+    def get_children(self, tabschema, tabname):
+        return self._children_.get((tabschema, tabname), [])
+
+    def _closure_(self, adjacency, key):
+        res = []
+        seen = {key}
+        todo = [key]
+        while todo:
+            for k in adjacency.get(todo.pop(), []):
+                if k not in seen:
+                    seen.add(k)
+                    res.append(k)
+                    todo.append(k)
+        return res
+
+    def get_ancestors(self, tabschema, tabname):
+        """All tables reachable through foreign keys, cycles are followed once"""
+        return self._closure_(self._parents_, (tabschema, tabname))
+
+    def get_descendants(self, tabschema, tabname):
+        """All tables that directly or indirectly reference this table"""
+        return self._closure_(self._children_, (tabschema, tabname))
+
     def get_schemas(self):
         return list(set([x._tabschema_ for x in self._tables_]))
 
+    def get_hashes(self):
+        """Merkle tree of the model: table hashes roll up into schema hashes and one root hash"""
+        return merkle(self._tables_)
+
+    def get_hash(self):
+        return self.get_hashes()["root"]
+
+
+def peak_rss():
+    # ru_maxrss is in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
 if __name__ == "__main__":
     # self, tabschema, tabname, tbspace, index_tbspace, long_tbspace
     # append_mode, compression, rowcompmode, tableorg
@@ -359,17 +655,60 @@ if __name__ == "__main__":
     required_args.add_argument("-u", "--username", required=True)
     required_args.add_argument("-p", "--password", required=True)
     required_args.add_argument("-D", "--dumpdir", required=False)
+    required_args.add_argument("-w", "--workers", required=False, type=int, default=DUMP_WORKERS,
+                               help="threads writing --dumpdir files")
+    required_args.add_argument("--prune", required=False, action="store_true",
+                               help="remove --dumpdir files of tables that no longer exist")
+    required_args.add_argument("--parallel", required=False, action="store_true",
+                               help="run the catalog queries concurrently on separate connections")
+    required_args.add_argument("--rss", required=False, action="store_true",
+                               help="report peak RSS on stderr")
+    required_args.add_argument("--cachedir", required=False,
+                               help="keep a catalog snapshot here and only re-read tables that changed")
+    required_args.add_argument("--hashes", required=False,
+                               help="write the schema hashes as json to this file")
+    required_args.add_argument("--verify", required=False,
+                               help="compare against hashes from a previous --hashes run and exit")
+    required_args.add_argument("--profile", required=False,
+                               help="write query and phase timings as json to this file")
+    required_args.add_argument("-a", "--fetchbuffer", required=False, type=int,
+                               help="bytes the driver fetches per block, the batch size of the catalog reads")
 #    required_args.add_argument("-V", "--validationdir", required=True)
 
     ns = parser.parse_args()
 
-    db = DB(ns.hostname, ns.dbname, ns.dbport, ns.username, ns.password, ns.schema, ns.table)
+    if ns.profile is not None:
+        # written on every exit path below
+        atexit.register(DBProfile.enable().dump, ns.profile)
+
+    with DBProfile.phase("extract"):
+        db = DB(ns.hostname, ns.dbname, ns.dbport, ns.username, ns.password, ns.schema, ns.table,
+                parallel=ns.parallel, cachedir=ns.cachedir, fetchbuffer=ns.fetchbuffer)
+    if ns.rss:
+        print(f"peak RSS after extraction: {peak_rss()} kB", file=sys.stderr)
+
+    if ns.hashes is not None:
+        with DBProfile.phase("hash"), open(ns.hashes, "w") as f:
+            json.dump(db.get_hashes(), f, indent=2, sort_keys=True)
+
+    if ns.verify is not None:
+        with open(ns.verify) as f:
+            baseline = json.load(f)
+        with DBProfile.phase("diff"):
+            changed = compare_hashes(baseline, db.get_hashes())
+        for name, what in changed:
+            print(f"{name} {what}")
+        sys.exit(0 if len(changed) == 0 else -1)
+
     if ns.dumpdir is None:
-        print(db)
+        with DBProfile.phase("render"):
+            db.render(sys.stdout)
+            print()
         sys.exit(0)
 
-    for t in db.get_all_tables():
-        with open(ns.dumpdir + "/" + t._tabschema_ + "." + t._tabname_ + ".sql", "w") as f:
-            f.write(str(t))
+    with DBProfile.phase("render"):
+        counts = db.dump(ns.dumpdir, ns.workers, ns.prune)
+    print(f"written {counts['written']}, unchanged {counts['unchanged']}, pruned {counts['pruned']}",
+          file=sys.stderr)
 
     sys.exit(0)
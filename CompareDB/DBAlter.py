@@ -0,0 +1,328 @@
+#!/usr/bin/python3
+
+import sys
+
+from DBDiff import *
+from DBDiff import _name_
+
+# statements run in this order, objects are dropped before the columns they use are altered
+# and the reorg of a table runs before indexes are created on it
+DROP_FOREIGN_KEY = 0
+DROP_CONSTRAINT = 1
+DROP_INDEX = 2
+ALTER_TABLE = 3
+REORG = 4
+CREATE_TABLE = 5
+CREATE_INDEX = 6
+ADD_KEY = 7
+ADD_FOREIGN_KEY = 8
+ADD_CHECK = 9
+COMMENT = 10
+
+STEPS = {
+    DROP_FOREIGN_KEY: "Drop foreign keys",
+    DROP_CONSTRAINT: "Drop constraints",
+    DROP_INDEX: "Drop indexes",
+    ALTER_TABLE: "Alter tables and columns",
+    REORG: "Reorganize tables left in reorg pending state",
+    CREATE_TABLE: "Create tables",
+    CREATE_INDEX: "Create indexes",
+    ADD_KEY: "Add primary and unique keys",
+    ADD_FOREIGN_KEY: "Add foreign keys",
+    ADD_CHECK: "Add check constraints",
+    COMMENT: "Comments",
+}
+
+# lengths of these types can grow in place, any other change of the data type is reorg pending
+GROWABLE_TYPES = ("VARCHAR", "VARGRAPHIC")
+
+
+def _quote_(comment):
+    return "''" if comment is None else "'" + comment.replace("'", "''") + "'"
+
+
+def _changed_(o1, o2):
+    # names of the attributes that differ between two versions of the same object
+    a1, a2 = o1.get_attributes(), o2.get_attributes()
+    return {k for k in a1.keys() | a2.keys() if a1.get(k) != a2.get(k)}
+
+
+def _inline_length_(inline):
+    # " INLINE LENGTH n" or "" for the default
+    return int(inline.split()[-1]) if inline else 0
+
+
+class DBAlter:
+    """The smallest set of statements that turns the right side of a DBDiff into the left side.
+
+    Tables are altered in place, only a table that exists on one side alone is created or
+    listed for a manual drop. Changes Db2 only accepts with the table in reorg pending state,
+    such as dropping a column or changing a NOT NULL, are collected per table and followed by
+    a REORG. Changes that cannot be expressed with ALTER are written as comments.
+    """
+
+    def __init__(self, db1, db2, diff=None):
+        self._statements_ = []
+        self._reorg_ = dict()
+        # tables whose primary key is dropped and added again for a change of its index
+        self._rekeyed_ = set()
+        # (schema, table, constraint) of the constraints added
+        self._added_ = set()
+        # (schema, table, columns) of the primary and unique keys dropped on the right side
+        self._dropped_keys_ = set()
+
+        if diff is None:
+            diff = DBDiff(db1, db2)
+        tables1 = {t.get_key(): t for t in db1.get_all_tables()}
+
+        for key in diff.get_left_only():
+            t = tables1[key]
+            self._add_(CREATE_TABLE, str(t).replace("--#SET TERMINATOR @\n\n", "").strip())
+        for key in diff.get_right_only():
+            self._add_(CREATE_TABLE, f"-- {_name_(key)} does not exist on the left side, drop it manually:"
+                                     f"\n-- DROP TABLE {_name_(key)} @")
+        for d in diff.get_changed():
+            self._alter_table_(d._left_, d._right_)
+        self._readd_foreign_keys_(tables1, db2)
+
+        for key, reasons in self._reorg_.items():
+            self._add_(REORG, f"-- {', '.join(reasons)}"
+                              f"\nCALL SYSPROC.ADMIN_CMD('REORG TABLE {_name_(key)}') @")
+
+    def _add_(self, step, statement):
+        self._statements_.append((step, statement))
+
+    def _pending_(self, t, reason):
+        self._reorg_.setdefault(t.get_key(), []).append(reason)
+
+    def _alter_table_(self, t1, t2):
+        name = _name_(t1.get_key())
+        if (t1._tbspace_, t1._index_tbspace_ or None, t1._long_tbspace_ or None, t1._tableorg_) != \
+                (t2._tbspace_, t2._index_tbspace_ or None, t2._long_tbspace_ or None, t2._tableorg_):
+            self._add_(ALTER_TABLE, f"-- {name}: table spaces or organization differ, "
+                                    f"move the table with SYSPROC.ADMIN_MOVE_TABLE")
+        if t1._compress_ != t2._compress_:
+            self._add_(ALTER_TABLE, f"ALTER TABLE {name} {t1._compress_} @"
+                                    f"\n-- rows already in {name} keep their format until the next REORG")
+        if t1._table_comment_ != t2._table_comment_:
+            self._add_(COMMENT, f"COMMENT ON TABLE {name} IS {_quote_(t1._table_comment_)} @")
+
+        self._alter_columns_(t1, t2)
+        self._alter_indexes_(t1, t2)
+        self._alter_constraints_(t1, t2)
+
+    def _readd_foreign_keys_(self, tables1, db2):
+        # dropping a primary or unique key drops the foreign keys that reference it, the ones the
+        # left side has as well are added again unless the alter of their table already adds them
+        for t2 in db2.get_all_tables():
+            t1 = tables1.get(t2.get_key())
+            if t1 is None:
+                continue
+            for c2 in t2._constraints_:
+                if c2._constraintype_ != "F" or \
+                        (c2._reftabschema_, c2._reftabname_, tuple(c2._refcols_)) not in self._dropped_keys_:
+                    continue
+                c1 = next((c for c in t1._constraints_
+                           if c._constraintype_ == "F" and c.get_key() == c2.get_key()), None)
+                if c1 is not None and (c1._tabschema_, c1._tabname_, c1.get_key()) not in self._added_:
+                    self._add_constraint_(c1)
+
+    def _alter_columns_(self, t1, t2):
+        name = _name_(t1.get_key())
+        columns1 = {c.get_key(): c for c in t1._columns_}
+        columns2 = {c.get_key(): c for c in t2._columns_}
+
+        for key, c in columns2.items():
+            if key not in columns1:
+                self._add_(ALTER_TABLE, f"ALTER TABLE {name} DROP COLUMN {key} @")
+                self._pending_(t1, f"DROP COLUMN {key}")
+
+        for key, c in columns1.items():
+            if key not in columns2:
+                self._add_(ALTER_TABLE, f"ALTER TABLE {name} ADD COLUMN {c.get_definition()} @")
+                if c._nulls_ and c._default_ is None and c._identity_ != "Y" and not c._generated_:
+                    self._add_(ALTER_TABLE, f"-- {name}.{key} is NOT NULL without a default, Db2 rejects the "
+                                            f"ADD (SQL0193N) even on an empty table, add it with a default "
+                                            f"or as nullable and alter it afterwards")
+                if c._column_comment_ is not None:
+                    self._add_(COMMENT, f"COMMENT ON COLUMN {name}.{key} IS {_quote_(c._column_comment_)} @")
+            elif c.get_signature() != columns2[key].get_signature():
+                self._alter_column_(t1, c, columns2[key])
+
+        # columns added at the end are in the right place only if nothing else moved
+        order1 = [k for k in columns1 if k in columns2]
+        order2 = [k for k in columns2 if k in columns1]
+        if order1 != order2:
+            self._add_(ALTER_TABLE, f"-- {name}: the column order differs, only recreating the table changes it")
+
+    def _alter_column_(self, t, c1, c2):
+        name = _name_(t.get_key())
+        alter = f"ALTER TABLE {name} ALTER COLUMN {c1._colname_}"
+        a1, a2 = c1.get_attributes(), c2.get_attributes()
+        changed = _changed_(c1, c2)
+
+        if changed & {"typename", "length", "scale", "bit_data"}:
+            self._add_(ALTER_TABLE, f"{alter} SET DATA TYPE {c1.get_datatype()} @")
+            if not (changed <= {"length"} and a1["typename"] in GROWABLE_TYPES and a1["length"] >= a2["length"]):
+                self._pending_(t, f"SET DATA TYPE {c1._colname_}")
+
+        if "nulls" in changed:
+            if a1["nulls"]:
+                self._add_(ALTER_TABLE, f"{alter} SET NOT NULL @")
+                self._pending_(t, f"SET NOT NULL {c1._colname_}")
+            else:
+                self._add_(ALTER_TABLE, f"{alter} DROP NOT NULL @")
+                self._pending_(t, f"DROP NOT NULL {c1._colname_}")
+
+        if "default" in changed:
+            if c1._default_ is None:
+                self._add_(ALTER_TABLE, f"{alter} DROP DEFAULT @")
+            else:
+                self._add_(ALTER_TABLE, f"{alter} SET DEFAULT {c1._default_} @")
+
+        if changed & {"identity", "generated", "text"}:
+            self._add_(ALTER_TABLE, f"-- {name}.{c1._colname_}: identity or generated expression differs, "
+                                    f"change it manually")
+
+        if "inline_length" in changed:
+            if _inline_length_(a1["inline_length"]) > _inline_length_(a2["inline_length"]):
+                self._add_(ALTER_TABLE, f"{alter} SET{a1['inline_length']} @")
+            else:
+                self._add_(ALTER_TABLE, f"-- {name}.{c1._colname_}: the inline length cannot be decreased")
+
+        if "comment" in changed:
+            self._add_(COMMENT, f"COMMENT ON COLUMN {name}.{c1._colname_} IS {_quote_(a1['comment'])} @")
+
+    def _alter_indexes_(self, t1, t2):
+        indexes1 = {i.get_key(): i for i in t1._indexes_}
+        indexes2 = {i.get_key(): i for i in t2._indexes_}
+
+        for key, i in indexes2.items():
+            if key not in indexes1:
+                self._drop_index_(i)
+
+        for key, i in indexes1.items():
+            if key not in indexes2:
+                self._create_index_(i)
+            elif i.get_signature() != indexes2[key].get_signature():
+                self._alter_index_(t1, t2, i, indexes2[key])
+
+    def _alter_index_(self, t1, t2, i1, i2):
+        name = _name_(i1.get_key())
+        changed = _changed_(i1, i2)
+        if changed <= {"compression", "comment"}:
+            if "compression" in changed:
+                compress = "YES" if i1._compression_ == "Y" else "NO"
+                self._add_(ALTER_TABLE, f"ALTER INDEX {name} COMPRESS {compress} @"
+                                        f"\n-- the index keeps its format until the next REORG INDEXES")
+            if "comment" in changed:
+                self._add_(COMMENT, f"COMMENT ON INDEX {name} IS {_quote_(i1._comment_)} @")
+        elif "P" in (i1._uniquerule_, i2._uniquerule_):
+            # the index of a primary key cannot be dropped, the key is dropped and added again on an
+            # index created first, so that the index gets the attributes of the left side
+            key1 = next((c for c in t1._constraints_ if c._constraintype_ == "P"), None)
+            key2 = next((c for c in t2._constraints_ if c._constraintype_ == "P"), None)
+            if key2 is not None:
+                self._drop_constraint_(_name_(t1.get_key()), key2)
+            if i2._user_defined_ in (1, "1", "Y"):
+                # an index created before the key stays when the key is dropped
+                self._add_(DROP_INDEX, f"DROP INDEX {name} @")
+            self._create_index_(i1)
+            if key1 is not None:
+                self._add_constraint_(key1)
+            self._rekeyed_.add(t1.get_key())
+        else:
+            self._drop_index_(i2)
+            self._create_index_(i1)
+
+    def _drop_index_(self, i):
+        # an index that backs a primary key or unique constraint goes away with the constraint
+        if i._uniquerule_ != "P":
+            self._add_(DROP_INDEX, f"DROP INDEX {_name_(i.get_key())} @")
+
+    def _create_index_(self, i):
+        self._add_(CREATE_INDEX, str(i).strip())
+
+    def _alter_constraints_(self, t1, t2):
+        name = _name_(t1.get_key())
+        constraints1 = {c.get_key(): c for c in t1._constraints_}
+        constraints2 = {c.get_key(): c for c in t2._constraints_}
+
+        rekeyed = t1.get_key() in self._rekeyed_
+        for key, c in constraints2.items():
+            if key not in constraints1 and not (rekeyed and c._constraintype_ == "P"):
+                self._drop_constraint_(name, c)
+
+        for key, c in constraints1.items():
+            if rekeyed and c._constraintype_ == "P":
+                # dropped and added again with its index
+                continue
+            if key not in constraints2:
+                self._add_constraint_(c)
+                continue
+
+            c2 = constraints2[key]
+            changed = _changed_(c, c2)
+            if not changed:
+                continue
+            if changed - {"enforced", "enablequeryopt", "comment"}:
+                self._drop_constraint_(name, c2)
+                self._add_constraint_(c)
+                continue
+
+            if changed & {"enforced", "enablequeryopt"}:
+                if c._constraintype_ in ("P", "U"):
+                    # keys cannot be altered, an informational key is dropped and added again
+                    self._drop_constraint_(name, c2)
+                    self._add_constraint_(c)
+                    continue
+                kind = "FOREIGN KEY" if c._constraintype_ == "F" else "CHECK"
+                if c._enforced_ != c2._enforced_:
+                    alteration = c._enforced_
+                    if c._enforced_ == "NOT ENFORCED":
+                        # rows are no longer checked, the optimizer should only rely on them when it uses them
+                        alteration += " TRUSTED" if c._enablequeryopt_ == "ENABLE QUERY OPTIMIZATION" \
+                            else " NOT TRUSTED"
+                    self._add_(ALTER_TABLE, f"ALTER TABLE {name} ALTER {kind} {key} {alteration} @")
+                if c._enablequeryopt_ != c2._enablequeryopt_:
+                    self._add_(ALTER_TABLE, f"ALTER TABLE {name} ALTER {kind} {key} {c._enablequeryopt_} @")
+
+            if "comment" in changed:
+                self._add_(COMMENT, f"COMMENT ON CONSTRAINT {name}.{key} IS {_quote_(c._comment_)} @")
+
+    def _drop_constraint_(self, name, c):
+        if c._constraintype_ in ("P", "U"):
+            self._dropped_keys_.add((c._tabschema_, c._tabname_, tuple(c._columns_)))
+        step = DROP_FOREIGN_KEY if c._constraintype_ == "F" else DROP_CONSTRAINT
+        self._add_(step, f"ALTER TABLE {name} DROP CONSTRAINT {c.get_key()} @")
+
+    def _add_constraint_(self, c):
+        self._added_.add((c._tabschema_, c._tabname_, c.get_key()))
+        if c._constraintype_ == "F":
+            step = ADD_FOREIGN_KEY
+        elif c._constraintype_ in ("P", "U"):
+            step = ADD_KEY
+        else:
+            step = ADD_CHECK
+        statement = str(c).strip()
+        if c._enforced_ == "ENFORCED" and step != ADD_KEY:
+            statement = f"-- every row of {c._tabschema_}.{c._tabname_} is checked, on a large table add it " \
+                        f"NOT ENFORCED TRUSTED if the data is known to be valid\n" + statement
+        self._add_(step, statement)
+
+    def get_statements(self):
+        """(step, statement) in the order they have to run"""
+        return sorted(self._statements_, key=lambda x: x[0])
+
+    def get_reorg_pending(self):
+        """{(schema, table): [reason, ...]} for the tables a REORG is needed for"""
+        return self._reorg_
+
+    def render(self, out=sys.stdout):
+        out.write("--#SET TERMINATOR @\n")
+        step = None
+        for s, statement in self.get_statements():
+            if s != step:
+                step = s
+                out.write(f"\n-- {STEPS[step]}\n")
+            out.write(f"\n{statement}\n")
@@ -1,27 +1,73 @@
 #!/usr/bin/python3
 
+from DBHash import *
+from DBCompact import *
+
+# types that are rendered with their length
+SIZED_TYPES = ("CHARACTER", "VARCHAR", "DECIMAL", "CLOB", "BLOB")
+
 class DBColumn:
+    __slots__ = ("_colno_", "_colname_", "_typename_", "_length_", "_scale_", "_nulls_", "_bit_data_",
+                 "_identity_", "_generated_", "_text_", "_default_", "_column_comment_", "_inline_length_")
+
     def __init__(self, colno, colname, typename, length, scale, nulls, bit_data,
                  identity, generated, text, default, column_comment, inline_length):
         self._colno_ = colno
-        self._colname_ = colname
-        self._typename_ = typename
+        self._colname_ = compact(colname)
+        self._typename_ = compact(typename)
         self._length_ = length
         self._scale_ = scale
         if nulls == "N":
             self._nulls_ = " NOT NULL"
         else:
             self._nulls_ = ""
-        self._bit_data_ = bit_data
-        self._identity_ = identity
-        self._generated_ = generated
+        self._bit_data_ = compact(bit_data)
+        self._identity_ = compact(identity)
+        self._generated_ = compact(generated)
         self._text_ = text
-        self._default_ = default
+        self._default_ = compact(default)
         self._column_comment_ = column_comment
         if inline_length <= 312:
             self._inline_length_ = ""
         else:
-            self._inline_length_ = " INLINE LENGTH %s" % inline_length
+            self._inline_length_ = compact(" INLINE LENGTH %s" % inline_length)
+
+    def get_key(self):
+        return self._colname_
+
+    def get_attributes(self):
+        """What the rendered DDL states, by name, so that a column parsed from a file compares equal
+        to the same column read from the catalog"""
+        sized = self._typename_ in SIZED_TYPES
+        identity = self._identity_ == "Y"
+        return {"colno": self._colno_, "colname": self._colname_, "typename": self._typename_,
+                "length": self._length_ if sized else None,
+                "scale": self._scale_ if self._typename_ == "DECIMAL" else None, "nulls": self._nulls_,
+                "bit_data": self._bit_data_ or "", "identity": identity,
+                "generated": (self._generated_ or "").strip(),
+                "text": None if identity else normalize_text(self._text_),
+                "default": normalize_text(self._default_), "comment": self._column_comment_,
+                "inline_length": self._inline_length_}
+
+    def get_signature(self):
+        return tuple(self.get_attributes().values())
+
+    def get_hash(self):
+        return fingerprint(self.get_signature())
+
+    def get_datatype(self):
+        """The data type as it is written in a column definition, without default and nullability"""
+        if self._typename_ in ("CHARACTER", "VARCHAR"):
+            return f"{self._typename_}({self._length_}){self._bit_data_ or ''}"
+        if self._typename_ == "DECIMAL":
+            return f"DECIMAL({self._length_},{self._scale_})"
+        if self._typename_ in ("CLOB", "BLOB"):
+            return f"{self._typename_}({self._length_})"
+        return self._typename_
+
+    def get_definition(self):
+        """The column definition without the separator that precedes it in CREATE TABLE"""
+        return str(self)[2:]
 
     def __str__(self):
         if self._colno_ == 0:
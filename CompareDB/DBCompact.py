@@ -0,0 +1,10 @@
+#!/usr/bin/python3
+
+import sys
+
+
+def compact(value):
+    """One shared copy of catalog strings that repeat across objects, e.g. schema and type names"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    return value
@@ -0,0 +1,85 @@
+#!/usr/bin/python3
+
+import sys
+
+# share of the uncompressed pages adaptive compression is assumed to save, the catalog only has
+# PCTPAGESSAVED for what is already compressed, SYSPROC.ADMIN_GET_TAB_COMPRESS_INFO gives a
+# measured estimate for a single table
+ADAPTIVE_PCT = 60
+INDEX_PCT = 40
+
+# objects smaller than this are not worth the reorg
+MIN_PAGES = 1000
+
+TABLE = "TABLE"
+INDEX = "INDEX"
+
+
+def _pages_(n):
+    return n if n is not None and n > 0 else 0
+
+
+class DBCompression:
+    """Tables and indexes where adaptive compression would save the most pages.
+
+    A row organized table that is not compressed, or compressed with a static dictionary only,
+    is estimated from its NPAGES and what PCTPAGESSAVED says is already saved, an index that is
+    not compressed from its NLEAF. The pages saved times the page size is what a full scan no
+    longer reads and what the bufferpool no longer has to hold to keep the object cached.
+    Estimates use ADAPTIVE_PCT and INDEX_PCT, the real saving depends on the data.
+    """
+
+    def __init__(self, db):
+        self._findings_ = []
+        for t in db.get_all_tables():
+            if t._tableorg_ == "ORGANIZE BY ROW" and t._compress_ != "COMPRESS YES ADAPTIVE":
+                stats = t.get_stats() or {}
+                npages = _pages_(stats.get("npages"))
+                pct = max(stats.get("pctpagessaved") or 0, 0)
+                # pages without any compression, then with adaptive compression
+                uncompressed = npages * 100 / (100 - min(pct, 99))
+                self._add_(TABLE, t, t, npages, npages - uncompressed * (100 - ADAPTIVE_PCT) / 100,
+                           stats.get("pagesize"))
+            for i in t._indexes_:
+                if i._compression_ == "N" and i._indextype_ in ("REG", "CLUS"):
+                    stats = i.get_stats() or {}
+                    nleaf = _pages_(stats.get("nleaf"))
+                    self._add_(INDEX, t, i, nleaf, nleaf * INDEX_PCT / 100, stats.get("pagesize"))
+        self._findings_.sort(key=lambda x: (-x[5], x[0], x[2]))
+
+    def _add_(self, kind, t, o, pages, saved, pagesize):
+        if pages >= MIN_PAGES and saved > 0:
+            name = f"{t._tabschema_}.{t._tabname_}" if kind == TABLE else f"{o._indschema_}.{o._indname_}"
+            self._findings_.append((kind, t, name, pages, int(saved), int(saved) * (pagesize or 0)))
+
+    def get_findings(self):
+        """(kind, table, name, pages, pages saved, bytes saved), most bytes saved first"""
+        return self._findings_
+
+    def report(self, out=sys.stdout):
+        total = sum(x[5] for x in self._findings_)
+        print(f"{len(self._findings_)} compression candidates, an estimated {total / 2**30:.1f} GiB saved",
+              file=out)
+        for kind, t, name, pages, saved, size in self._findings_:
+            print(f"\n{kind} {name}", file=out)
+            print(f"    {pages} pages, about {saved} fewer pages read per full scan"
+                  f", {size / 2**20:.1f} MiB less bufferpool to keep it cached", file=out)
+
+    def script(self, out=sys.stdout):
+        # a reorg of the table rebuilds its indexes as well, only tables that are not
+        # reorganized need a reorg of their indexes
+        tables = dict()
+        for kind, t, name, pages, saved, size in self._findings_:
+            tables.setdefault(t.get_key(), []).append((kind, name))
+
+        out.write("--#SET TERMINATOR @\n")
+        for (tabschema, tabname), objects in tables.items():
+            out.write("\n")
+            for kind, name in objects:
+                out.write(f"ALTER {kind} {name} COMPRESS YES{' ADAPTIVE' if kind == TABLE else ''} @\n")
+            if any(kind == TABLE for kind, name in objects):
+                out.write(f"CALL SYSPROC.ADMIN_CMD('REORG TABLE {tabschema}.{tabname} RESETDICTIONARY') @\n")
+            else:
+                out.write(f"CALL SYSPROC.ADMIN_CMD('REORG INDEXES ALL FOR TABLE {tabschema}.{tabname}') @\n")
+            out.write(f"CALL SYSPROC.ADMIN_CMD('RUNSTATS ON TABLE {tabschema}.{tabname} "
+                      f"WITH DISTRIBUTION AND INDEXES ALL') @\n")
@@ -0,0 +1,138 @@
+#!/usr/bin/python3
+
+import sys
+
+from DBStatement import *
+
+HIGH = "high"
+LOW = "low"
+
+# database configuration that decides memory, locking, I/O and plans
+HIGH_PRIORITY_CFG = {
+    "sortheap", "sheapthres_shr", "locklist", "maxlocks", "stmtheap", "pckcachesz", "catalogcache_sz",
+    "dbheap", "applheapsz", "database_memory", "self_tuning_mem", "logbufsz", "num_iocleaners",
+    "num_ioservers", "chngpgs_thresh", "page_age_trgt_mcr", "dft_degree", "dft_queryopt",
+    "dft_prefetch_sz", "dft_extent_sz", "cur_commit", "locktimeout", "maxappls", "avg_appls",
+    "auto_maint", "auto_tbl_maint", "auto_runstats", "auto_stmt_stats", "auto_reorg", "stat_heap_sz",
+    "util_heap_sz", "opt_direct_wrkld",
+}
+
+# paths and states that differ between any two databases
+IGNORED_CFG = {
+    "logpath", "newlogpath", "mirrorlogpath", "overflowlogpath", "failarchpath", "restore_pending",
+    "backup_pending", "rollfwd_pending", "database_consistent", "log_retain_status", "user_exit_status",
+    "loghead", "db_mem_thresh", "country", "territory", "release", "hadr_db_role",
+}
+
+BUFFERPOOL_ATTRIBUTES = ("npages", "pagesize", "numblockpages", "blocksize")
+TABLESPACE_ATTRIBUTES = ("tbspacetype", "datatype", "pagesize", "extentsize", "prefetchsize", "bpname",
+                         "overhead", "transferrate")
+
+
+class DBConfig:
+    """Database configuration, bufferpools and table spaces of a database.
+
+    Self tuned configuration values are kept as AUTOMATIC, the value the memory tuner arrived
+    at is not configuration and is not compared. A bufferpool of AUTOMATIC size has NPAGES -2.
+    The table spaces that hold tables of schemaname are read from the catalog, independent of
+    which tables were extracted.
+    """
+
+    def __init__(self, conn, schemaname=None):
+        self._cfg_ = dict()
+        sql = """select name, value, value_flags
+                from sysibmadm.dbcfg
+                where member = current member"""
+        for name, value, flags in rows(conn, sql):
+            if name not in IGNORED_CFG:
+                self._cfg_[name] = "AUTOMATIC" if flags is not None and "AUTOMATIC" in flags else value
+
+        self._bufferpools_ = dict()
+        sql = f"""select rtrim(bpname), {", ".join(BUFFERPOOL_ATTRIBUTES)}
+                from syscat.bufferpools"""
+        for row in rows(conn, sql):
+            self._bufferpools_[row[0]] = dict(zip(BUFFERPOOL_ATTRIBUTES, row[1:]))
+
+        self._tablespaces_ = dict()
+        sql = f"""select rtrim(t.tbspace), {", ".join("rtrim(b.bpname)" if x == "bpname" else "t." + x
+                                                       for x in TABLESPACE_ATTRIBUTES)}
+                from syscat.tablespaces t
+                join syscat.bufferpools b
+                    using (bufferpoolid)"""
+        for row in rows(conn, sql):
+            self._tablespaces_[row[0]] = dict(zip(TABLESPACE_ATTRIBUTES, row[1:]))
+
+        self._used_ = set()
+        if schemaname is not None:
+            sql = """select distinct rtrim(tbspace), rtrim(index_tbspace), rtrim(long_tbspace)
+                    from syscat.tables
+                    where type = 'T'
+                      and tabschema = ?"""
+            for row in rows(conn, sql, (schemaname,)):
+                self._used_.update(x for x in row if x)
+
+    def get_cfg(self):
+        return self._cfg_
+
+    def get_bufferpools(self):
+        return self._bufferpools_
+
+    def get_tablespaces(self):
+        return self._tablespaces_
+
+    def get_used_tablespaces(self):
+        """Table spaces with tables, indexes or long data of the schema"""
+        return self._used_
+
+
+class DBConfigDiff:
+    """Differences in configuration, bufferpools and table spaces, high priority first.
+
+    Configuration in HIGH_PRIORITY_CFG, a missing bufferpool or one of another size or page size
+    and any difference of a table space that holds tables of the compared schema on either side
+    are high priority.
+    """
+
+    def __init__(self, cfg1, cfg2):
+        self._differences_ = []
+        for name in sorted(set(cfg1.get_cfg()) | set(cfg2.get_cfg())):
+            x1, x2 = cfg1.get_cfg().get(name), cfg2.get_cfg().get(name)
+            if x1 != x2:
+                self._add_(HIGH if name in HIGH_PRIORITY_CFG else LOW, "DB CFG", name.upper(), x1, x2)
+
+        self._compare_(cfg1.get_bufferpools(), cfg2.get_bufferpools(), "BUFFERPOOL",
+                       lambda name, attribute: attribute in (None, "npages", "pagesize"))
+        tbspaces = cfg1.get_used_tablespaces() | cfg2.get_used_tablespaces()
+        self._compare_(cfg1.get_tablespaces(), cfg2.get_tablespaces(), "TABLESPACE",
+                       lambda name, attribute: name in tbspaces)
+        self._differences_.sort(key=lambda x: x[0] != HIGH)
+
+    def _add_(self, priority, kind, name, x1, x2):
+        self._differences_.append((priority, kind, name, x1, x2))
+
+    def _compare_(self, objects1, objects2, kind, high):
+        for name in sorted(set(objects1) | set(objects2)):
+            if name not in objects2:
+                self._add_(HIGH if high(name, None) else LOW, kind, name, "exists", "missing")
+            elif name not in objects1:
+                self._add_(HIGH if high(name, None) else LOW, kind, name, "missing", "exists")
+            else:
+                for attribute, x1 in objects1[name].items():
+                    x2 = objects2[name][attribute]
+                    if x1 != x2:
+                        self._add_(HIGH if high(name, attribute) else LOW, kind, f"{name} {attribute.upper()}",
+                                   x1, x2)
+
+    def get_differences(self):
+        """[(priority, kind, name, value1, value2), ...] high priority first"""
+        return self._differences_
+
+    def is_identical(self):
+        return len(self._differences_) == 0
+
+    def report(self, name1, name2, out=sys.stdout):
+        print(file=out)
+        if len(self._differences_) > 0:
+            print("Configuration differences:", file=out)
+        for priority, kind, name, x1, x2 in self._differences_:
+            print(f"    [{priority}] {kind} {name} {name1}: {x1}, {name2}: {x2}", file=out)
@@ -1,15 +1,39 @@
 #!/usr/bin/python3
 
+import io
+
+from DBHash import *
+from DBCompact import *
+
+
 class DBConstraint:
-    pass
+    __slots__ = ("_constname_", "_tabschema_", "_tabname_", "_constraintype_", "_comment_", "_enforced_",
+                 "_enablequeryopt_")
+
+    def get_key(self):
+        return self._constname_
+
+    def get_signature(self):
+        return tuple(self.get_attributes().values())
+
+    def get_hash(self):
+        return fingerprint(self.get_signature())
+
+    def __str__(self):
+        out = io.StringIO()
+        self.render(out)
+        return out.getvalue()
+
 
 # FIXME:
 class DBCandidateKey(DBConstraint):
+    __slots__ = ("_columns_",)
+
     def __init__(self, tabschema, tabname, constname, constraintype, enforced, enablequeryopt, comment):
         self._constname_ = constname
-        self._tabschema_ = tabschema
-        self._tabname_ = tabname
-        self._constraintype_ = constraintype
+        self._tabschema_ = compact(tabschema)
+        self._tabname_ = compact(tabname)
+        self._constraintype_ = compact(constraintype)
         self._columns_ = []
         self._comment_ = comment
 
@@ -24,33 +48,38 @@ class DBCandidateKey(DBConstraint):
             self._enablequeryopt_ = "ENABLE QUERY OPTIMIZATION"
 
     def add_column(self, col):
-        self._columns_.append(col)
+        self._columns_.append(compact(col))
 
-    def __str__(self):
+    def get_attributes(self):
+        return {"kind": "K", "constname": self._constname_, "constraintype": self._constraintype_,
+                "columns": tuple(self._columns_), "enforced": self._enforced_,
+                "enablequeryopt": self._enablequeryopt_, "comment": self._comment_}
+
+    def render(self, out):
         cols = ', '.join(self._columns_)
-        s = f"\nALTER TABLE {self._tabschema_}.{self._tabname_} ADD CONSTRAINT {self._constname_}"
+        out.write(f"\nALTER TABLE {self._tabschema_}.{self._tabname_} ADD CONSTRAINT {self._constname_}")
         if self._constraintype_ == "U":
-            s += f"\n    UNIQUE ({cols})"
+            out.write(f"\n    UNIQUE ({cols})")
         else:
-            s += f"\n    PRIMARY KEY ({cols})"
-        s += f"\n{self._enforced_}"
-        s += f"\n{self._enablequeryopt_} @"
+            out.write(f"\n    PRIMARY KEY ({cols})")
+        out.write(f"\n{self._enforced_}")
+        out.write(f"\n{self._enablequeryopt_} @")
 
         if self._comment_ is not None:
-            s += f"\n\nCOMMENT ON CONSTRAINT {self._tabschema_}.{self._tabname_}.{self._constname_} IS '{self._comment_}' @"
-
-        return s
+            out.write(f"\n\nCOMMENT ON CONSTRAINT {self._tabschema_}.{self._tabname_}.{self._constname_} IS '{self._comment_}' @")
 
 
 class DBForeignKey(DBConstraint):
+    __slots__ = ("_reftabschema_", "_reftabname_", "_deleterule_", "_updaterule_", "_cols_", "_refcols_")
+
     def __init__(self, tabschema, tabname, constname, refkeyname, reftabschema,
                  reftabname, delete, update, enforced, enablequeryopt, constraintype, comment):
         self._constname_ = constname
-        self._tabschema_ = tabschema
-        self._tabname_ = tabname
-        self._constraintype_ = constraintype
-        self._reftabschema_ = reftabschema
-        self._reftabname_ = reftabname
+        self._tabschema_ = compact(tabschema)
+        self._tabname_ = compact(tabname)
+        self._constraintype_ = compact(constraintype)
+        self._reftabschema_ = compact(reftabschema)
+        self._reftabname_ = compact(reftabname)
         self._comment_ = comment
 
         if delete == "A":
@@ -81,35 +110,42 @@ class DBForeignKey(DBConstraint):
             self._enablequeryopt_ = "ENABLE QUERY OPTIMIZATION"
 
     def add_column(self, col):
-        self._cols_.append(col)
+        self._cols_.append(compact(col))
         
     def add_refcolumn(self, col):
-        self._refcols_.append(col)
-    
-    def __str__(self):
+        self._refcols_.append(compact(col))
+
+    def get_attributes(self):
+        return {"kind": "F", "constname": self._constname_, "constraintype": self._constraintype_,
+                "cols": tuple(self._cols_), "reftabschema": self._reftabschema_, "reftabname": self._reftabname_,
+                "refcols": tuple(self._refcols_), "deleterule": self._deleterule_,
+                "updaterule": self._updaterule_, "enforced": self._enforced_,
+                "enablequeryopt": self._enablequeryopt_, "comment": self._comment_}
+
+    def render(self, out):
         cols = ', '.join(self._cols_)
         refcols = ', '.join(self._refcols_)
-        s = f"\nALTER TABLE {self._tabschema_}.{self._tabname_} ADD CONSTRAINT {self._constname_}"
-        s += f"\n    FOREIGN KEY ({cols})"
-        s += f"\n    REFERENCES {self._reftabschema_}.{self._reftabname_}" 
-        s += f"\n                ({refcols})"
-        s += f"\n        ON DELETE {self._deleterule_}"
-        s += f"\n        ON UPDATE {self._updaterule_}"
-        s += f"\n{self._enforced_}"
-        s += f"\n{self._enablequeryopt_} @"
+        out.write(f"\nALTER TABLE {self._tabschema_}.{self._tabname_} ADD CONSTRAINT {self._constname_}")
+        out.write(f"\n    FOREIGN KEY ({cols})")
+        out.write(f"\n    REFERENCES {self._reftabschema_}.{self._reftabname_}")
+        out.write(f"\n                ({refcols})")
+        out.write(f"\n        ON DELETE {self._deleterule_}")
+        out.write(f"\n        ON UPDATE {self._updaterule_}")
+        out.write(f"\n{self._enforced_}")
+        out.write(f"\n{self._enablequeryopt_} @")
         
         if self._comment_ is not None:
-            s += f"\n\nCOMMENT ON CONSTRAINT {self._tabschema_}.{self._tabname_}.{self._constname_} IS '{self._comment_}' @"
-        
-        return s
+            out.write(f"\n\nCOMMENT ON CONSTRAINT {self._tabschema_}.{self._tabname_}.{self._constname_} IS '{self._comment_}' @")
 
 
 class DBCheck(DBConstraint):
+    __slots__ = ("_text_",)
+
     def __init__(self, tabschema, tabname, constname, text, enforced, enablequeryopt, constraintype, comment):
         self._constname_ = constname
-        self._tabschema_ = tabschema
-        self._tabname_ = tabname
-        self._constraintype_ = constraintype
+        self._tabschema_ = compact(tabschema)
+        self._tabname_ = compact(tabname)
+        self._constraintype_ = compact(constraintype)
         self._comment_ = comment
         if enforced == "N":
             self._enforced_ = "NOT ENFORCED"
@@ -123,16 +159,19 @@ class DBCheck(DBConstraint):
 
         self._text_ = text
 
-    def __str__(self):
-        s = f"\nALTER TABLE {self._tabschema_}.{self._tabname_} ADD CONSTRAINT {self._constname_}"
-        s += f"\n    CHECK ({self._text_})"
-        s += f"\n{self._enforced_}"
-        s += f"\n{self._enablequeryopt_} @"
+    def get_attributes(self):
+        return {"kind": "C", "constname": self._constname_, "constraintype": self._constraintype_,
+                "text": normalize_text(self._text_), "enforced": self._enforced_,
+                "enablequeryopt": self._enablequeryopt_, "comment": self._comment_}
 
-        if self._comment_ is not None:
-            s += f"\n\nCOMMENT ON CONSTRAINT {self._tabschema_}.{self._tabname_}.{self._constname_} IS '{self._comment_}' @"
+    def render(self, out):
+        out.write(f"\nALTER TABLE {self._tabschema_}.{self._tabname_} ADD CONSTRAINT {self._constname_}")
+        out.write(f"\n    CHECK ({self._text_})")
+        out.write(f"\n{self._enforced_}")
+        out.write(f"\n{self._enablequeryopt_} @")
 
-        return s
+        if self._comment_ is not None:
+            out.write(f"\n\nCOMMENT ON CONSTRAINT {self._tabschema_}.{self._tabname_}.{self._constname_} IS '{self._comment_}' @")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,149 @@
+#!/usr/bin/python3
+
+import sys
+import difflib
+
+from DBHash import *
+
+
+def _name_(key):
+    if isinstance(key, tuple):
+        return ".".join(key)
+    return key
+
+
+class DBTableDiff:
+    """Object by object comparison of two versions of the same table"""
+
+    def __init__(self, t1, t2):
+        self._left_ = t1
+        self._right_ = t2
+        self._differences_ = []
+
+        if t1.get_signature() != t2.get_signature():
+            self._differences_.append(("TABLE", _name_(t1.get_key()), "changed"))
+        self._compare_("COLUMN", t1._columns_, t2._columns_)
+        self._compare_("INDEX", t1._indexes_, t2._indexes_)
+        self._compare_("CONSTRAINT", t1._constraints_, t2._constraints_)
+
+    def _compare_(self, kind, objs1, objs2):
+        d1 = {x.get_key(): x for x in objs1}
+        d2 = {x.get_key(): x for x in objs2}
+        for k, x in d1.items():
+            if k not in d2:
+                self._differences_.append((kind, _name_(k), "removed"))
+            elif x.get_signature() != d2[k].get_signature():
+                self._differences_.append((kind, _name_(k), "changed"))
+        for k in d2:
+            if k not in d1:
+                self._differences_.append((kind, _name_(k), "added"))
+
+    def differs(self):
+        return len(self._differences_) > 0
+
+    def get_differences(self):
+        return self._differences_
+
+    def unified_diff(self, name1, name2):
+        # text is only rendered for tables that actually differ
+        return difflib.unified_diff(str(self._left_).splitlines(True), str(self._right_).splitlines(True),
+                                    name1, name2)
+
+
+class DBDiff:
+    """Structural comparison of two DB models, tables are matched on (schema, name)"""
+
+    def __init__(self, db1, db2):
+        self._left_only_ = []
+        self._right_only_ = []
+        self._changed_ = []
+
+        # identical subtrees are skipped on their hashes, only tables that differ are visited
+        tables1 = {_name_(t.get_key()): t for t in db1.get_all_tables()}
+        tables2 = {_name_(t.get_key()): t for t in db2.get_all_tables()}
+        for name, what in compare_hashes(db1.get_hashes(), db2.get_hashes()):
+            if what == "removed":
+                self._left_only_.append(tables1[name].get_key())
+            elif what == "added":
+                self._right_only_.append(tables2[name].get_key())
+            else:
+                self._changed_.append(DBTableDiff(tables1[name], tables2[name]))
+
+    def is_identical(self):
+        return not (self._left_only_ or self._right_only_ or self._changed_)
+
+    def get_left_only(self):
+        return self._left_only_
+
+    def get_right_only(self):
+        return self._right_only_
+
+    def get_changed(self):
+        return self._changed_
+
+    def get_drift(self):
+        """(object, what) for every difference, what is removed, added or changed as seen from db2"""
+        drift = [(_name_(k), "removed") for k in self._left_only_]
+        drift += [(_name_(k), "added") for k in self._right_only_]
+        for d in self._changed_:
+            table = _name_(d._left_.get_key())
+            for kind, name, what in d.get_differences():
+                drift.append((table if kind == "TABLE" else f"{table} {kind} {name}", what))
+        return drift
+
+    def report(self, name1, name2, out=sys.stdout):
+        print(file=out)
+        if len(self._left_only_) > 0:
+            print(f"Only in {name1}:", file=out)
+            for k in self._left_only_:
+                print(_name_(k), file=out)
+
+        print(file=out)
+        if len(self._right_only_) > 0:
+            print(f"Only in {name2}:", file=out)
+            for k in self._right_only_:
+                print(_name_(k), file=out)
+
+        print(file=out)
+        for d in self._changed_:
+            print(f"Difference in {_name_(d._left_.get_key())}:", file=out)
+            for kind, name, what in d.get_differences():
+                print(f"    {kind} {name} {what}", file=out)
+            for line in d.unified_diff(name1, name2):
+                print(f"{line.rstrip()}", file=out)
+
+
+DRIFT_MARKS = {"removed": "-", "added": "+", "changed": "~"}
+NOT_EXTRACTED = "(not extracted)"
+
+
+def drift_matrix(baseline, drifts, out=sys.stdout):
+    """Prints one row per drifting object and one column per database.
+
+    drifts maps a database name to the get_drift() list of its DBDiff against the baseline,
+    or to None when the database could not be extracted. A database that was not extracted
+    always gets a "!" in the last row, also when nothing drifted anywhere.
+    """
+    names = list(drifts)
+    cells = dict()
+    for name, drift in drifts.items():
+        for obj, what in drift or ():
+            cells[(obj, name)] = DRIFT_MARKS[what]
+
+    objects = sorted(set(obj for obj, _ in cells))
+    failed = any(drift is None for drift in drifts.values())
+    width = max([len("object")] + [len(obj) for obj in objects] + [len(NOT_EXTRACTED)] * failed)
+    widths = [max(len(name), 1) for name in names]
+
+    print(f"Drift against {baseline}: - missing, + extra, ~ changed, ! not extracted", file=out)
+    print(" ".join(["object".ljust(width)] + [n.ljust(w) for n, w in zip(names, widths)]).rstrip(), file=out)
+    for obj in objects:
+        row = [obj.ljust(width)]
+        for name, w in zip(names, widths):
+            mark = "!" if drifts[name] is None else cells.get((obj, name), ".")
+            row.append(mark.ljust(w))
+        print(" ".join(row).rstrip(), file=out)
+    if failed:
+        row = [NOT_EXTRACTED.ljust(width)] + [("!" if drifts[name] is None else "").ljust(w)
+                                              for name, w in zip(names, widths)]
+        print(" ".join(row).rstrip(), file=out)
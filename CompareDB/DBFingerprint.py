@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+
+from DBStatement import *
+
+
+def _row_hash_(*exprs):
+    # one BIGINT per catalog row, clob columns are cut so the string fits a varchar
+    return "hash8(" + " || '|' || ".join(f"coalesce(varchar({e}), '~')" for e in exprs) + ")"
+
+
+class DBFingerprint:
+    """Aggregate hashes of the catalog rows behind each table, computed by the server.
+
+    Every catalog row that ends up in the model is hashed on its own and the hashes are summed
+    per table and per schema, so only a few rows per table travel over the network. The rows
+    carry the table name, a column moved from one table to another changes both sums. A foreign
+    key is hashed with the columns of the parent key it references, the model renders them with
+    the child, so a change of the parent key changes the child as well. The hashes are not
+    normalized like the model is, equal sums mean equal tables but a formatting change in a
+    check constraint is enough to make a table differ.
+    """
+
+    def __init__(self, conn, schemaname=None):
+        self._conn_ = conn
+        self._schemaname_ = schemaname
+
+    def _filter_(self, schemacol, schemas, params):
+        if schemas is not None:
+            params.extend(schemas)
+            markers = ", ".join(["cast(? as varchar(128))"] * len(schemas))
+            return f"{schemacol} in ({markers})"
+        if self._schemaname_ is None:
+            return f"{schemacol} in (select schemaname from nya.validation_schemas)"
+        params.append(self._schemaname_)
+        return f"{schemacol} = ?"
+
+    def _sql_(self, schemas, params):
+        # every branch of the union has its own markers
+        f = [self._filter_("t.tabschema", schemas, params) for _ in range(7)]
+        return f"""with fp (tabschema, tabname, h) as (
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "t.tbspace", "t.index_tbspace", "t.long_tbspace",
+                                   "t.append_mode", "t.compression", "t.rowcompmode", "t.tableorg",
+                                   "t.remarks")}
+                from syscat.tables t
+                where t.type = 'T' and {f[0]}
+                union all
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "c.colname", "c.colno", "c.typename", "c.length", "c.scale",
+                                   "c.typestringunits", "c.nulls", "c.codepage", "c.identity", "c.generated",
+                                   "substr(c.text, 1, 4000)", "length(c.text)", "c.default", "c.remarks",
+                                   "c.inline_length")}
+                from syscat.columns c
+                join syscat.tables t
+                    using (tabschema, tabname)
+                where t.type = 'T' and {f[1]}
+                union all
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "i.indschema", "i.indname", "i.uniquerule", "i.indextype",
+                                   "i.reverse_scans", "i.pagesplit", "i.collectstatistcs", "i.compression",
+                                   "i.remarks", "i.nullkeys", "ic.colname", "substr(ic.text, 1, 4000)",
+                                   "ic.colorder", "ic.colseq", "ix.typemodel", "ix.datatype", "ix.hashed",
+                                   "ix.length", "ix.scale", "substr(ix.pattern, 1, 4000)")}
+                from syscat.indexes i
+                join syscat.indexcoluse ic
+                    using (indschema, indname)
+                join syscat.tables t
+                    using (tabschema, tabname)
+                left join syscat.indexxmlpatterns ix
+                    using (indschema, indname)
+                where t.type = 'T' and i.indextype in ('CLUS','REG','XVIL') and {f[2]}
+                union all
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "c.constname", "c.type", "c.enforced", "c.enablequeryopt",
+                                   "c.remarks")}
+                from syscat.tabconst c
+                join syscat.tables t
+                    using (tabschema, tabname)
+                where t.type = 'T' and {f[3]}
+                union all
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "k.constname", "k.colname", "k.colseq")}
+                from syscat.keycoluse k
+                join syscat.tables t
+                    using (tabschema, tabname)
+                where t.type = 'T' and {f[4]}
+                union all
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "r.constname", "r.refkeyname", "r.reftabschema",
+                                   "r.reftabname", "r.deleterule", "r.updaterule", "k.colname", "k.colseq")}
+                from syscat.references r
+                join syscat.tables t
+                    using (tabschema, tabname)
+                join syscat.keycoluse k
+                    on (k.tabschema, k.tabname, k.constname)
+                     = (r.reftabschema, r.reftabname, r.refkeyname)
+                where t.type = 'T' and {f[5]}
+                union all
+                select t.tabschema, t.tabname
+                     , {_row_hash_("t.tabname", "c.constname", "c.type", "substr(c.text, 1, 4000)",
+                                   "length(c.text)")}
+                from syscat.checks c
+                join syscat.tables t
+                    using (tabschema, tabname)
+                where t.type = 'T' and {f[6]}
+            )"""
+
+    def get_schemas(self):
+        """{schema: (rows, hash)}"""
+        params = []
+        sql = self._sql_(None, params) + """
+            select rtrim(tabschema), count(*), sum(cast(h as decimal(31,0)))
+            from fp
+            group by tabschema"""
+        return {row[0]: (row[1], row[2]) for row in rows(self._conn_, sql, params)}
+
+    def get_tables(self, schemas=None):
+        """{(schema, table): (rows, hash)}, for the given schemas only"""
+        params = []
+        sql = self._sql_(schemas, params) + """
+            select rtrim(tabschema), rtrim(tabname), count(*), sum(cast(h as decimal(31,0)))
+            from fp
+            group by tabschema, tabname"""
+        return {(row[0], row[1]): (row[2], row[3]) for row in rows(self._conn_, sql, params)}
+
+
+def changed_tables(fp1, fp2):
+    """(schema, table) of every table whose fingerprint differs or that exists on one side only"""
+    s1, s2 = fp1.get_schemas(), fp2.get_schemas()
+    schemas = sorted(s for s in s1.keys() | s2.keys() if s1.get(s) != s2.get(s))
+    if len(schemas) == 0:
+        return []
+
+    t1, t2 = fp1.get_tables(schemas), fp2.get_tables(schemas)
+    return sorted(k for k in t1.keys() | t2.keys() if t1.get(k) != t2.get(k))
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+
+import re
+import hashlib
+
+# string literals, quoted identifiers, words and numbers, operators, single punctuation
+SQL_TOKEN = re.compile(r"""'(?:[^']|'')*'|"(?:[^"]|"")*"|[\w$#.]+|[<>=!|^]+|\S""")
+
+
+def tokenize(text):
+    return SQL_TOKEN.findall(text)
+
+
+def normalize_text(text):
+    """SQL text with whitespace and keyword case normalized, literals are left as they are"""
+    if text is None:
+        return None
+    return " ".join(t if t[0] in "'\"" else t.upper() for t in tokenize(text))
+
+
+def fingerprint(*parts):
+    """Stable content hash of signature tuples and child hashes"""
+    h = hashlib.sha256()
+    for p in parts:
+        h.update(repr(p).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def merkle(tables):
+    """Table hashes rolled up into schema hashes and one root hash"""
+    hashes = dict()
+    schemas = dict()
+    for t in tables:
+        h = t.get_hash()
+        hashes[t._tabschema_ + "." + t._tabname_] = h
+        schemas.setdefault(t._tabschema_, []).append((t._tabname_, h))
+
+    schemas = {s: fingerprint(sorted(x)) for s, x in schemas.items()}
+    root = fingerprint(sorted(schemas.items()))
+    return {"root": root, "schemas": schemas, "tables": hashes}
+
+
+def compare_hashes(h1, h2):
+    """Tables that differ between two get_hashes() results, only schemas whose hashes differ are visited"""
+    res = []
+    if h1["root"] == h2["root"]:
+        return res
+
+    for s in sorted(set(h1["schemas"]) | set(h2["schemas"])):
+        if h1["schemas"].get(s) == h2["schemas"].get(s):
+            continue
+        prefix = s + "."
+        t1 = {k: v for k, v in h1["tables"].items() if k.startswith(prefix)}
+        t2 = {k: v for k, v in h2["tables"].items() if k.startswith(prefix)}
+        for k in sorted(set(t1) | set(t2)):
+            if k not in t2:
+                res.append((k, "removed"))
+            elif k not in t1:
+                res.append((k, "added"))
+            elif t1[k] != t2[k]:
+                res.append((k, "changed"))
+    return res
@@ -1,91 +1,132 @@
 #!/usr/bin/python3
 
-import ibm_db
-import ibm_db_dbi
+import io
+
+from DBHash import *
+from DBCompact import *
 
 
 class DBIndex:
+    __slots__ = ("_tabschema_", "_tabname_", "_indschema_", "_indname_", "_columns_", "_include_",
+                 "_uniquerule_", "_indextype_", "_reverse_scans_", "_pagesplit_", "_collectstatistcs_",
+                 "_user_defined_", "_compression_", "_comment_", "_nullkeys_", "_typemodel_", "_datatype_",
+                 "_hashed_", "_length_", "_scale_", "_pattern_", "_stats_")
+
     def __init__(self, tabschema, tabname, indschema, indname, uniquerule, indextype, reverse_scans, pagesplit,
                  collectstatistcs, user_defined, compression, comment, nullkeys, typemodel, datatype, hashed, length, 
                  scale, pattern):
-        self._tabschema_ = tabschema
-        self._tabname_ = tabname
-        self._indschema_ = indschema
+        self._tabschema_ = compact(tabschema)
+        self._tabname_ = compact(tabname)
+        self._indschema_ = compact(indschema)
         self._indname_ = indname
         self._columns_ = []
         self._include_ = []
 
-        self._uniquerule_ = uniquerule
-        self._indextype_ = indextype
-        self._reverse_scans_ = reverse_scans
-        self._pagesplit_ = pagesplit
-        self._collectstatistcs_ = collectstatistcs
-        self._user_defined_ = user_defined
-        self._compression_ = compression
+        self._uniquerule_ = compact(uniquerule)
+        self._indextype_ = compact(indextype)
+        self._reverse_scans_ = compact(reverse_scans)
+        self._pagesplit_ = compact(pagesplit)
+        self._collectstatistcs_ = compact(collectstatistcs)
+        self._user_defined_ = compact(user_defined)
+        self._compression_ = compact(compression)
         self._comment_ = comment
-        self._nullkeys_ = nullkeys
-        self._typemodel_ = typemodel
-        self._datatype_ = datatype 
-        self._hashed_ = hashed
+        self._nullkeys_ = compact(nullkeys)
+        self._typemodel_ = compact(typemodel)
+        self._datatype_ = compact(datatype)
+        self._hashed_ = compact(hashed)
         self._length_ = length
         self._scale_ = scale 
         self._pattern_ = pattern
+        self._stats_ = None
 
     def add_column(self, colname):
-        self._columns_.append(colname)
+        self._columns_.append(compact(colname))
 
     def add_include(self, colname):
-        self._include_.append(colname)
-
-    def __str__(self):
-        ind = f"\nCREATE " 
+        self._include_.append(compact(colname))
+
+    def get_key(self):
+        return self._indschema_, self._indname_
+
+    def set_stats(self, stats):
+        self._stats_ = stats
+
+    def get_stats(self):
+        """Catalog statistics when the DB was read with stats=True, otherwise None"""
+        return self._stats_
+
+    def get_attributes(self):
+        """What the rendered DDL states, by name, user_defined, pagesplit and hashed are catalog details"""
+        xml = None
+        if self._indextype_ == "XVIL":
+            xml = (self._pattern_, self._datatype_,
+                   self._length_ if self._datatype_ in ("CHARACTER", "VARCHAR") else None, self._typemodel_ == "R")
+        collect = self._collectstatistcs_ if self._collectstatistcs_ in ("D", "S", "Y") else ""
+        return {"indschema": self._indschema_, "indname": self._indname_, "columns": tuple(self._columns_),
+                "include": tuple(self._include_), "uniquerule": self._uniquerule_, "indextype": self._indextype_,
+                "reverse_scans": self._reverse_scans_ == "Y", "collect": collect,
+                "compression": self._compression_ == "Y", "comment": self._comment_,
+                "nullkeys": self._nullkeys_ == "N", "xml": xml}
+
+    def get_signature(self):
+        return tuple(self.get_attributes().values())
+
+    def get_hash(self):
+        return fingerprint(self.get_signature())
+
+    def render(self, out):
+        out.write(f"\nCREATE ")
         if self._uniquerule_ in ("P", "U"):
-            ind += "UNIQUE "
-        ind += f"INDEX {self._indschema_}.{self._indname_} ON {self._tabschema_}.{self._tabname_}"
-        ind += "\n    ("
-        ind += f", ".join(self._columns_)
-        ind += ")"
+            out.write("UNIQUE ")
+        out.write(f"INDEX {self._indschema_}.{self._indname_} ON {self._tabschema_}.{self._tabname_}")
+        out.write("\n    (")
+        out.write(f", ".join(self._columns_))
+        out.write(")")
         if len(self._include_) > 0:
-            ind += "\nINCLUDE (" + f", ".join(self._include_) + ")"
+            out.write("\nINCLUDE (" + f", ".join(self._include_) + ")")
 
         if self._indextype_ == 'XVIL':
-            ind += f"""\nGENERATE KEY USING XMLPATTERN '{self._pattern_}'
-              AS SQL {self._datatype_}"""
+            out.write(f"""\nGENERATE KEY USING XMLPATTERN '{self._pattern_}'
+              AS SQL {self._datatype_}""")
             
             if self._datatype_ in ['CHARACTER', 'VARCHAR']: #and self._hashed_ == 'N':
-                ind += f"({self._length_} OCTETS)"
+                out.write(f"({self._length_} OCTETS)")
 
             if self._typemodel_ == 'R':
-                ind += " REJECT INVALID VALUES"
+                out.write(" REJECT INVALID VALUES")
             else:
-                ind += " IGNORE INVALID VALUES"
+                out.write(" IGNORE INVALID VALUES")
 
         if self._compression_ == "Y":
-            ind += "\nCOMPRESS YES"
+            out.write("\nCOMPRESS YES")
         else:
-            ind += "\nCOMPRESS NO"
+            out.write("\nCOMPRESS NO")
 
         if self._nullkeys_ == "N":
-            ind += "\nEXCLUDE NULL KEYS"
+            out.write("\nEXCLUDE NULL KEYS")
 
         if self._indextype_ == "CLUS":
-            ind += "\nCLUSTER"
+            out.write("\nCLUSTER")
 
         if self._reverse_scans_ == "Y":
-            ind += "\nALLOW REVERSE SCANS" 
+            out.write("\nALLOW REVERSE SCANS")
 
         if self._collectstatistcs_ == "D":
-            ind += "\nCOLLECT DETAILED STATISTICS"
+            out.write("\nCOLLECT DETAILED STATISTICS")
         elif self._collectstatistcs_ == "S":
-            ind += "\nCOLLECT SAMPLED DETAILED STATISTICS"
+            out.write("\nCOLLECT SAMPLED DETAILED STATISTICS")
         elif self._collectstatistcs_ == "Y":
-            ind += "\nCOLLECT STATISTICS"
-        ind += " @"
+            out.write("\nCOLLECT STATISTICS")
+        out.write(" @")
 
         if self._comment_ is not None:
-            ind += f"\n\nCOMMENT ON INDEX {self._indschema_}.{self._indname_} IS '{self._comment_}' @"
+            out.write(f"\n\nCOMMENT ON INDEX {self._indschema_}.{self._indname_} IS '{self._comment_}' @")
+
 
-        return ind
+    def __str__(self):
+        out = io.StringIO()
+        self.render(out)
+        return out.getvalue()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,135 @@
+#!/usr/bin/python3
+
+import re
+import json
+import time
+import hashlib
+import resource
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+REPORT_VERSION = 1
+
+_profile_ = None
+
+
+def enable():
+    """Starts recording, returns the profile that the queries and phases are recorded into"""
+    global _profile_
+    _profile_ = DBProfile()
+    return _profile_
+
+
+def get_profile():
+    """The active profile or None, instrumentation is a no-op until enable() is called"""
+    return _profile_
+
+
+@contextmanager
+def phase(name):
+    """Times a phase of a run when profiling is enabled, does nothing otherwise"""
+    if _profile_ is None:
+        yield
+    else:
+        with _profile_.phase(name):
+            yield
+
+
+def view(sql):
+    """The first table of the outermost FROM of sql, FROMs of subqueries and common table expressions
+    are inside parentheses and are skipped"""
+    depth = 0
+    for m in re.finditer(r"'[^']*'|\(|\)|\bfrom\s+([\w.]+)", sql, re.IGNORECASE):
+        if m.group(0) == "(":
+            depth += 1
+        elif m.group(0) == ")":
+            depth -= 1
+        elif depth == 0 and m.group(1) is not None:
+            return m.group(1).lower()
+    return None
+
+
+def row_size(row):
+    # payload of the values as they arrive, not the exact bytes on the wire
+    n = 0
+    for x in row:
+        if x is None:
+            continue
+        n += len(x) if isinstance(x, (str, bytes)) else 8
+    return n
+
+
+class DBProfile:
+    """Wall time, rows and bytes per catalog query, time and tracemalloc peak per phase.
+
+    A query is split into execute time and the time spent inside the driver fetching rows,
+    whatever else passes between the first and the last row is the Python side building
+    objects. Phases nest, the peak of an outer phase includes the peaks of its inner phases.
+    Phases are meant to be opened from one thread, queries may come from any thread.
+    """
+
+    def __init__(self):
+        self._lock_ = threading.Lock()
+        self._queries_ = []
+        self._statements_ = dict()
+        self._phases_ = []
+        self._peaks_ = []
+        self._start_ = time.perf_counter()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+
+    def query(self, sql, rows, size, execute_s, fetch_s, wall_s):
+        digest = hashlib.sha1(sql.encode()).hexdigest()[:12]
+        with self._lock_:
+            self._statements_[digest] = " ".join(sql.split())
+            self._queries_.append({
+                "statement": digest,
+                "view": view(sql),
+                "rows": rows,
+                "bytes": size,
+                "execute_s": round(execute_s, 6),
+                "fetch_s": round(fetch_s, 6),
+                "wall_s": round(wall_s, 6),
+            })
+
+    @contextmanager
+    def phase(self, name):
+        if self._peaks_:
+            self._peaks_[-1] = max(self._peaks_[-1], tracemalloc.get_traced_memory()[1])
+        self._peaks_.append(0)
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            seconds = time.perf_counter() - start
+            peak = max(self._peaks_.pop(), tracemalloc.get_traced_memory()[1])
+            if self._peaks_:
+                self._peaks_[-1] = max(self._peaks_[-1], peak)
+            self._phases_.append({"phase": name, "seconds": round(seconds, 6), "peak_bytes": peak})
+
+    def report(self):
+        with self._lock_:
+            queries = list(self._queries_)
+            statements = dict(self._statements_)
+        return {
+            "version": REPORT_VERSION,
+            "total_s": round(time.perf_counter() - self._start_, 6),
+            "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+            "phases": list(self._phases_),
+            "queries": queries,
+            "statements": statements,
+            "totals": {
+                "queries": len(queries),
+                "rows": sum(q["rows"] for q in queries),
+                "bytes": sum(q["bytes"] for q in queries),
+                "execute_s": round(sum(q["execute_s"] for q in queries), 6),
+                "fetch_s": round(sum(q["fetch_s"] for q in queries), 6),
+            },
+        }
+
+    def dump(self, path):
+        with open(path, "w") as f:
+            json.dump(self.report(), f, indent=2)
+            f.write("\n")
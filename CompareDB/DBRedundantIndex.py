@@ -0,0 +1,111 @@
+#!/usr/bin/python3
+
+import sys
+
+# LASTUSED before any use was recorded
+NEVER_USED = "0001-01-01"
+
+DUPLICATE = "duplicate of"
+PREFIX = "left prefix of"
+UNIQUE_INCLUDE = "covered by unique"
+
+
+def _rank_(i):
+    # the index that is kept when two are duplicates: constraints and clustering first,
+    # then the one with more INCLUDE columns and the one that was used
+    stats = i.get_stats() or {}
+    lastused = str(stats.get("lastused") or NEVER_USED)
+    return ({"P": 2, "U": 1}.get(i._uniquerule_, 0), i._indextype_ == "CLUS", len(i._include_), lastused,
+            i._indname_)
+
+
+def _names_(columns):
+    # column names without the sort order
+    return [c[:-len(" DESC")] if c.endswith(" DESC") else c for c in columns]
+
+
+class DBRedundantIndex:
+    """Indexes whose work another index on the same table already does.
+
+    An index is redundant when another index has the same key, when its key is a left prefix
+    of another key, or when a unique index has its key as a prefix and carries the rest of its
+    columns as INCLUDE columns, a unique key finds at most one row so the order of the other
+    columns does not matter. In every case the other index also has to carry the INCLUDE
+    columns of the index, otherwise they still serve index only access. Primary key and
+    clustering indexes are never reported, unique indexes only as exact duplicates. With
+    statistics the leaf pages give the size and the levels the pages an insert or delete has
+    to touch in addition.
+    """
+
+    def __init__(self, db):
+        self._findings_ = []
+        for t in db.get_all_tables():
+            self._check_table_(t)
+        self._findings_.sort(key=lambda x: -(self.get_overhead(x[1])[0] or 0))
+
+    def _check_table_(self, t):
+        # an index that is reported is not used to cover another one, what it covered is covered
+        # by the index that made it redundant
+        indexes = [i for i in t._indexes_ if i._indextype_ in ("REG", "CLUS")]
+        redundant = set()
+        for reason in (DUPLICATE, PREFIX, UNIQUE_INCLUDE):
+            for b in indexes:
+                if b._uniquerule_ == "P" or b._indextype_ == "CLUS" or id(b) in redundant:
+                    continue
+                a = next((a for a in indexes
+                          if a is not b and id(a) not in redundant and self._covers_(a, b, reason)), None)
+                if a is not None:
+                    self._findings_.append((t, b, a, reason))
+                    redundant.add(id(b))
+
+    def _covers_(self, a, b, reason):
+        if reason == DUPLICATE:
+            # of two duplicates only the lower ranked one is redundant
+            return a._columns_ == b._columns_ and set(b._include_) <= set(a._include_) and \
+                (b._uniquerule_ == "D" or a._uniquerule_ != "D") and _rank_(a) > _rank_(b)
+
+        if b._uniquerule_ != "D":
+            return False
+        if reason == PREFIX:
+            # INCLUDE columns of b that a does not have make b serve index only access
+            return len(b._columns_) < len(a._columns_) and a._columns_[:len(b._columns_)] == b._columns_ and \
+                set(b._include_) <= set(_names_(a._columns_)) | set(a._include_)
+
+        # UNIQUE_INCLUDE
+        if a._uniquerule_ == "D":
+            return False
+        key, names = _names_(a._columns_), _names_(b._columns_)
+        return names[:len(key)] == key and set(names[len(key):]) | set(b._include_) <= set(key) | set(a._include_)
+
+    def get_findings(self):
+        """(table, redundant index, covering index, reason), largest indexes first"""
+        return self._findings_
+
+    def get_overhead(self, i):
+        """(bytes, levels, lastused) of an index, None for what the statistics do not tell"""
+        stats = i.get_stats() or {}
+        nleaf, pagesize = stats.get("nleaf"), stats.get("pagesize")
+        size = nleaf * pagesize if nleaf is not None and nleaf >= 0 and pagesize else None
+        lastused = stats.get("lastused")
+        if lastused is not None and str(lastused).startswith(NEVER_USED):
+            lastused = "never"
+        return size, stats.get("nlevels"), lastused
+
+    def report(self, out=sys.stdout):
+        print(f"{len(self._findings_)} redundant indexes", file=out)
+        for t, b, a, reason in self._findings_:
+            size, levels, lastused = self.get_overhead(b)
+            card = (t.get_stats() or {}).get("card")
+            print(f"\n{b._indschema_}.{b._indname_} ON {t._tabschema_}.{t._tabname_} ({', '.join(b._columns_)})",
+                  file=out)
+            print(f"    {reason} {a._indschema_}.{a._indname_} ({', '.join(a._columns_)})"
+                  + (f" INCLUDE ({', '.join(a._include_)})" if a._include_ else ""), file=out)
+            print(f"    size {'?' if size is None else f'{size / 2**20:.1f} MiB'}"
+                  f", {'?' if levels is None else levels} extra page touches per insert or delete"
+                  f" on {'?' if card is None else card} rows, last used {lastused or '?'}", file=out)
+
+    def script(self, out=sys.stdout):
+        out.write("--#SET TERMINATOR @\n")
+        for t, b, a, reason in self._findings_:
+            out.write(f"\n-- {reason} {a._indschema_}.{a._indname_}")
+            out.write(f"\nDROP INDEX {b._indschema_}.{b._indname_} @\n")
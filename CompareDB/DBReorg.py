@@ -0,0 +1,207 @@
+#!/usr/bin/python3
+
+import sys
+
+from DBStaleStats import runstats
+
+# page and record overheads of the REORGCHK formulas, for indexes in LARGE table spaces
+TABLE_PAGE_OVERHEAD = 68
+INDEX_PAGE_OVERHEAD = 96
+LEAF_RECSIZE_OVERHEAD = 11
+NONLEAF_RECSIZE_OVERHEAD = 14
+DUPKEYSIZE = 9
+
+# tables smaller than this are reported but not reorganized
+MIN_PAGES = 100
+
+TABLE_FORMULAS = ("F1", "F2", "F3")
+INDEX_FORMULAS = ("F4", "F5", "F6", "F7", "F8")
+
+FORMULAS = {
+    "F1": "100 * OVERFLOW / CARD < 5",
+    "F2": "100 * effective space utilization of data pages > 70",
+    "F3": "100 * NPAGES / FPAGES > 80",
+    "F4": "CLUSTERRATIO or normalized CLUSTERFACTOR > 80",
+    "F5": "100 * space used on leaf pages > MIN(50, 100 - PCTFREE)",
+    "F6": "100 * keys the index could hold with one level less / keys < 100",
+    "F7": "100 * NUMRIDS_DELETED / (NUMRIDS_DELETED + CARD) < 20",
+    "F8": "100 * NUM_EMPTY_LEAFS / NLEAF < 20",
+}
+
+
+def _known_(*values):
+    # -1 is what the catalog has when statistics were not collected
+    return all(x is not None and x >= 0 for x in values)
+
+
+def _leaf_space_(stats, card):
+    keys = stats.get("fullkeycard")
+    size = stats.get("avgleafkeysize")
+    if not _known_(keys, size, card):
+        return None
+    return keys * (size + LEAF_RECSIZE_OVERHEAD) + max(card - keys, 0) * DUPKEYSIZE
+
+
+def table_formulas(t):
+    """{formula: value} of F1 to F3 for a table, None where the statistics are missing"""
+    s = t.get_stats() or {}
+    card, npages, fpages, overflow = s.get("card"), s.get("npages"), s.get("fpages"), s.get("overflow")
+    avgrowsize, pagesize = s.get("avgrowsize"), s.get("pagesize")
+    f = dict.fromkeys(TABLE_FORMULAS)
+    if _known_(card, overflow) and card > 0:
+        f["F1"] = 100 * overflow / card
+    if _known_(card, avgrowsize, fpages, pagesize) and fpages > 0:
+        f["F2"] = 100 * card * avgrowsize / (fpages * (pagesize - TABLE_PAGE_OVERHEAD))
+    if _known_(npages, fpages) and fpages > 0:
+        f["F3"] = 100 * npages / fpages
+    return f
+
+
+def index_formulas(i, card):
+    """{formula: value} of F4 to F8 for an index on a table of card rows"""
+    s = i.get_stats() or {}
+    nleaf, nlevels, empty = s.get("nleaf"), s.get("nlevels"), s.get("num_empty_leafs")
+    pctfree, pagesize, deleted = s.get("pctfree"), s.get("pagesize"), s.get("numrids_deleted")
+    f = dict.fromkeys(INDEX_FORMULAS)
+    if _known_(s.get("clusterratio")):
+        f["F4"] = s["clusterratio"]
+    elif _known_(s.get("clusterfactor")):
+        f["F4"] = 100 * s["clusterfactor"]
+
+    space = _leaf_space_(s, card)
+    if space and _known_(nleaf, empty, pagesize) and nleaf - empty - 1 > 0:
+        f["F5"] = 100 * space / ((nleaf - empty - 1) * (pagesize - INDEX_PAGE_OVERHEAD))
+    nsize = s.get("avgnleafkeysize")
+    if space and _known_(nlevels, pctfree, pagesize, nsize) and nlevels > 1:
+        usable = pagesize - INDEX_PAGE_OVERHEAD
+        f["F6"] = (100 - pctfree) * (usable / (nsize + NONLEAF_RECSIZE_OVERHEAD)) ** (nlevels - 2) * usable / space
+    if _known_(deleted, card) and deleted + card > 0:
+        f["F7"] = 100 * deleted / (deleted + card)
+    if _known_(empty, nleaf) and nleaf > 0:
+        f["F8"] = 100 * empty / nleaf
+    return f
+
+
+def fails(name, value, pctfree=None):
+    """True when a formula value is outside of what REORGCHK accepts"""
+    if value is None:
+        return False
+    if name in ("F1", "F7", "F8"):
+        return value >= {"F1": 5, "F7": 20, "F8": 20}[name]
+    if name == "F5":
+        return value <= min(50, 100 - (pctfree if _known_(pctfree) else 10))
+    if name == "F6":
+        return value >= 100
+    return value <= {"F2": 70, "F3": 80, "F4": 80}[name]
+
+
+def _flags_(formulas, pctfree=None):
+    return "".join("*" if fails(k, v, pctfree) else "-" for k, v in formulas.items())
+
+
+class DBReorg:
+    """REORGCHK over the statistics of the extracted tables and indexes.
+
+    F1 to F3 tell whether a table has overflow rows and free space to give back, F4 whether an
+    index still follows the order of the rows and F5 to F8 whether an index has sparse or empty
+    leaf pages, pseudo deleted keys or a level more than it needs. F4 leads to a reorg only for
+    the clustering index, that is the order REORG TABLE restores. A table reorg rebuilds its
+    indexes, an index reorg is only proposed where the table is fine.
+
+    The benefit of a reorg is estimated in pages, the overflow rows that cost an extra read, the
+    pages above what the rows need, the pages read out of order through the clustering index and
+    the empty and sparse leaf pages. The script runs the reorgs with the most benefit per page
+    rewritten first.
+    """
+
+    def __init__(self, db):
+        self._tables_ = []
+        self._findings_ = []
+        for t in db.get_all_tables():
+            self._check_table_(t)
+        self._findings_.sort(key=lambda x: (-x[3], x[0].get_key()))
+
+    def _check_table_(self, t):
+        s = t.get_stats() or {}
+        card = s.get("card")
+        formulas = table_formulas(t)
+        indexes = []
+        for i in t._indexes_:
+            if i._indextype_ in ("REG", "CLUS"):
+                indexes.append((i, index_formulas(i, card)))
+        self._tables_.append((t, formulas, indexes))
+
+        fpages = s.get("fpages")
+        if not _known_(fpages) or fpages < MIN_PAGES:
+            return
+
+        pagesize = s.get("pagesize") or 0
+        nleaf = sum(max((i.get_stats() or {}).get("nleaf") or 0, 0) for i, f in indexes)
+        clustering = next(((i, f) for i, f in indexes if i._indextype_ == "CLUS"), None)
+        reorg_table = any(fails(k, v) for k, v in formulas.items()) or \
+            (clustering is not None and fails("F4", clustering[1]["F4"]))
+
+        if reorg_table:
+            benefit = max(s.get("overflow") or 0, 0)
+            if _known_(card, s.get("avgrowsize")) and pagesize > TABLE_PAGE_OVERHEAD:
+                benefit += max(fpages - card * s["avgrowsize"] / (pagesize - TABLE_PAGE_OVERHEAD), 0)
+            if clustering is not None and fails("F4", clustering[1]["F4"]):
+                benefit += max(s.get("npages") or 0, 0) * (100 - clustering[1]["F4"]) / 100
+            index = f" INDEX {clustering[0]._indschema_}.{clustering[0]._indname_}" if clustering else ""
+            command = f"REORG TABLE {t._tabschema_}.{t._tabname_}{index}"
+            self._findings_.append((t, command, benefit, benefit / (fpages + nleaf)))
+            return
+
+        failing = set()
+        benefit = 0
+        for i, f in indexes:
+            stats = i.get_stats() or {}
+            names = {k for k, v in f.items() if k != "F4" and fails(k, v, stats.get("pctfree"))}
+            if not names:
+                continue
+            failing |= names
+            space = _leaf_space_(stats, card)
+            pctfree = stats.get("pctfree") if _known_(stats.get("pctfree")) else 10
+            leaves = max(stats.get("nleaf") or 0, 0)
+            if space and _known_(stats.get("pagesize")):
+                needed = space / ((stats["pagesize"] - INDEX_PAGE_OVERHEAD) * (100 - pctfree) / 100)
+                benefit += max(leaves - needed, 0)
+            else:
+                benefit += max(stats.get("num_empty_leafs") or 0, 0)
+        if failing and nleaf > 0:
+            # pseudo deleted keys and empty pages alone only need a cleanup
+            cleanup = " CLEANUP ALL" if failing <= {"F7", "F8"} else ""
+            command = f"REORG INDEXES ALL FOR TABLE {t._tabschema_}.{t._tabname_} ALLOW WRITE ACCESS{cleanup}"
+            self._findings_.append((t, command, benefit, benefit / nleaf))
+
+    def get_findings(self):
+        """(table, reorg command, pages gained, pages gained per page rewritten), best first"""
+        return self._findings_
+
+    def report(self, out=sys.stdout):
+        for name in TABLE_FORMULAS + INDEX_FORMULAS:
+            print(f"{name}: {FORMULAS[name]}", file=out)
+
+        for t, formulas, indexes in self._tables_:
+            s = t.get_stats() or {}
+            values = " ".join(f"{k} {'?' if v is None else round(v)}" for k, v in formulas.items())
+            print(f"\n{t._tabschema_}.{t._tabname_} card {s.get('card', '?')} npages {s.get('npages', '?')}"
+                  f" fpages {s.get('fpages', '?')} overflow {s.get('overflow', '?')}: {values} {_flags_(formulas)}",
+                  file=out)
+            for i, f in indexes:
+                stats = i.get_stats() or {}
+                values = " ".join(f"{k} {'?' if v is None else round(v)}" for k, v in f.items())
+                print(f"    {i._indschema_}.{i._indname_} nleaf {stats.get('nleaf', '?')}"
+                      f" nlevels {stats.get('nlevels', '?')}: {values} {_flags_(f, stats.get('pctfree'))}",
+                      file=out)
+
+        print(f"\n{len(self._findings_)} reorgs recommended", file=out)
+        for t, command, benefit, ratio in self._findings_:
+            print(f"    {command}: {round(benefit)} pages, {ratio:.2f} per page rewritten", file=out)
+
+    def script(self, out=sys.stdout):
+        out.write("--#SET TERMINATOR @\n")
+        for t, command, benefit, ratio in self._findings_:
+            out.write(f"\n-- {round(benefit)} pages, {ratio:.2f} per page rewritten")
+            out.write(f"\nCALL SYSPROC.ADMIN_CMD('{command}') @")
+            out.write(f"\nCALL SYSPROC.ADMIN_CMD('{runstats(t)}') @\n")
@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import os
+import pickle
+
+from DBHash import *
+
+SNAPSHOT_VERSION = 2
+
+
+class DBSnapshot:
+    """Extracted tables from a previous run, stored with the catalog stamp of every table.
+
+    A stamp is the table ALTER_TIME together with the newest index CREATE_TIME and the
+    number of indexes and constraints, so that created and dropped objects are noticed.
+    Comments changed with COMMENT ON do not touch any of these and are not detected.
+    """
+
+    def __init__(self, cachedir, dbname, hostname, port, schemaname, tablename, tablelist=None):
+        name = f"{dbname}@{hostname}_{port}_{schemaname or '-'}_{tablename or '-'}"
+        if tablelist is not None:
+            name += "_" + fingerprint(tablelist)[:16]
+        name += ".snapshot"
+        self._path_ = os.path.join(cachedir, name)
+        self._stamps_ = dict()
+        self._tables_ = list()
+
+    def load(self):
+        """Returns False if there is no usable snapshot"""
+        try:
+            with open(self._path_, "rb") as f:
+                version, stamps, tables = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return False
+
+        if version != SNAPSHOT_VERSION:
+            return False
+
+        self._stamps_ = stamps
+        self._tables_ = tables
+        return True
+
+    def save(self, stamps, tables):
+        # write and rename so that a concurrent reader never sees half a file
+        tmp = self._path_ + ".tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump((SNAPSHOT_VERSION, stamps, tables), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path_)
+
+    def get_changed(self, stamps):
+        return [k for k, v in stamps.items() if self._stamps_.get(k) != v]
+
+    def get_tables(self):
+        return self._tables_
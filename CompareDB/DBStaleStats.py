@@ -0,0 +1,77 @@
+#!/usr/bin/python3
+
+import sys
+
+# share of the rows modified since the last runstats that makes statistics stale
+STALE_RATIO = 0.1
+
+# age that makes statistics stale when there are no modification counters
+STALE_DAYS = 30
+
+NEVER = "never collected"
+
+
+def _index_detail_(t):
+    # the most detailed COLLECT STATISTICS any index of the table was created with
+    collect = {i._collectstatistcs_ for i in t._indexes_}
+    if "D" in collect:
+        return "DETAILED "
+    if "S" in collect:
+        return "SAMPLED DETAILED "
+    return ""
+
+
+def runstats(t):
+    """RUNSTATS command for a table, its statistics profile when it has one"""
+    name = f"{t._tabschema_}.{t._tabname_}"
+    if (t.get_stats() or {}).get("profile"):
+        return f"RUNSTATS ON TABLE {name} USE PROFILE ALLOW WRITE ACCESS"
+    return f"RUNSTATS ON TABLE {name} WITH DISTRIBUTION AND {_index_detail_(t)}INDEXES ALL ALLOW WRITE ACCESS"
+
+
+class DBStaleStats:
+    """Tables whose statistics no longer describe their data, most harmful first.
+
+    Statistics are stale when they were never collected, when the rows modified since the last
+    RUNSTATS, as counted by MON_GET_TABLE, are more than STALE_RATIO of CARD, or, when the
+    counters could not be read, when they are older than STALE_DAYS. The optimizer impact is
+    estimated as the pages of the table times the share of it that changed, or times the age
+    in units of STALE_DAYS. Tables never collected come first, there is nothing to go on.
+    """
+
+    def __init__(self, db):
+        self._findings_ = []
+        for t in db.get_all_tables():
+            stats = t.get_stats()
+            if stats is None:
+                continue
+            npages = max(stats.get("npages") or 0, 1)
+            card = stats.get("card")
+            modified = stats.get("modified")
+            days = stats.get("stats_days")
+            if stats.get("stats_time") is None:
+                self._findings_.append((t, NEVER, float("inf")))
+            elif modified is not None and card is not None and card >= 0:
+                ratio = modified / max(card, 1)
+                if ratio >= STALE_RATIO:
+                    self._findings_.append((t, f"{modified} rows modified, {ratio:.0%} of {card}",
+                                            npages * ratio))
+            elif modified is None and days is not None and days >= STALE_DAYS:
+                self._findings_.append((t, f"collected {days} days ago", npages * days / STALE_DAYS))
+        self._findings_.sort(key=lambda x: (-x[2], x[0].get_key()))
+
+    def get_findings(self):
+        """(table, reason, impact), highest impact first"""
+        return self._findings_
+
+    def report(self, out=sys.stdout):
+        print(f"{len(self._findings_)} tables with stale statistics", file=out)
+        for t, reason, impact in self._findings_:
+            print(f"\n{t._tabschema_}.{t._tabname_}", file=out)
+            print(f"    {reason}, impact {'?' if impact == float('inf') else round(impact)}", file=out)
+
+    def script(self, out=sys.stdout):
+        out.write("--#SET TERMINATOR @\n")
+        for t, reason, impact in self._findings_:
+            out.write(f"\n-- {reason}")
+            out.write(f"\nCALL SYSPROC.ADMIN_CMD('{runstats(t)}') @\n")
@@ -0,0 +1,87 @@
+#!/usr/bin/python3
+
+import sys
+import time
+import threading
+
+import ibm_db
+
+import DBProfile
+
+# prepared statements per connection, keyed on the statement text
+_statements_ = dict()
+_lock_ = threading.Lock()
+
+
+def prepare(conn, sql):
+    """Prepared statement for sql, prepared once per connection and reused by every DB instance"""
+    with _lock_:
+        statements = _statements_.setdefault(conn, dict())
+        stmt = statements.get(sql)
+        if stmt is None:
+            stmt = ibm_db.prepare(conn, sql)
+            statements[sql] = stmt
+    return stmt
+
+
+def rows(conn, sql, params=()):
+    """Executes a cached statement and streams its rows as tuples"""
+    profile = DBProfile.get_profile()
+    if profile is not None:
+        yield from _profiled_rows_(profile, conn, sql, params)
+        return
+
+    stmt = prepare(conn, sql)
+    ibm_db.execute(stmt, tuple(params))
+    try:
+        row = ibm_db.fetch_tuple(stmt)
+        while row:
+            yield row
+            row = ibm_db.fetch_tuple(stmt)
+    finally:
+        # closes the cursor, the statement stays prepared
+        ibm_db.free_result(stmt)
+
+
+def _profiled_rows_(profile, conn, sql, params):
+    # same as rows(), with the time spent in the driver measured apart from the consumer
+    start = time.perf_counter()
+    stmt = prepare(conn, sql)
+    ibm_db.execute(stmt, tuple(params))
+    execute_s = time.perf_counter() - start
+    fetch_s = 0.0
+    count = 0
+    size = 0
+    try:
+        while True:
+            t = time.perf_counter()
+            row = ibm_db.fetch_tuple(stmt)
+            fetch_s += time.perf_counter() - t
+            if not row:
+                break
+            count += 1
+            size += DBProfile.row_size(row)
+            yield row
+    finally:
+        ibm_db.free_result(stmt)
+        profile.query(sql, count, size, execute_s, fetch_s, time.perf_counter() - start)
+
+
+def set_fetch_buffer(conn, size):
+    """Bytes the driver asks the server for per block, the batch that rows arrive in.
+
+    A driver that does not export SQL_ATTR_FET_BUF_SIZE or does not accept it keeps its default
+    and the size is reported as unsupported.
+    """
+    attribute = getattr(ibm_db, "SQL_ATTR_FET_BUF_SIZE", None)
+    if attribute is None or not ibm_db.set_option(conn, {attribute: size}, 1):
+        print(f"fetch buffer size {size} is not supported by this ibm_db, the driver default is used",
+              file=sys.stderr)
+
+
+def forget(conn):
+    """Drops the statements of a connection, call it before the connection is closed"""
+    with _lock_:
+        statements = _statements_.pop(conn, dict())
+    for stmt in statements.values():
+        ibm_db.free_stmt(stmt)
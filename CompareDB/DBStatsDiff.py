@@ -0,0 +1,96 @@
+#!/usr/bin/python3
+
+import sys
+
+from DBDiff import _name_
+
+# ratio between the two values above which a statistic is reported
+STATS_THRESHOLD = 2.0
+
+
+def _known_(x):
+    # -1 is what the catalog has when statistics were not collected
+    return x is not None and x >= 0
+
+
+def _cluster_(stats):
+    # CLUSTERRATIO, or the normalized CLUSTERFACTOR of detailed statistics
+    if _known_(stats.get("clusterratio")):
+        return stats["clusterratio"]
+    if _known_(stats.get("clusterfactor")):
+        return round(100 * stats["clusterfactor"])
+    return -1
+
+
+def ratio(x1, x2):
+    """How many times larger the larger value is, one is added to both so that zero compares"""
+    return (max(x1, x2) + 1) / (min(x1, x2) + 1)
+
+
+class DBStatsDiff:
+    """Statistics of the tables, columns and indexes two databases have in common.
+
+    Tables and indexes are matched on the same keys as the DDL comparison. CARD, NPAGES,
+    COLCARD and the cluster ratio are reported when one value is more than threshold times the
+    other, or when they were collected on one side only. Distribution statistics are reported
+    when a column has them on one side only. STATS_TIME is shown with every table that differs,
+    statistics collected at different times usually explain the rest.
+    """
+
+    def __init__(self, db1, db2, threshold=STATS_THRESHOLD):
+        self._threshold_ = threshold
+        self._findings_ = []
+        tables2 = {t.get_key(): t for t in db2.get_all_tables()}
+        for t1 in db1.get_all_tables():
+            t2 = tables2.get(t1.get_key())
+            if t2 is not None:
+                self._compare_table_(t1, t2)
+
+    def _check_(self, differences, what, x1, x2):
+        if not _known_(x1) and not _known_(x2):
+            return
+        if not _known_(x1) or not _known_(x2) or ratio(x1, x2) > self._threshold_:
+            differences.append((what, "-" if not _known_(x1) else x1, "-" if not _known_(x2) else x2))
+
+    def _compare_table_(self, t1, t2):
+        s1, s2 = t1.get_stats() or {}, t2.get_stats() or {}
+        differences = []
+        for name in ("card", "npages"):
+            self._check_(differences, name.upper(), s1.get(name), s2.get(name))
+
+        columns1, columns2 = s1.get("columns", {}), s2.get("columns", {})
+        for colname, (colcard1, dist1) in columns1.items():
+            if colname not in columns2:
+                continue
+            colcard2, dist2 = columns2[colname]
+            self._check_(differences, f"COLUMN {colname} COLCARD", colcard1, colcard2)
+            if dist1 != dist2:
+                differences.append((f"COLUMN {colname} DISTRIBUTION", "yes" if dist1 else "no",
+                                    "yes" if dist2 else "no"))
+
+        indexes2 = {i.get_key(): i for i in t2._indexes_}
+        for i1 in t1._indexes_:
+            i2 = indexes2.get(i1.get_key())
+            if i2 is None:
+                continue
+            x1, x2 = i1.get_stats() or {}, i2.get_stats() or {}
+            self._check_(differences, f"INDEX {_name_(i1.get_key())} NLEAF", x1.get("nleaf"), x2.get("nleaf"))
+            self._check_(differences, f"INDEX {_name_(i1.get_key())} CLUSTERRATIO", _cluster_(x1), _cluster_(x2))
+
+        if differences:
+            self._findings_.append((t1.get_key(), s1.get("stats_time"), s2.get("stats_time"), differences))
+
+    def get_findings(self):
+        """[((schema, table), stats_time1, stats_time2, [(statistic, value1, value2), ...]), ...]"""
+        return self._findings_
+
+    def is_identical(self):
+        return len(self._findings_) == 0
+
+    def report(self, name1, name2, out=sys.stdout):
+        print(file=out)
+        for key, time1, time2, differences in self._findings_:
+            print(f"Statistics differ in {_name_(key)}:", file=out)
+            print(f"    STATS_TIME {name1}: {time1 or 'never'}, {name2}: {time2 or 'never'}", file=out)
+            for what, x1, x2 in differences:
+                print(f"    {what} {name1}: {x1}, {name2}: {x2}", file=out)
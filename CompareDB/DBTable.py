@@ -1,18 +1,25 @@
 #!/usr/bin/python3
 
+import io
+
 from DBColumn import *
 from DBIndex import *
 from DBConstraint import *
+from DBCompact import *
 
 
 class DBTable:
+    __slots__ = ("_tabschema_", "_tabname_", "_tbspace_", "_index_tbspace_", "_long_tbspace_", "_append_mode_",
+                 "_compress_", "_tableorg_", "_columns_", "_indexes_", "_constraints_", "_table_comment_", "_db_",
+                 "_stats_")
+
     def __init__(self, tabschema, tabname, tbspace, index_tbspace, long_tbspace,
                  append_mode, compression, rowcompmode, tableorg, table_comment):
-        self._tabschema_ = tabschema
+        self._tabschema_ = compact(tabschema)
         self._tabname_ = tabname
-        self._tbspace_ = tbspace
-        self._index_tbspace_ = index_tbspace
-        self._long_tbspace_ = long_tbspace
+        self._tbspace_ = compact(tbspace)
+        self._index_tbspace_ = compact(index_tbspace)
+        self._long_tbspace_ = compact(long_tbspace)
         self._append_mode_ = append_mode
         if compression == "R":
             self._compress_ = "COMPRESS YES"
@@ -23,6 +30,7 @@ class DBTable:
 
         else:
             self._compress_ = "COMPRESS NO"
+        self._compress_ = compact(self._compress_)
 
         # if append_mode == "Y":
 
@@ -31,13 +39,14 @@ class DBTable:
             self._tableorg_ += "ROW"
         elif tableorg == "C":
             self._tableorg_ += "COLUMN"
+        self._tableorg_ = compact(self._tableorg_)
 
         self._columns_ = []
         self._indexes_ = []
         self._constraints_ = []
 
         self._table_comment_ = table_comment
-
+        self._stats_ = None
 
     def set_db(self, db):
         self._db_ = db
@@ -45,6 +54,21 @@ class DBTable:
     def get_db(self):
         return self._db_
 
+    def set_stats(self, stats):
+        self._stats_ = stats
+
+    def get_stats(self):
+        """Catalog statistics when the DB was read with stats=True, otherwise None"""
+        return self._stats_
+
+    def __getstate__(self):
+        # the owning DB is not part of a snapshot, set_db() is called again on load
+        return {k: getattr(self, k) for k in self.__slots__ if k != "_db_" and hasattr(self, k)}
+
+    def __setstate__(self, state):
+        for k, v in state.items():
+            setattr(self, k, v)
+
     def add_column(self, col):
         self._columns_.append(col)
 
@@ -54,47 +78,69 @@ class DBTable:
     def add_constraint(self, c):
         self._constraints_.append(c)
 
+    def get_key(self):
+        return self._tabschema_, self._tabname_
+
+    def get_signature(self):
+        # table level options only, columns, indexes and constraints are compared one by one
+        return (self._tbspace_, self._index_tbspace_ or None, self._long_tbspace_ or None, self._compress_,
+                self._tableorg_, self._table_comment_)
+
+    def get_hash(self):
+        # Merkle node: own options plus the hashes of everything that belongs to the table,
+        # indexes and constraints are sorted so that catalog order does not matter
+        return fingerprint(self.get_signature(), [c.get_hash() for c in self._columns_],
+                           sorted(i.get_hash() for i in self._indexes_),
+                           sorted(c.get_hash() for c in self._constraints_))
+
     def get_parents(self):
         return [x._reftabschema_ + "." + x._reftabname_ for x in
                 self._constraints_ if x._constraintype_ == "F"]
 
     def get_children(self):
-        return [x._tabschema_ + "." + x._tabname_ for x in
-                self.get_db()._tables_ if self._tabschema_ + "." + self._tabname_ in x.get_parents()]
+        return [s + "." + t for s, t in self.get_db().get_children(self._tabschema_, self._tabname_)]
 
-    def __str__(self):
+    def render(self, out):
+        """Write the DDL to a text stream, nothing is built up in memory"""
         # if self._type_ == "T":
-        res = "--#SET TERMINATOR @\n\n"
-        res += f"CREATE TABLE {self._tabschema_}.{self._tabname_}"
+        out.write("--#SET TERMINATOR @\n\n")
+        out.write(f"CREATE TABLE {self._tabschema_}.{self._tabname_}")
         # elif self._type_ == "V":
         #    res = f"CREATE VIEW {self._tabschema_}.{self._tabname_}"
         for c in self._columns_:
-            res += "\n" + str(c)
-        res += f"\n) IN {self._tbspace_}"
+            out.write("\n")
+            out.write(str(c))
+        out.write(f"\n) IN {self._tbspace_}")
         if self._index_tbspace_ is not None and  self._index_tbspace_ != "":
-            res += f" INDEX IN {self._index_tbspace_}"
+            out.write(f" INDEX IN {self._index_tbspace_}")
         if self._long_tbspace_ is not None and self._long_tbspace_ != "":
-            res += f" LONG IN {self._long_tbspace_}"
-        res += f"\n{self._compress_}"
-        res += f"\n{self._tableorg_}"
-        res += " @"
+            out.write(f" LONG IN {self._long_tbspace_}")
+        out.write(f"\n{self._compress_}")
+        out.write(f"\n{self._tableorg_}")
+        out.write(" @")
 #        res += "\n"
         for i in self._indexes_:
-            res += "\n" + str(i)
+            out.write("\n")
+            i.render(out)
 
         for c in self._constraints_:
-            res += "\n" + str(c)
+            out.write("\n")
+            c.render(out)
 
         if self._table_comment_ is not None:
-            res += "\n\n" + f"COMMENT ON TABLE {self._tabschema_}.{self._tabname_} IS '{self._table_comment_}' @"
+            out.write("\n\n" + f"COMMENT ON TABLE {self._tabschema_}.{self._tabname_} IS '{self._table_comment_}' @")
 
-        res += "\n"
+        out.write("\n")
         for c in self._columns_:
             if c._column_comment_ is not None:
-                res += "\n" + f"COMMENT ON COLUMN {self._tabschema_}.{self._tabname_}.{c._colname_} IS '{c._column_comment_}' @"
+                out.write("\n" + f"COMMENT ON COLUMN {self._tabschema_}.{self._tabname_}.{c._colname_} IS '{c._column_comment_}' @")
+
+        out.write("\n\n")
 
-        res += "\n\n"
-        return res
+    def __str__(self):
+        out = io.StringIO()
+        self.render(out)
+        return out.getvalue()
 
 
 if __name__ == "__main__":
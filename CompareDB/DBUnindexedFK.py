@@ -0,0 +1,64 @@
+#!/usr/bin/python3
+
+import sys
+
+from DBRedundantIndex import _names_
+
+# index types whose key is made of columns of the table, of the ones DB reads
+COLUMN_INDEX_TYPES = ("REG", "CLUS")
+
+# longest index name Db2 accepts
+MAX_NAME = 128
+
+
+class DBUnindexedFK:
+    """Foreign keys whose columns do not lead any index on the child table.
+
+    A DELETE or an update of the key on the parent has to find the child rows, without an index
+    that starts with the foreign key columns, in any order, that is a scan of the child table for
+    every parent row, under locks that easily escalate. Foreign keys that are NOT ENFORCED are not
+    checked and are left out. The child tables with the most rows come first.
+    """
+
+    def __init__(self, db):
+        self._findings_ = []
+        for t in db.get_all_tables():
+            leading = [_names_(i._columns_) for i in t._indexes_ if i._indextype_ in COLUMN_INDEX_TYPES]
+            for c in t._constraints_:
+                if c._constraintype_ != "F" or c._enforced_ == "NOT ENFORCED":
+                    continue
+                n = len(c._cols_)
+                if not any(len(cols) >= n and set(cols[:n]) == set(c._cols_) for cols in leading):
+                    self._findings_.append((t, c))
+        self._findings_.sort(key=lambda x: (-self.get_card(x[0]), x[0].get_key(), x[1]._constname_))
+
+    def get_card(self, t):
+        """CARD of a table, -1 when there are no statistics"""
+        card = (t.get_stats() or {}).get("card")
+        return -1 if card is None else card
+
+    def get_findings(self):
+        """(child table, foreign key), largest child tables first"""
+        return self._findings_
+
+    def get_index_name(self, c):
+        return f"IX_{c._constname_}"[:MAX_NAME]
+
+    def report(self, out=sys.stdout):
+        print(f"{len(self._findings_)} foreign keys without an index", file=out)
+        for t, c in self._findings_:
+            card = self.get_card(t)
+            print(f"\n{t._tabschema_}.{t._tabname_}.{c._constname_} ({', '.join(c._cols_)})", file=out)
+            print(f"    references {c._reftabschema_}.{c._reftabname_} ({', '.join(c._refcols_)})"
+                  f" ON DELETE {c._deleterule_}", file=out)
+            print(f"    {'?' if card < 0 else card} child rows scanned per parent row deleted", file=out)
+
+    def script(self, out=sys.stdout):
+        out.write("--#SET TERMINATOR @\n")
+        for t, c in self._findings_:
+            card = self.get_card(t)
+            out.write(f"\n-- {c._constname_} references {c._reftabschema_}.{c._reftabname_}"
+                      f", {'?' if card < 0 else card} rows")
+            out.write(f"\nCREATE INDEX {t._tabschema_}.{self.get_index_name(c)} ON {t._tabschema_}.{t._tabname_}")
+            out.write(f"\n    ({', '.join(c._cols_)})")
+            out.write("\nCOLLECT STATISTICS @\n")
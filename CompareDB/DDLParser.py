@@ -0,0 +1,605 @@
+#!/usr/bin/python3
+
+import os
+import sys
+import pickle
+import hashlib
+import argparse
+
+from DBTable import *
+from DBHash import *
+
+PARSE_CACHE_VERSION = 1
+
+TYPE_SYNONYMS = {"CHAR": "CHARACTER", "INT": "INTEGER", "DEC": "DECIMAL", "NUMERIC": "DECIMAL", "NUM": "DECIMAL"}
+
+DELETE_RULES = {"NO ACTION": "A", "CASCADE": "C", "SET NULL": "N", "RESTRICT": "R"}
+UPDATE_RULES = {"NO ACTION": "A", "RESTRICT": "R"}
+
+
+class DDLParseError(ValueError):
+    pass
+
+
+def split_statements(text):
+    """Statements of a DDL file, honours --#SET TERMINATOR and skips comments"""
+    terminator = ";"
+    res = []
+    buf = []
+    quote = None
+    i = 0
+    n = len(text)
+    while i < n:
+        ch = text[i]
+        if quote is not None:
+            # a doubled quote closes and reopens, which keeps the state right
+            buf.append(ch)
+            if ch == quote:
+                quote = None
+        elif ch in "'\"":
+            quote = ch
+            buf.append(ch)
+        elif text.startswith("--", i):
+            end = text.find("\n", i)
+            if end < 0:
+                end = n
+            line = text[i:end].split()
+            if len(line) == 3 and line[0].upper() == "--#SET" and line[1].upper() == "TERMINATOR":
+                terminator = line[2]
+            i = end
+            continue
+        elif text.startswith(terminator, i):
+            res.append("".join(buf))
+            buf = []
+            i += len(terminator)
+            continue
+        else:
+            buf.append(ch)
+        i += 1
+
+    res.append("".join(buf))
+    return [x.strip() for x in res if x.strip() != ""]
+
+
+def unquote(tok):
+    if tok.startswith("'"):
+        return tok[1:-1].replace("''", "'")
+    if tok.startswith('"'):
+        return tok[1:-1].replace('""', '"')
+    return tok.upper()
+
+
+class DDLTokens:
+    def __init__(self, text):
+        self._text_ = text
+        self._spans_ = [m.span() for m in SQL_TOKEN.finditer(text)]
+        self._tokens_ = [text[a:b] for a, b in self._spans_]
+        self._pos_ = 0
+
+    def source(self, start, end):
+        """Original text of the tokens start..end-1, expressions keep their layout this way"""
+        if start >= end:
+            return ""
+        return self._text_[self._spans_[start][0]:self._spans_[end - 1][1]]
+
+    def at_end(self):
+        return self._pos_ >= len(self._tokens_)
+
+    def peek(self):
+        if self.at_end():
+            return None
+        return self._tokens_[self._pos_]
+
+    def next(self):
+        if self.at_end():
+            raise DDLParseError("unexpected end of statement")
+        tok = self._tokens_[self._pos_]
+        self._pos_ += 1
+        return tok
+
+    def accept(self, *words):
+        upto = self._pos_ + len(words)
+        if [x.upper() for x in self._tokens_[self._pos_:upto]] == list(words):
+            self._pos_ = upto
+            return True
+        return False
+
+    def expect(self, *words):
+        if not self.accept(*words):
+            raise DDLParseError(f"expected {' '.join(words)} but found {self.peek()}")
+
+    def ident(self):
+        return unquote(self.next())
+
+    def integer(self):
+        tok = self.next()
+        if not tok.isdigit():
+            raise DDLParseError(f"expected a number but found {tok}")
+        return int(tok)
+
+    def rule(self, rules, clause):
+        """Catalog code of the ON DELETE or ON UPDATE rule that follows"""
+        rule = " ".join(self.until("ON", "ENFORCED", "NOT", "ENABLE", "DISABLE")).upper()
+        try:
+            return rules[rule]
+        except KeyError:
+            raise DDLParseError(f"unsupported {clause} rule {rule}")
+
+    def qualified(self, nparts):
+        parts = []
+        tok = self.next()
+        while True:
+            if tok.startswith('"'):
+                parts.append(unquote(tok))
+                more = self.peek() is not None and self.peek().startswith(".")
+            else:
+                parts.extend(x.upper() for x in tok.split(".") if x != "")
+                more = tok.endswith(".")
+            if not more:
+                break
+            tok = self.next()
+            if tok == ".":
+                tok = self.next()
+
+        if len(parts) != nparts:
+            raise DDLParseError(f"expected a name with {nparts} parts, found {'.'.join(parts)}")
+        return parts
+
+    def group(self):
+        """Tokens between a pair of parentheses, nested parentheses included"""
+        self.expect("(")
+        res = []
+        depth = 0
+        while True:
+            tok = self.next()
+            if tok == "(":
+                depth += 1
+            elif tok == ")":
+                if depth == 0:
+                    return res
+                depth -= 1
+            res.append(tok)
+
+    def split_group(self):
+        """Source text of each comma separated item in a parenthesized list"""
+        self.expect("(")
+        res = []
+        start = self._pos_
+        depth = 0
+        while True:
+            tok = self.next()
+            if tok == "(":
+                depth += 1
+            elif tok == ")" and depth > 0:
+                depth -= 1
+            elif tok in (",", ")") and depth == 0:
+                res.append(self.source(start, self._pos_ - 1))
+                start = self._pos_
+                if tok == ")":
+                    return [x for x in res if x != ""]
+
+    def group_source(self):
+        start = self._pos_
+        self.group()
+        return self.source(start + 1, self._pos_ - 1)
+
+    def rest_source(self):
+        start = self._pos_
+        self._pos_ = len(self._tokens_)
+        return self.source(start, self._pos_)
+
+    def until(self, *words):
+        res = []
+        while not self.at_end() and self.peek().upper() not in words:
+            res.append(self.next())
+        return res
+
+    def until_source(self, *words):
+        start = self._pos_
+        self.until(*words)
+        return self.source(start, self._pos_)
+
+
+def size(tok):
+    tok = tok.upper()
+    factor = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}.get(tok[-1:], 1)
+    if factor > 1:
+        tok = tok[:-1]
+    if not tok.isdigit():
+        raise DDLParseError(f"expected a length but found {tok}")
+    return int(tok) * factor
+
+
+class DDLParser:
+    """Builds DBTable objects from DDL in the layout that DBTable renders.
+
+    The catalog codes that the model classes take are derived from the DDL clauses, so a parsed
+    table has the same signature as the table read from the catalog. Clauses that DBTable never
+    renders are treated as absent, e.g. a missing ALLOW REVERSE SCANS means reverse scans are off.
+    """
+
+    def __init__(self):
+        self._tables_ = dict()
+
+    def parse(self, text):
+        self._tables_ = dict()
+        for stmt in split_statements(text):
+            ts = DDLTokens(stmt)
+            if ts.accept("CREATE", "TABLE"):
+                self._create_table_(ts)
+            elif ts.accept("CREATE", "UNIQUE", "INDEX"):
+                self._create_index_(ts, "U")
+            elif ts.accept("CREATE", "INDEX"):
+                self._create_index_(ts, "D")
+            elif ts.accept("ALTER", "TABLE"):
+                self._alter_table_(ts)
+            elif ts.accept("COMMENT", "ON"):
+                self._comment_(ts)
+            else:
+                raise DDLParseError(f"unsupported statement: {stmt[:40]}")
+
+        self._primary_key_indexes_()
+        return list(self._tables_.values())
+
+    def _get_table_(self, tabschema, tabname):
+        try:
+            return self._tables_[tabschema, tabname]
+        except KeyError:
+            raise DDLParseError(f"{tabschema}.{tabname} is not created in this file")
+
+    def _create_table_(self, ts):
+        tabschema, tabname = ts.qualified(2)
+        cols = ts.split_group()
+
+        tbspace = index_tbspace = long_tbspace = rowcompmode = None
+        compression = "N"
+        tableorg = "R"
+        while not ts.at_end():
+            if ts.accept("INDEX", "IN"):
+                index_tbspace = ts.ident()
+            elif ts.accept("LONG", "IN"):
+                long_tbspace = ts.ident()
+            elif ts.accept("IN"):
+                tbspace = ts.ident()
+            elif ts.accept("COMPRESS", "YES"):
+                compression = "R"
+                rowcompmode = "S" if ts.accept("STATIC") else "A"
+                ts.accept("ADAPTIVE")
+            elif ts.accept("COMPRESS", "NO"):
+                compression = "N"
+            elif ts.accept("ORGANIZE", "BY", "ROW"):
+                tableorg = "R"
+            elif ts.accept("ORGANIZE", "BY", "COLUMN"):
+                tableorg = "C"
+            else:
+                raise DDLParseError(f"unexpected {ts.peek()} in CREATE TABLE {tabschema}.{tabname}")
+
+        t = DBTable(tabschema, tabname, tbspace, index_tbspace, long_tbspace, None, compression, rowcompmode,
+                    tableorg, None)
+        for colno, text in enumerate(cols):
+            t.add_column(self._column_(colno, DDLTokens(text)))
+        self._tables_[tabschema, tabname] = t
+
+    def _column_(self, colno, ts):
+        colname = ts.ident()
+        typename = ts.next().upper()
+        typename = TYPE_SYNONYMS.get(typename, typename)
+
+        length = scale = None
+        if ts.peek() == "(":
+            args = [x for x in ts.group() if x != ","]
+            if not args:
+                raise DDLParseError(f"no length in column {colname}")
+            length = size(args[0])
+            if len(args) > 1 and args[1].isdigit():
+                scale = int(args[1])
+        if typename == "CHARACTER" and length is None:
+            length = 1
+        if typename == "DECIMAL":
+            length = 5 if length is None else length
+            scale = 0 if scale is None else scale
+
+        nulls = "Y"
+        bit_data = ""
+        default = text = None
+        identity = "N"
+        generated = ""
+        inline_length = 0
+        while not ts.at_end():
+            if ts.accept("FOR", "BIT", "DATA"):
+                bit_data = " FOR BIT DATA"
+            elif ts.accept("NOT", "NULL"):
+                nulls = "N"
+            elif ts.accept("DEFAULT"):
+                default = ts.until_source("NOT", "GENERATED", "INLINE")
+            elif ts.accept("INLINE", "LENGTH"):
+                inline_length = ts.integer()
+            elif ts.accept("GENERATED"):
+                if ts.accept("ALWAYS"):
+                    generated = "A"
+                else:
+                    ts.expect("BY", "DEFAULT")
+                    generated = "D"
+                if ts.accept("AS", "IDENTITY"):
+                    identity = "Y"
+                    if ts.peek() == "(":
+                        ts.group()
+                else:
+                    text = ts.rest_source()
+            else:
+                raise DDLParseError(f"unexpected {ts.peek()} in column {colname}")
+
+        return DBColumn(colno, colname, typename, length, scale, nulls, bit_data, identity, generated, text,
+                        default, None, inline_length)
+
+    def _create_index_(self, ts, uniquerule):
+        indschema, indname = ts.qualified(2)
+        ts.expect("ON")
+        t = self._get_table_(*ts.qualified(2))
+
+        cols = []
+        for text in ts.split_group():
+            col = DDLTokens(text)
+            name = col.ident()
+            cols.append(name + " DESC" if col.accept("DESC") else name)
+
+        include = []
+        indextype = "REG"
+        reverse_scans = pagesplit = "N"
+        collectstatistcs = None
+        compression = "N"
+        nullkeys = "Y"
+        typemodel = datatype = length = pattern = None
+        while not ts.at_end():
+            if ts.accept("INCLUDE", "NULL", "KEYS"):
+                nullkeys = "Y"
+            elif ts.accept("EXCLUDE", "NULL", "KEYS"):
+                nullkeys = "N"
+            elif ts.accept("INCLUDE"):
+                include = [unquote(x) for x in ts.group() if x != ","]
+            elif ts.accept("GENERATE", "KEY", "USING", "XMLPATTERN"):
+                indextype = "XVIL"
+                pattern = unquote(ts.next())
+                ts.expect("AS", "SQL")
+                datatype = ts.next().upper()
+                if ts.peek() == "(":
+                    args = ts.group()
+                    if not args:
+                        raise DDLParseError(f"no length in index {indname}")
+                    length = size(args[0])
+                if ts.accept("REJECT", "INVALID", "VALUES"):
+                    typemodel = "R"
+                elif ts.accept("IGNORE", "INVALID", "VALUES"):
+                    typemodel = "Q"
+            elif ts.accept("COMPRESS", "YES"):
+                compression = "Y"
+            elif ts.accept("COMPRESS", "NO"):
+                compression = "N"
+            elif ts.accept("CLUSTER"):
+                indextype = "CLUS"
+            elif ts.accept("ALLOW", "REVERSE", "SCANS"):
+                reverse_scans = "Y"
+            elif ts.accept("DISALLOW", "REVERSE", "SCANS"):
+                reverse_scans = "N"
+            elif ts.accept("COLLECT", "SAMPLED", "DETAILED", "STATISTICS"):
+                collectstatistcs = "S"
+            elif ts.accept("COLLECT", "DETAILED", "STATISTICS"):
+                collectstatistcs = "D"
+            elif ts.accept("COLLECT", "STATISTICS"):
+                collectstatistcs = "Y"
+            elif ts.accept("PCTFREE") or ts.accept("MINPCTUSED"):
+                ts.next()
+            else:
+                raise DDLParseError(f"unexpected {ts.peek()} in CREATE INDEX {indschema}.{indname}")
+
+        i = DBIndex(t._tabschema_, t._tabname_, indschema, indname, uniquerule, indextype, reverse_scans,
+                    pagesplit, collectstatistcs, "Y", compression, None, nullkeys, typemodel, datatype, None,
+                    length, None, pattern)
+        for c in cols:
+            i.add_column(c)
+        for c in include:
+            i.add_include(c)
+        t.add_index(i)
+
+    def _alter_table_(self, ts):
+        t = self._get_table_(*ts.qualified(2))
+        ts.expect("ADD", "CONSTRAINT")
+        constname = ts.ident()
+
+        refschema = reftable = None
+        refcols = []
+        text = None
+        if ts.accept("PRIMARY", "KEY"):
+            kind = "P"
+            cols = [unquote(x) for x in ts.group() if x != ","]
+        elif ts.accept("UNIQUE"):
+            kind = "U"
+            cols = [unquote(x) for x in ts.group() if x != ","]
+        elif ts.accept("FOREIGN", "KEY"):
+            kind = "F"
+            cols = [unquote(x) for x in ts.group() if x != ","]
+            ts.expect("REFERENCES")
+            refschema, reftable = ts.qualified(2)
+            if ts.peek() == "(":
+                refcols = [unquote(x) for x in ts.group() if x != ","]
+        elif ts.accept("CHECK"):
+            kind = "K"
+            text = ts.group_source()
+        else:
+            raise DDLParseError(f"unsupported constraint {constname}")
+
+        deleterule = updaterule = "A"
+        enforced = enablequeryopt = "Y"
+        while not ts.at_end():
+            if ts.accept("ON", "DELETE"):
+                deleterule = ts.rule(DELETE_RULES, "ON DELETE")
+            elif ts.accept("ON", "UPDATE"):
+                updaterule = ts.rule(UPDATE_RULES, "ON UPDATE")
+            elif ts.accept("NOT", "ENFORCED"):
+                enforced = "N"
+                ts.accept("TRUSTED") or ts.accept("NOT", "TRUSTED")
+            elif ts.accept("ENFORCED"):
+                enforced = "Y"
+            elif ts.accept("ENABLE", "QUERY", "OPTIMIZATION"):
+                enablequeryopt = "Y"
+            elif ts.accept("DISABLE", "QUERY", "OPTIMIZATION"):
+                enablequeryopt = "N"
+            else:
+                raise DDLParseError(f"unexpected {ts.peek()} in constraint {constname}")
+
+        if kind == "F":
+            c = DBForeignKey(t._tabschema_, t._tabname_, constname, None, refschema, reftable, deleterule,
+                             updaterule, enforced, enablequeryopt, kind, None)
+            for col in cols:
+                c.add_column(col)
+            for col in refcols:
+                c.add_refcolumn(col)
+        elif kind == "K":
+            c = DBCheck(t._tabschema_, t._tabname_, constname, text, enforced, enablequeryopt, kind, None)
+        else:
+            c = DBCandidateKey(t._tabschema_, t._tabname_, constname, kind, enforced, enablequeryopt, None)
+            for col in cols:
+                c.add_column(col)
+        t.add_constraint(c)
+
+    def _comment_(self, ts):
+        if ts.accept("TABLE"):
+            t = self._get_table_(*ts.qualified(2))
+            ts.expect("IS")
+            t._table_comment_ = unquote(ts.next())
+        elif ts.accept("COLUMN"):
+            tabschema, tabname, colname = ts.qualified(3)
+            ts.expect("IS")
+            comment = unquote(ts.next())
+            for c in self._get_table_(tabschema, tabname)._columns_:
+                if c._colname_ == colname:
+                    c._column_comment_ = comment
+                    break
+            else:
+                raise DDLParseError(f"no column {colname} in {tabschema}.{tabname}")
+        elif ts.accept("INDEX"):
+            key = tuple(ts.qualified(2))
+            ts.expect("IS")
+            comment = unquote(ts.next())
+            for t in self._tables_.values():
+                for i in t._indexes_:
+                    if i.get_key() == key:
+                        i._comment_ = comment
+                        return
+            raise DDLParseError(f"index {'.'.join(key)} is not created in this file")
+        elif ts.accept("CONSTRAINT"):
+            tabschema, tabname, constname = ts.qualified(3)
+            ts.expect("IS")
+            comment = unquote(ts.next())
+            for c in self._get_table_(tabschema, tabname)._constraints_:
+                if c._constname_ == constname:
+                    c._comment_ = comment
+                    break
+            else:
+                raise DDLParseError(f"no constraint {constname} on {tabschema}.{tabname}")
+        else:
+            raise DDLParseError(f"unsupported COMMENT ON {ts.peek()}")
+
+    def _primary_key_indexes_(self):
+        # Db2 turns the unique index that backs a primary key into uniquerule P
+        for t in self._tables_.values():
+            for c in t._constraints_:
+                if c._constraintype_ != "P":
+                    continue
+                for i in t._indexes_:
+                    if i._uniquerule_ == "U" and i._columns_ == c._columns_:
+                        i._uniquerule_ = "P"
+                        break
+
+
+class DDLDirectory:
+    """Tables defined by the .sql files of a directory.
+
+    With a cache file, a file is only parsed again when both its mtime/size and its content
+    hash changed since the previous run. Offers get_all_tables() and get_hashes() like DB,
+    so it can be passed to DBDiff.
+    """
+
+    def __init__(self, path, cachefile=None, names=None):
+        self._tables_ = []
+        self._errors_ = []
+
+        # names restricts the directory to these files, cached entries of the others are kept
+        cache = self._load_cache_(cachefile)
+        if names is None:
+            names = os.listdir(path)
+            newcache = dict()
+        else:
+            newcache = dict(cache)
+        for name in sorted(names):
+            fullname = os.path.join(path, name)
+            if not name.endswith(".sql") or not os.path.isfile(fullname):
+                continue
+
+            st = os.stat(fullname)
+            stat = (st.st_mtime_ns, st.st_size)
+            entry = cache.get(name)
+            if entry is not None and entry[0] == stat:
+                digest, tables, error = entry[1:]
+            else:
+                with open(fullname, "rb") as f:
+                    data = f.read()
+                digest = hashlib.sha256(data).hexdigest()
+                if entry is not None and entry[1] == digest:
+                    tables, error = entry[2:]
+                else:
+                    tables, error = self._parse_(data)
+
+            newcache[name] = (stat, digest, tables, error)
+            if error is not None:
+                self._errors_.append((name, error))
+            else:
+                self._tables_.extend(tables)
+
+        if cachefile is not None:
+            tmp = cachefile + ".tmp"
+            with open(tmp, "wb") as f:
+                pickle.dump((PARSE_CACHE_VERSION, newcache), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, cachefile)
+
+    def _load_cache_(self, cachefile):
+        if cachefile is None:
+            return dict()
+        try:
+            with open(cachefile, "rb") as f:
+                version, cache = pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError, ValueError):
+            return dict()
+        return cache if version == PARSE_CACHE_VERSION else dict()
+
+    def _parse_(self, data):
+        try:
+            return DDLParser().parse(data.decode("utf-8")), None
+        except (DDLParseError, UnicodeDecodeError) as e:
+            return None, str(e)
+
+    def get_all_tables(self):
+        return [x for x in self._tables_]
+
+    def get_errors(self):
+        return self._errors_
+
+    def get_hashes(self):
+        return merkle(self._tables_)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Parse DDL files and print them in canonical form")
+    parser.add_argument("files", nargs="+")
+    ns = parser.parse_args()
+
+    rc = 0
+    for name in ns.files:
+        with open(name) as f:
+            try:
+                for t in DDLParser().parse(f.read()):
+                    t.render(sys.stdout)
+            except DDLParseError as e:
+                print(f"{name}: {e}", file=sys.stderr)
+                rc = -1
+    sys.exit(rc)
@@ -0,0 +1,74 @@
+#!/usr/bin/python3
+
+import sys
+import atexit
+import argparse
+import configparser
+
+import ibm_db
+
+from DB import *
+from DBRedundantIndex import *
+from DBUnindexedFK import *
+from DBCompression import *
+from DBStaleStats import *
+from DBReorg import *
+import DBProfile
+
+# name on the command line, analysis class
+ANALYSES = {
+    "redundant-indexes": DBRedundantIndex,
+    "unindexed-foreign-keys": DBUnindexedFK,
+    "compression": DBCompression,
+    "stale-statistics": DBStaleStats,
+    "reorg": DBReorg,
+}
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(description="Analyze a database from its catalog and statistics")
+    required_args = parser.add_argument_group("Required arguments")
+    required_args.add_argument("analysis", choices=sorted(ANALYSES))
+    required_args.add_argument("-H", "--hostname", required=False, default="localhost")
+    required_args.add_argument("-d", "--dbname", required=True)
+    required_args.add_argument("-P", "--dbport", required=False, default="50000")
+    required_args.add_argument("-u", "--username", required=False)
+    required_args.add_argument("-p", "--password", required=False)
+    required_args.add_argument("-f", "--config", required=False)
+    required_args.add_argument("-s", "--schema", required=False)
+    required_args.add_argument("-t", "--table", required=False, default=None)
+    required_args.add_argument("-o", "--output", required=False,
+                               help="write the statements that act on the findings to this file")
+    required_args.add_argument("--profile", required=False,
+                               help="write query and phase timings as json to this file")
+
+    ns = parser.parse_args()
+
+    if ns.config is not None:
+        config = configparser.ConfigParser()
+        config.read(ns.config)
+        username = config['config']['username']
+        password = config['config']['password']
+    else:
+        username, password = ns.username, ns.password
+
+    if ns.profile is not None:
+        # written on every exit path below
+        atexit.register(DBProfile.enable().dump, ns.profile)
+
+    connstr = f"DATABASE={ns.dbname};HOSTNAME={ns.hostname};PORT={ns.dbport};PROTOCOL=TCPIP;UID={username};PWD={password}"
+    conn = ibm_db.connect(connstr, "", "")
+
+    with DBProfile.phase("extract"):
+        db = DB(ns.hostname, ns.dbname, ns.dbport, username, password, ns.schema, ns.table, conn, stats=True)
+
+    with DBProfile.phase("analyze"):
+        analysis = ANALYSES[ns.analysis](db)
+
+    analysis.report()
+    if ns.output is not None:
+        with open(ns.output, "w") as f:
+            analysis.script(f)
+
+    sys.exit(0)
@@ -0,0 +1,108 @@
+#!/usr/bin/python3
+
+"""Timings of DB construction, DDL rendering and the compare path on synthetic catalogs.
+
+The catalog queries are answered by the fake driver in bench/fakedb, so no database is needed.
+Two catalogs are extracted per size, the second one with drift, and the result is written as
+JSON with sorted keys so that runs can be diffed and tracked over time.
+"""
+
+import os
+import sys
+import time
+import argparse
+import platform
+
+here = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(here, ".."))
+sys.path.insert(0, os.path.join(here, "fakedb"))
+
+import json
+
+import ibm_db
+
+from synthetic import *
+from DB import *
+from DBDiff import *
+
+FORMAT_VERSION = 1
+SIZES = [1000, 10000, 100000]
+
+
+class CountingSink:
+    """Text stream that only counts what is written, rendering is timed without the I/O"""
+
+    def __init__(self):
+        self.chars = 0
+
+    def write(self, s):
+        self.chars += len(s)
+        return len(s)
+
+
+def best(repeat, run):
+    # fastest of repeat runs, and the result of the last one
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def bench(ntables, ns):
+    ibm_db.register("BASE", SyntheticCatalog(ntables, ns.columns, ns.indexes, ns.checks, ns.schemas))
+    ibm_db.register("DRIFT", SyntheticCatalog(ntables, ns.columns, ns.indexes, ns.checks, ns.schemas, drift=True))
+
+    build, db1 = best(ns.repeat, lambda: DB("localhost", "BASE", "50000", "bench", "bench", parallel=ns.parallel))
+    db2 = DB("localhost", "DRIFT", "50000", "bench", "bench", parallel=ns.parallel)
+
+    def render():
+        sink = CountingSink()
+        db1.render(sink)
+        return sink.chars
+
+    rendered, chars = best(ns.repeat, render)
+    compared, diff = best(ns.repeat, lambda: DBDiff(db1, db2))
+
+    return {
+        "tables": ntables,
+        "columns": sum(len(t._columns_) for t in db1.get_all_tables()),
+        "build_s": round(build, 6),
+        "render_s": round(rendered, 6),
+        "render_chars": chars,
+        "compare_s": round(compared, 6),
+        "left_only": len(diff.get_left_only()),
+        "right_only": len(diff.get_right_only()),
+        "changed": len(diff.get_changed()),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="CompareDB benchmark on synthetic catalogs")
+    parser.add_argument("--sizes", type=lambda x: [int(n) for n in x.split(",")], default=SIZES,
+                        help="comma separated table counts")
+    parser.add_argument("-c", "--columns", type=int, default=10, help="columns per table")
+    parser.add_argument("-i", "--indexes", type=int, default=2, help="secondary indexes per table")
+    parser.add_argument("-k", "--checks", type=int, default=1, help="check constraints per table")
+    parser.add_argument("-s", "--schemas", type=int, default=10)
+    parser.add_argument("-r", "--repeat", type=int, default=1, help="report the fastest of this many runs")
+    parser.add_argument("--parallel", action="store_true", help="extract with DB(parallel=True)")
+    parser.add_argument("-o", "--output", help="write the JSON here instead of stdout")
+    ns = parser.parse_args()
+
+    report = {
+        "format": FORMAT_VERSION,
+        "python": platform.python_version(),
+        "parameters": {"columns": ns.columns, "indexes": ns.indexes, "checks": ns.checks,
+                       "schemas": ns.schemas, "repeat": ns.repeat, "parallel": ns.parallel},
+        "results": [bench(n, ns) for n in ns.sizes],
+    }
+
+    if ns.output is None:
+        json.dump(report, sys.stdout, indent=2, sort_keys=True)
+        print()
+    else:
+        with open(ns.output, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
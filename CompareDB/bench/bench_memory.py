@@ -0,0 +1,88 @@
+#!/usr/bin/python3
+
+"""Memory footprint of the CompareDB object model on a synthetic catalog.
+
+Builds tables, columns, indexes and constraints the same way DB does from catalog rows,
+every string is a fresh object as it would be when it comes from the driver.
+"""
+
+import os
+import sys
+import time
+import argparse
+import resource
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from DBTable import *
+from synthetic import TYPES
+
+
+def fresh(s):
+    # a new string object with the same value, like a row from the driver
+    return "".join(list(s))
+
+
+def build(ntables, ncolumns, nschemas):
+    tables = []
+    for n in range(ntables):
+        tabschema = fresh(f"SCHEMA{n % nschemas}")
+        tabname = fresh(f"TABLE{n}")
+        t = DBTable(tabschema, tabname, fresh("TBSP_DATA"), fresh("TBSP_INDEX"), fresh(""), fresh("N"),
+                    fresh("R"), fresh("A"), fresh("R"), None)
+        for colno in range(ncolumns):
+            typename, length, scale = TYPES[colno % len(TYPES)]
+            c = DBColumn(colno, fresh(f"COL{colno}"), fresh(typename), length, scale, fresh("N" if colno == 0 else "Y"),
+                         fresh(""), fresh("N"), fresh(""), None, None, None, 0)
+            t.add_column(c)
+
+        pk = DBIndex(tabschema, tabname, fresh(tabschema), fresh(f"PK_{tabname}"), fresh("P"), fresh("REG"),
+                     fresh("Y"), fresh("I"), fresh("Y"), fresh("N"), fresh("Y"), None, fresh("Y"), None, None, None,
+                     None, None, None)
+        pk.add_column(fresh("COL0"))
+        t.add_index(pk)
+        ix = DBIndex(tabschema, tabname, fresh(tabschema), fresh(f"IX_{tabname}"), fresh("D"), fresh("REG"),
+                     fresh("Y"), fresh("I"), fresh("Y"), fresh("Y"), fresh("Y"), None, fresh("Y"), None, None, None,
+                     None, None, None)
+        ix.add_column(fresh("COL1"))
+        ix.add_include(fresh("COL2"))
+        t.add_index(ix)
+
+        k = DBCandidateKey(tabschema, tabname, fresh(f"PK_{tabname}"), fresh("P"), fresh("Y"), fresh("Y"), None)
+        k.add_column(fresh("COL0"))
+        t.add_constraint(k)
+        if n > 0:
+            f = DBForeignKey(tabschema, tabname, fresh(f"FK_{tabname}"), fresh("PK_TABLE0"), fresh("SCHEMA0"),
+                             fresh("TABLE0"), fresh("A"), fresh("A"), fresh("Y"), fresh("Y"), fresh("F"), None)
+            f.add_column(fresh("COL0"))
+            f.add_refcolumn(fresh("COL0"))
+            t.add_constraint(f)
+        t.add_constraint(DBCheck(tabschema, tabname, fresh(f"CK_{tabname}"), fresh("COL0 > 0"), fresh("Y"),
+                                 fresh("Y"), fresh("K"), None))
+        tables.append(t)
+    return tables
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Memory benchmark for the CompareDB model")
+    parser.add_argument("-c", "--columns", type=int, default=1000000, help="total number of columns")
+    parser.add_argument("-n", "--per-table", type=int, default=20, help="columns per table")
+    parser.add_argument("-s", "--schemas", type=int, default=10)
+    ns = parser.parse_args()
+
+    ntables = ns.columns // ns.per_table
+    tracemalloc.start()
+    start = time.perf_counter()
+    tables = build(ntables, ns.per_table, ns.schemas)
+    elapsed = time.perf_counter() - start
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    ncols = ntables * ns.per_table
+    print(f"tables:          {ntables}")
+    print(f"columns:         {ncols}")
+    print(f"build time:      {elapsed:.2f} s")
+    print(f"model size:      {current / 2**20:.1f} MiB ({current / ncols:.0f} bytes per column)")
+    print(f"peak traced:     {peak / 2**20:.1f} MiB")
+    print(f"peak RSS:        {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.1f} MiB")
@@ -0,0 +1,170 @@
+#!/usr/bin/python3
+
+"""Stand-in for ibm_db that answers the CompareDB catalog queries from a SyntheticCatalog.
+
+Only the calls CompareDB makes are implemented. A catalog is registered per database name,
+the DATABASE= part of the connection string picks it. Queries are recognized by the catalog
+views they read, the parameters are applied as schema, table and (schema, table) filters.
+"""
+
+import re
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from synthetic import *
+
+_catalogs_ = dict()
+
+PAIR = "(cast(? as varchar(128)), cast(? as varchar(128)))"
+
+SQL_ATTR_FET_BUF_SIZE = 3001
+
+
+def register(dbname, catalog):
+    _catalogs_[dbname] = catalog
+
+
+class _Connection:
+    def __init__(self, dbname):
+        self.catalog = _catalogs_.setdefault(dbname, SyntheticCatalog())
+
+
+class _Statement:
+    def __init__(self, conn, sql):
+        self.conn = conn
+        self.sql = sql
+        self.rows = None
+
+
+def connect(connstr, user, password):
+    dbname = re.search(r"DATABASE=([^;]*)", connstr).group(1)
+    return _Connection(dbname)
+
+
+def set_option(resource, options, is_conn):
+    return True
+
+
+def close(conn):
+    return True
+
+
+def prepare(conn, sql):
+    return _Statement(conn, sql)
+
+
+def _kind_(sql):
+    if "sysibmadm.dbcfg" in sql:
+        return "dbcfg"
+    if "from syscat.bufferpools" in sql:
+        return "bufferpools"
+    if "from syscat.tablespaces t" in sql:
+        return "tablespaces"
+    if "select distinct rtrim(tbspace)" in sql:
+        return "used_tablespaces"
+    if "with fp" in sql:
+        return "fingerprint"
+    if "alter_time" in sql:
+        return "stamps"
+    if "mon_get_table" in sql:
+        return "modified"
+    if "colcard" in sql:
+        return "column_stats"
+    if "npages" in sql and "from syscat.tables t" in sql and "syscat.columns" not in sql:
+        return "table_stats"
+    if "nleaf" in sql:
+        return "index_stats"
+    if "nya.get_db_type" in sql:
+        return None
+    if "from syscat.columns c" in sql:
+        return "columns"
+    if "from syscat.indexes i" in sql:
+        return "indexes"
+    if "from syscat.keycoluse k" in sql:
+        return "keys"
+    if "join syscat.references r" in sql:
+        return "foreign_keys"
+    if "from syscat.checks c" in sql:
+        return "checks"
+    raise ValueError("unknown query: " + sql)
+
+
+def _filter_(sql, params, catalog):
+    # schema and table markers come first, then the (schema, table) lists in statement order
+    params = list(params)
+    keys, schemas, tabname = None, None, None
+    if sql.count("?") == 0:
+        return keys, schemas
+    if "with fp" in sql:
+        # the same schema filter in all seven branches of the union
+        return None, set(params[:len(params) // 7])
+    if re.search(r"tabschema = \?", sql):
+        schemas = {params.pop(0)}
+    if re.search(r"tabname = \?", sql):
+        tabname = params.pop(0)
+    for segment in sql.split("in (values ")[1:]:
+        n = segment.split("\n")[0].count(PAIR)
+        pairs = set(zip(params[0:2 * n:2], params[1:2 * n:2]))
+        del params[:2 * n]
+        keys = pairs if keys is None else keys & pairs
+    if tabname is not None:
+        keys = set(k for k in (catalog.get_keys() if keys is None else keys) if k[1] == tabname)
+    return keys, schemas
+
+
+def _select_names_(sql, skip):
+    # column names of the select list, the leading key columns are skipped
+    select = sql[sql.index("select") + len("select"):re.search(r"\n\s*from ", sql).start()]
+    items, depth, item = [], 0, ""
+    for ch in select:
+        depth += ch == "("
+        depth -= ch == ")"
+        if ch == "," and depth == 0:
+            items.append(item)
+            item = ""
+        else:
+            item += ch
+    items.append(item)
+    return [re.findall(r"\w+", x)[-1] for x in items][skip:]
+
+
+def execute(stmt, params=()):
+    sql = stmt.sql.lower()
+    kind = _kind_(sql)
+    if kind is None:
+        stmt.rows = iter([("N",)])
+        return True
+
+    if kind in ("dbcfg", "bufferpools", "tablespaces", "used_tablespaces"):
+        # one set of rows for the whole database
+        stmt.rows = iter(getattr(stmt.conn.catalog, kind)())
+        return True
+
+    keys, schemas = _filter_(stmt.sql, params, stmt.conn.catalog)
+    names = None
+    if kind in ("table_stats", "index_stats"):
+        names = _select_names_(sql, 2 if kind == "table_stats" else 4)
+    rows = stmt.conn.catalog.rows(kind, keys, schemas, names)
+    if kind == "fingerprint" and "group by tabschema, tabname" not in sql:
+        totals = dict()
+        for s, t, count, h in rows:
+            c, x = totals.get(s, (0, 0))
+            totals[s] = (c + count, x + h)
+        rows = ((s, c, x) for s, (c, x) in sorted(totals.items()))
+    stmt.rows = iter(rows)
+    return True
+
+
+def fetch_tuple(stmt):
+    return next(stmt.rows, False)
+
+
+def free_result(stmt):
+    stmt.rows = None
+    return True
+
+
+def free_stmt(stmt):
+    return True
@@ -0,0 +1,166 @@
+#!/usr/bin/python3
+
+"""Synthetic SYSCAT result sets for benchmarking CompareDB without a database.
+
+Rows have the layout of the DB catalog queries and come in their ORDER BY order, names are
+zero padded so that string order and generation order agree. A catalog with drift changes a
+fixed subset of the tables, so two catalogs compare with a known number of differences.
+"""
+
+import zlib
+
+TYPES = [("INTEGER", 4, 0), ("VARCHAR", 100, 0), ("DECIMAL", 15, 2), ("TIMESTAMP", 10, 6), ("CHARACTER", 1, 0)]
+
+# every DRIFT_EVERY:th table differs in a catalog with drift
+DRIFT_EVERY = 97
+
+
+class SyntheticCatalog:
+    def __init__(self, tables=1000, columns=10, indexes=2, checks=1, schemas=10, drift=False):
+        self._ntables_ = tables
+        self._ncolumns_ = columns
+        self._nindexes_ = indexes
+        self._nchecks_ = checks
+        self._nschemas_ = schemas
+        self._drift_ = drift
+
+        # tables in (schema, name) order, n is the position in generation order
+        width = len(str(max(tables - 1, 0)))
+        swidth = len(str(max(schemas - 1, 0)))
+        keys = [(f"SCHEMA{n % schemas:0{swidth}}", f"TABLE{n:0{width}}") for n in range(tables)]
+        self._keys_ = sorted(keys)
+        self._first_ = dict()
+        for s, t in self._keys_:
+            self._first_.setdefault(s, t)
+
+    def get_keys(self):
+        return self._keys_
+
+    def _drifted_(self, n):
+        return self._drift_ and n % DRIFT_EVERY == DRIFT_EVERY - 1
+
+    def _ncols_(self, n):
+        return self._ncolumns_ + (1 if self._drifted_(n) else 0)
+
+    def _nidx_(self, n):
+        return max(self._nindexes_ - (1 if self._drifted_(n) else 0), 0)
+
+    def columns(self, n, s, t):
+        for colno in range(self._ncols_(n)):
+            typename, length, scale = TYPES[colno % len(TYPES)]
+            yield (s, t, f"COL{colno}", colno, typename, length, scale, "N" if colno == 0 else "Y", "", "N", "",
+                   None, "TBSP_DATA", "TBSP_INDEX", None, "N", None, "N", None, "R", None,
+                   f"column {colno}" if colno == 1 else None, 0)
+
+    def indexes(self, n, s, t):
+        yield (s, t, s, f"PK_{t}", "P", "REG", "Y", "I", "Y", "N", "Y", "COL0", "A", 1, None, "Y",
+               None, None, None, None, None, None)
+        for i in range(self._nidx_(n)):
+            col = 1 + i % max(self._ncolumns_ - 1, 1)
+            yield (s, t, s, f"IX_{t}_{i}", "D", "REG", "Y", "I", "Y", "Y", "Y", f"COL{col}", "A", 1, None, "Y",
+                   None, None, None, None, None, None)
+            yield (s, t, s, f"IX_{t}_{i}", "D", "REG", "Y", "I", "Y", "Y", "Y", "COL0", "I", 2, None, "Y",
+                   None, None, None, None, None, None)
+
+    def keys(self, n, s, t):
+        yield (s, t, f"PK_{t}", "COL0", "P", "Y", "Y", 1, None)
+
+    def foreign_keys(self, n, s, t):
+        # every table but the first of its schema references the first table of the schema
+        first = self._first_[s]
+        if first != t:
+            yield (s, t, f"FK_{t}", f"PK_{first}", s, first, "A", "A", "COL0", "COL0", "Y", "Y", 1, "F", None)
+
+    def checks(self, n, s, t):
+        for i in range(self._nchecks_):
+            yield (s, t, f"CK_{t}_{i}", "C", f"COL0 > {i}", "Y", "Y", "K", None)
+
+    def stamps(self, n, s, t):
+        nfks = 0 if self._first_[s] == t else 1
+        yield (s, t, "2024-01-01-00.00.00.000000", None, 1 + self._nidx_(n), 1 + nfks + self._nchecks_)
+
+    def fingerprint(self, n, s, t):
+        # crc of everything the table contributes, stands in for the server side hash sums
+        h = 0
+        count = 0
+        for kind in (self.columns, self.indexes, self.keys, self.foreign_keys, self.checks):
+            for row in kind(n, s, t):
+                h += zlib.crc32(repr(row).encode())
+                count += 1
+        yield (s, t, count, h)
+
+    def _stat_(self, name, n, i=0):
+        # deterministic statistics that vary from table to table
+        card = 1000 * (n % 50 + 1)
+        npages = card // 40 + 1
+        values = {
+            "card": card,
+            "npages": npages,
+            "fpages": npages + n % 7,
+            "overflow": (n % 13) * 10,
+            "stats_time": None if n % 20 == 0 else "2024-01-01-00.00.00.000000",
+            "stats_days": None if n % 20 == 0 else n % 90,
+            "profile": n % 2,
+            "nleaf": card // 200 + 1 + i,
+            "nlevels": 2 + n % 3,
+            "lastused": "0001-01-01" if (n + i) % 5 == 0 else "2024-06-01",
+            "pagesize": 8192,
+            "pctpagessaved": 0,
+            "avgrowsize": 180,
+            "fullkeycard": card // (1 + i),
+            "avgleafkeysize": 4 + 4 * i,
+            "avgnleafkeysize": 4 + 4 * i,
+            "num_empty_leafs": (n % 11) * i,
+            "numrids_deleted": (n % 9) * 20,
+            "pctfree": 10,
+            "clusterratio": -1 if i % 2 else 100 - n % 40,
+            "clusterfactor": (100 - n % 30) / 100 if i % 2 else -1,
+        }
+        return values.get(name)
+
+    def modified(self, n, s, t):
+        yield (s, t, self._stat_("card", n) * (n % 17) // 40)
+
+    def column_stats(self, n, s, t):
+        card = self._stat_("card", n)
+        for colno in range(self._ncols_(n)):
+            yield (s, t, f"COL{colno}", card // (colno + 1), 1 if colno < 2 else 0)
+
+    def table_stats(self, n, s, t, names=()):
+        yield (s, t) + tuple(self._stat_(x, n) for x in names)
+
+    def index_stats(self, n, s, t, names=()):
+        yield (s, f"PK_{t}", s, t) + tuple(self._stat_(x, n) for x in names)
+        for i in range(self._nidx_(n)):
+            yield (s, f"IX_{t}_{i}", s, t) + tuple(self._stat_(x, n, i + 1) for x in names)
+
+    def dbcfg(self):
+        # with drift the sort heap is tuned by hand
+        yield ("sortheap", "4096" if self._drift_ else "256", None if self._drift_ else "AUTOMATIC")
+        yield ("locklist", "8192", "AUTOMATIC")
+        yield ("logpath", f"/db2/log/{id(self)}/", None)
+
+    def bufferpools(self):
+        yield ("IBMDEFAULTBP", -2, 4096, 0, 0)
+        yield ("BP8K", 50000 if self._drift_ else 100000, 8192, 0, 0)
+
+    def tablespaces(self):
+        yield ("TBSP_DATA", "D", "L", 8192, 32, -1, "BP8K", 6.725, 0.32)
+        yield ("TBSP_INDEX", "D", "L", 8192, 32 if self._drift_ else 16, -1, "BP8K", 6.725, 0.32)
+
+    def used_tablespaces(self):
+        yield ("TBSP_DATA", "TBSP_INDEX", None)
+
+    def rows(self, kind, keys=None, schemas=None, names=None):
+        """Rows of one query kind in catalog order, for all tables or the given (schema, name) keys"""
+        generate = getattr(self, kind)
+        wanted = None if keys is None else set(keys)
+        for s, t in self._keys_:
+            if wanted is not None and (s, t) not in wanted:
+                continue
+            if schemas is not None and s not in schemas:
+                continue
+            if names is None:
+                yield from generate(int(t[len("TABLE"):]), s, t)
+            else:
+                yield from generate(int(t[len("TABLE"):]), s, t, names)
@@ -1,31 +1,96 @@
 #!/usr/bin/python3
 
 import sys
-import os
-import tempfile
-from filecmp import dircmp
+import atexit
 import argparse
-import difflib
 import configparser
+from concurrent.futures import ThreadPoolExecutor
 
 import ibm_db
 
 from DB import *
+from DBDiff import *
+from DBFingerprint import *
+from DBAlter import *
+from DBStatsDiff import *
+from DBConfig import *
+import DBProfile
+
+# databases extracted and compared at the same time in fleet mode
+FLEET_JOBS = 4
+
+
+def fleet(config):
+    """Baseline and the other databases of the [fleet] section, each as (name, hostname, port).
+
+    [fleet]
+    baseline = PROD
+    databases = CUST1, CUST2
+
+    A section named after a database may set hostname and port for that database.
+    """
+    def member(name):
+        section = config[name] if config.has_section(name) else {}
+        return (name, section.get("hostname"), section.get("port"))
+
+    databases = [x.strip() for x in config["fleet"]["databases"].split(",") if x.strip() != ""]
+    return member(config["fleet"]["baseline"]), [member(x) for x in databases]
+
 
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Compare databases")
     required_args = parser.add_argument_group("Required arguments")
     required_args.add_argument("-H", "--hostname", required=False, default="localhost")
-    required_args.add_argument("--db1", required=True)
-    required_args.add_argument("--db2", required=True)
+    required_args.add_argument("--db1", required=False)
+    required_args.add_argument("--db2", required=False)
     required_args.add_argument("-P", "--dbport", required=False, default="50000")
     required_args.add_argument("-u", "--username", required=False)
     required_args.add_argument("-p", "--password", required=False)
     required_args.add_argument("-f", "--config", required=False)
     required_args.add_argument("-s", "--schema", required=True)
+    required_args.add_argument("-c", "--concurrent", required=False, action="store_true",
+                               help="extract both databases in parallel")
+    required_args.add_argument("--parallel", required=False, action="store_true",
+                               help="run the catalog queries of each database concurrently")
+    required_args.add_argument("--rss", required=False, action="store_true",
+                               help="report peak RSS on stderr")
+    required_args.add_argument("--cachedir", required=False,
+                               help="keep catalog snapshots here and only re-read tables that changed")
+    required_args.add_argument("--fleet", required=False, action="store_true",
+                               help="compare the databases of the [fleet] section in the config file against its baseline")
+    required_args.add_argument("-j", "--jobs", required=False, type=int, default=FLEET_JOBS,
+                               help="databases extracted at the same time in fleet mode")
+    required_args.add_argument("-g", "--gate", required=False, action="store_true",
+                               help="compare catalog hashes computed by the servers first and only extract tables that differ")
+    required_args.add_argument("--alter", required=False,
+                               help="write the ALTER statements that make db2 look like db1 to this file")
+    required_args.add_argument("--profile", required=False,
+                               help="write query and phase timings as json to this file")
+    required_args.add_argument("-a", "--fetchbuffer", required=False, type=int,
+                               help="bytes the driver fetches per block, the batch size of the catalog reads")
+    required_args.add_argument("--stats", required=False, action="store_true",
+                               help="also compare the statistics of the tables and indexes both databases have")
+    required_args.add_argument("--dbcfg", required=False, action="store_true",
+                               help="also compare the database configuration, bufferpools and table spaces")
+    required_args.add_argument("--threshold", required=False, type=float, default=STATS_THRESHOLD,
+                               help="ratio between two statistics above which --stats reports them")
 
     ns = parser.parse_args()
+    if ns.fleet and ns.config is None:
+        parser.error("--fleet needs the databases from -f/--config")
+    if not ns.fleet and (ns.db1 is None or ns.db2 is None):
+        parser.error("--db1 and --db2 are required")
+    if ns.stats and (ns.fleet or ns.gate):
+        parser.error("--stats compares every table, it cannot be combined with --fleet or --gate")
+    if ns.fleet:
+        for option, given in (("--gate", ns.gate), ("--alter", ns.alter is not None), ("--dbcfg", ns.dbcfg)):
+            if given:
+                parser.error(f"{option} works on two databases, it cannot be combined with --fleet")
+
+    if ns.profile is not None:
+        # written on every exit path below
+        atexit.register(DBProfile.enable().dump, ns.profile)
 
     if ns.config is not None:
         config = configparser.ConfigParser()
@@ -35,53 +100,96 @@ if __name__ == "__main__":
     else:
         username, password = ns.username, ns.password
 
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        connstr1 = f"DATABASE={ns.db1};HOSTNAME={ns.hostname};PORT=50000;PROTOCOL=TCPIP;UID={username}; PWD={password}"
-        connstr2 = f"DATABASE={ns.db2};HOSTNAME={ns.hostname};PORT=50000;PROTOCOL=TCPIP;UID={username}; PWD={password}"
-        conn1 = ibm_db.connect(connstr1, "", "")
-        conn2 = ibm_db.connect(connstr2, "", "")
-
-        db1 = DB(ns.hostname, ns.db1, ns.dbport, username, password, ns.schema, None)
-        p1 = tmpdirname + "/" + ns.db1
-        os.mkdir(p1)
-        for t in db1.get_all_tables():
-            with open(p1 + "/" + t._tabschema_ + "." + t._tabname_ + ".sql", "w") as f:
-                f.write(str(t))
-
-        db2 = DB(ns.hostname, ns.db2, ns.dbport, username, password, ns.schema, None)
-        p2 = tmpdirname + "/" + ns.db2
-        os.mkdir(p2)
-        for t in db2.get_all_tables():
-            with open(p2 + "/" + t._tabschema_ + "." + t._tabname_ + ".sql", "w") as f:
-                f.write(str(t))
-
-        dcmp = dircmp(p1, p2)
-        rc = 0
-        print()
-        if len(dcmp.left_only) > 0:
-            rc = -1
-            print(f"Only in {p1}:")
-            for l in dcmp.left_only:
-                print(l)
-       
-        print()
-        if len(dcmp.right_only) > 0:
+    if ns.fleet:
+        def extract(name, hostname, port):
+            hostname, port = hostname or ns.hostname, port or ns.dbport
+            connstr = f"DATABASE={name};HOSTNAME={hostname};PORT={port};PROTOCOL=TCPIP;UID={username};PWD={password}"
+            conn = ibm_db.connect(connstr, "", "")
+            try:
+                return DB(hostname, name, port, username, password, ns.schema, None, conn, ns.parallel,
+                          ns.cachedir, fetchbuffer=ns.fetchbuffer)
+            finally:
+                forget(conn)
+                ibm_db.close(conn)
+
+        def compare(baseline, member):
+            # only the differences are kept, the model of the database is released right away
+            try:
+                return DBDiff(baseline.result(), extract(*member)).get_drift()
+            except Exception as e:
+                print(f"{member[0]}: {e}", file=sys.stderr)
+                return None
+
+        base, members = fleet(config)
+        # the baseline is extracted once, alongside the first databases of the fleet
+        with DBProfile.phase("fleet"), ThreadPoolExecutor(max_workers=1) as baseexecutor, \
+                ThreadPoolExecutor(max_workers=ns.jobs) as executor:
+            baseline = baseexecutor.submit(extract, *base)
+            futures = [(m[0], executor.submit(compare, baseline, m)) for m in members]
+            drifts = {name: f.result() for name, f in futures}
+
+        if ns.rss:
+            print(f"peak RSS after extraction: {peak_rss()} kB", file=sys.stderr)
+
+        with DBProfile.phase("report"):
+            drift_matrix(base[0], drifts)
+        rc = 0 if all(d == [] for d in drifts.values()) else -1
+        sys.exit(rc)
+
+    connstr1 = f"DATABASE={ns.db1};HOSTNAME={ns.hostname};PORT={ns.dbport};PROTOCOL=TCPIP;UID={username};PWD={password}"
+    connstr2 = f"DATABASE={ns.db2};HOSTNAME={ns.hostname};PORT={ns.dbport};PROTOCOL=TCPIP;UID={username};PWD={password}"
+    conn1 = ibm_db.connect(connstr1, "", "")
+    conn2 = ibm_db.connect(connstr2, "", "")
+
+    tables = None
+    if ns.gate:
+        # a few rows per schema, and per table in schemas that differ, instead of the whole catalog
+        with DBProfile.phase("gate"):
+            tables = changed_tables(DBFingerprint(conn1, ns.schema), DBFingerprint(conn2, ns.schema))
+        if len(tables) > MAX_TABLE_LIST:
+            # too many to list in one statement, the schema is read as a whole
+            tables = None
+
+    if ns.concurrent:
+        # the catalog reads are network bound, so overlap them on two threads
+        with DBProfile.phase("extract"), ThreadPoolExecutor(max_workers=2) as executor:
+            f1 = executor.submit(DB, ns.hostname, ns.db1, ns.dbport, username, password, ns.schema, None,
+                                 conn1, ns.parallel, ns.cachedir, tables, ns.stats, ns.fetchbuffer)
+            f2 = executor.submit(DB, ns.hostname, ns.db2, ns.dbport, username, password, ns.schema, None,
+                                 conn2, ns.parallel, ns.cachedir, tables, ns.stats, ns.fetchbuffer)
+            db1, db2 = f1.result(), f2.result()
+    else:
+        with DBProfile.phase("extract db1"):
+            db1 = DB(ns.hostname, ns.db1, ns.dbport, username, password, ns.schema, None, conn1, ns.parallel,
+                     ns.cachedir, tables, ns.stats, ns.fetchbuffer)
+        with DBProfile.phase("extract db2"):
+            db2 = DB(ns.hostname, ns.db2, ns.dbport, username, password, ns.schema, None, conn2, ns.parallel,
+                     ns.cachedir, tables, ns.stats, ns.fetchbuffer)
+
+    if ns.rss:
+        print(f"peak RSS after extraction: {peak_rss()} kB", file=sys.stderr)
+
+    with DBProfile.phase("diff"):
+        diff = DBDiff(db1, db2)
+    with DBProfile.phase("report"):
+        diff.report(ns.db1, ns.db2)
+    if ns.alter is not None:
+        with open(ns.alter, "w") as f:
+            DBAlter(db1, db2, diff).render(f)
+    rc = 0 if diff.is_identical() else -1
+
+    if ns.dbcfg:
+        with DBProfile.phase("dbcfg"):
+            cfgdiff = DBConfigDiff(DBConfig(conn1, ns.schema), DBConfig(conn2, ns.schema))
+            cfgdiff.report(ns.db1, ns.db2)
+        if not cfgdiff.is_identical():
             rc = -1
-            print(f"Only in {p2}:")
-            for r in dcmp.right_only:
-                print(r)
 
-        print()
-        for d in dcmp.diff_files:
+    if ns.stats:
+        with DBProfile.phase("stats"):
+            stats = DBStatsDiff(db1, db2, ns.threshold)
+            stats.report(ns.db1, ns.db2)
+        if not stats.is_identical():
             rc = -1
-            with open(dcmp.left+'/'+d) as f1:
-                f1con = f1.readlines()
-            
-            with open(dcmp.right+'/'+d) as f2:
-                f2con = f2.readlines()
-
-            print(f"Difference in {d}:")
-            for line in difflib.unified_diff(f1con, f2con, f"{ns.db1}", f"{ns.db2}"):
-                print(f"{line.rstrip()}")
 
     sys.exit(rc)
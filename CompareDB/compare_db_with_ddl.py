@@ -1,15 +1,20 @@
 #!/usr/bin/python3
 
 import sys
-import tempfile
-from filecmp import dircmp
+import os
+import atexit
 import argparse
 import difflib
+import subprocess
 import configparser
 
 import ibm_db
 
 from DB import *
+from DBDiff import *
+from DDLParser import *
+from DBAlter import *
+import DBProfile
 
 products = { 
         "N": "nya/src/main/resources/db/table/",
@@ -17,6 +22,31 @@ products = {
         "I": "idp/src/main/resources/db/table/",
         }
 
+
+def changed_files(basedir, product_path, revrange):
+    """Returns the names of the ddl files added or modified, and deleted, in a git revision range"""
+    changed, deleted = [], []
+    out = subprocess.run(["git", "-C", basedir, "diff", "--name-status", "--no-renames", revrange,
+                          "--", product_path],
+                         check=True, capture_output=True, text=True).stdout
+    for line in out.splitlines():
+        status, path = line.split("\t", 1)
+        dirname, name = os.path.split(path)
+        if dirname != product_path.rstrip("/") or not name.endswith(".sql"):
+            continue
+        if status == "D":
+            deleted.append(name)
+        else:
+            changed.append(name)
+    return changed, deleted
+
+
+def table_key(name):
+    # SCHEMA.TABLE.sql
+    tabschema, tabname = name[:-len(".sql")].split(".", 1)
+    return (tabschema, tabname)
+
+
 if __name__ == "__main__":
 
     parser = argparse.ArgumentParser(description="Verify ddl")
@@ -28,9 +58,23 @@ if __name__ == "__main__":
     required_args.add_argument("-p", "--password", required=False)
     required_args.add_argument("-f", "--config", required=False)
     required_args.add_argument("-b", "--basedir", required=True)
+    required_args.add_argument("-e", "--exact", required=False, action="store_true",
+                               help="compare the files byte by byte instead of parsing them")
+    required_args.add_argument("-C", "--parsecache", required=False,
+                               help="cache file for parsed DDL, only edited files are parsed again")
+    required_args.add_argument("-g", "--git-range", required=False,
+                               help="only verify the files changed in this revision range of basedir, e.g. main..HEAD")
+    required_args.add_argument("--alter", required=False,
+                               help="write the ALTER statements that make the database look like the files to this file")
+    required_args.add_argument("--profile", required=False,
+                               help="write query and phase timings as json to this file")
 
     ns = parser.parse_args()
 
+    if ns.profile is not None:
+        # written on every exit path below
+        atexit.register(DBProfile.enable().dump, ns.profile)
+
     if ns.config is not None:
         config = configparser.ConfigParser()
         config.read(ns.config)
@@ -39,49 +83,84 @@ if __name__ == "__main__":
     else:
         username, password = ns.username, ns.password
 
-    with tempfile.TemporaryDirectory() as tmpdirname:
-        schema = None
-
-        # determine databasetype
-        connstr = f"DATABASE={ns.dbname};HOSTNAME={ns.hostname};PORT=50000;PROTOCOL=TCPIP;UID={username}; PWD={password}"
-        conn = ibm_db.connect(connstr, "", "")
-        s1 = ibm_db.prepare(conn, "values nya.get_db_type()")
-        ibm_db.execute(s1, ())
-        product_path = products[ibm_db.fetch_tuple(s1)[0]]
-
-
-        db = DB(ns.hostname, ns.dbname, ns.dbport, username, password, schema, None)
-        for t in db.get_all_tables():
-            with open(tmpdirname + "/" + t._tabschema_ + "." + t._tabname_ + ".sql", "w") as f:
-                f.write(str(t))
-
-        dcmp = dircmp(ns.basedir + product_path, tmpdirname)
+    schema = None
+
+    # determine databasetype
+    connstr = f"DATABASE={ns.dbname};HOSTNAME={ns.hostname};PORT={ns.dbport};PROTOCOL=TCPIP;UID={username};PWD={password}"
+    conn = ibm_db.connect(connstr, "", "")
+    s1 = ibm_db.prepare(conn, "values nya.get_db_type()")
+    ibm_db.execute(s1, ())
+    product_path = products[ibm_db.fetch_tuple(s1)[0]]
+    ddldir = ns.basedir + product_path
+
+    names, tables = None, None
+    if ns.git_range is not None:
+        # deleted files are extracted as well, the table should be gone from the database
+        with DBProfile.phase("git"):
+            changed, deleted = changed_files(ns.basedir, product_path, ns.git_range)
+        # more tables than fit in one statement are verified as a whole, as without a range
+        if len(changed) + len(deleted) <= MAX_TABLE_LIST:
+            names = changed
+            tables = [table_key(x) for x in changed + deleted]
+
+    with DBProfile.phase("extract"):
+        db = DB(ns.hostname, ns.dbname, ns.dbport, username, password, schema, None, conn, tables=tables)
+
+    if not ns.exact:
+        # parse the repository files into the model and compare semantically
+        with DBProfile.phase("parse"):
+            repo = DDLDirectory(ddldir, ns.parsecache, names)
         rc = 0
-        print()
-        if len(dcmp.left_only) > 0:
+        for name, error in repo.get_errors():
             rc = -1
-            print(f"Only in {product_path}:")
-            for l in dcmp.left_only:
-                print(l)
-       
-        print()
-        if len(dcmp.right_only) > 0:
+            print(f"Cannot parse {name}: {error}")
+
+        with DBProfile.phase("diff"):
+            diff = DBDiff(repo, db)
+        with DBProfile.phase("report"):
+            diff.report(product_path, f"{ns.dbname}@{ns.hostname}")
+        if ns.alter is not None:
+            with open(ns.alter, "w") as f:
+                DBAlter(repo, db, diff).render(f)
+        if not diff.is_identical():
             rc = -1
-            print(f"Only in {ns.dbname}@{ns.hostname}:")
-            for r in dcmp.right_only:
-                print(r)
+        sys.exit(rc)
+
+    # render in memory and compare against the repository files, no temporary copy on disk
+    rendered = {t._tabschema_ + "." + t._tabname_ + ".sql": t for t in db.get_all_tables()}
+    files = set(x for x in (os.listdir(ddldir) if names is None else names)
+                if os.path.isfile(os.path.join(ddldir, x)))
+
+    rc = 0
+    print()
+    left_only = sorted(files - rendered.keys())
+    if len(left_only) > 0:
+        rc = -1
+        print(f"Only in {product_path}:")
+        for l in left_only:
+            print(l)
+
+    print()
+    right_only = sorted(rendered.keys() - files)
+    if len(right_only) > 0:
+        rc = -1
+        print(f"Only in {ns.dbname}@{ns.hostname}:")
+        for r in right_only:
+            print(r)
+
+    print()
+    with DBProfile.phase("render and diff"):
+        for d in sorted(files & rendered.keys()):
+            with open(os.path.join(ddldir, d), newline="") as f1:
+                f1con = f1.read()
+            f2con = str(rendered[d])
+            if f1con == f2con:
+                continue
 
-        print()
-        for d in dcmp.diff_files:
             rc = -1
-            with open(dcmp.left+'/'+d) as f1:
-                f1con = f1.readlines()
-            
-            with open(dcmp.right+'/'+d) as f2:
-                f2con = f2.readlines()
-
             print(f"Difference in {d}:")
-            for line in difflib.unified_diff(f1con, f2con, f"{product_path}", f"{ns.dbname}@{ns.hostname}"):
+            for line in difflib.unified_diff(f1con.splitlines(True), f2con.splitlines(True),
+                                             f"{product_path}", f"{ns.dbname}@{ns.hostname}"):
                 print(f"{line.rstrip()}")
 
     sys.exit(rc)
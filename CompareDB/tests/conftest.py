@@ -0,0 +1,179 @@
+#!/usr/bin/python3
+
+"""Fixtures that extract databases from synthetic catalogs through the fake ibm_db of bench/fakedb"""
+
+import os
+import sys
+import runpy
+import atexit
+import itertools
+
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path[:0] = [os.path.join(HERE, ".."), os.path.join(HERE, "..", "bench", "fakedb"),
+                os.path.join(HERE, "..", "bench")]
+
+import ibm_db
+
+from synthetic import *
+from DB import *
+
+SCHEMA = "SCHEMA0"
+
+# index attributes in the order of the synthetic index rows, after the schema and index names
+INDEX_ATTRIBUTES = ("uniquerule", "indextype", "reverse_scans", "pagesplit", "collectstatistcs", "user_defined",
+                    "compression")
+INDEX_DEFAULTS = ("D", "REG", "Y", "I", "Y", "Y", "Y")
+
+TABLE_ATTRIBUTES = {"compression": 17, "rowcompmode": 18}
+
+KEY_ATTRIBUTES = {"enforced": 5, "enablequeryopt": 6}
+
+_databases_ = itertools.count()
+
+FAILING = "failing"
+
+
+class CraftedCatalog(SyntheticCatalog):
+    """A small synthetic catalog in one schema with hand picked objects and statistics.
+
+    indexes {table: [(name, columns, include, {attribute: value}), ...]} and foreign_keys
+    {table: [(name, column, parent table), ...]} are added to what the catalog generates,
+    columns {table: [(name, typename, length, scale, nulls, default), ...]} are added after the
+    generated columns. attributes {index, key or table: {attribute: value}} change generated objects,
+    stats {table or index: {statistic: value}} replace generated statistics, modified and the
+    alter_time of the catalog stamp included.
+    """
+
+    def __init__(self, tables=3, indexes=None, foreign_keys=None, columns=None, attributes=None, stats=None,
+                 **kwargs):
+        super().__init__(tables=tables, schemas=1, **kwargs)
+        self._extra_indexes_ = indexes or dict()
+        self._extra_foreign_keys_ = foreign_keys or dict()
+        self._extra_columns_ = columns or dict()
+        self._attributes_ = attributes or dict()
+        self._stats_ = stats or dict()
+
+    def columns(self, n, s, t):
+        row = None
+        for row in super().columns(n, s, t):
+            yield self._table_row_(t, row)
+        for colno, (colname, typename, length, scale, nulls, default) in \
+                enumerate(self._extra_columns_.get(t, []), row[3] + 1):
+            yield self._table_row_(t, row[:2] + (colname, colno, typename, length, scale, nulls) + row[8:16] +
+                                   (default,) + row[17:21] + (None, 0))
+
+    def _table_row_(self, t, row):
+        row = list(row)
+        for name, value in self._attributes_.get(t, dict()).items():
+            row[TABLE_ATTRIBUTES[name]] = value
+        return tuple(row)
+
+    def indexes(self, n, s, t):
+        for row in super().indexes(n, s, t):
+            attributes = self._attributes_.get(row[3], dict())
+            yield row[:4] + tuple(attributes.get(x, v) for x, v in zip(INDEX_ATTRIBUTES, row[4:11])) + row[11:]
+        for name, columns, include, attributes in self._extra_indexes_.get(t, []):
+            values = tuple(attributes.get(x, v) for x, v in zip(INDEX_ATTRIBUTES, INDEX_DEFAULTS))
+            parts = [(c[:-len(" DESC")], "D") if c.endswith(" DESC") else (c, "A") for c in columns]
+            parts += [(c, "I") for c in include]
+            for colseq, (colname, colorder) in enumerate(parts, 1):
+                yield (s, t, s, name) + values + (colname, colorder, colseq, None, "Y") + (None,) * 6
+
+    def keys(self, n, s, t):
+        for row in super().keys(n, s, t):
+            row = list(row)
+            for name, value in self._attributes_.get(row[2], dict()).items():
+                if name in KEY_ATTRIBUTES:
+                    row[KEY_ATTRIBUTES[name]] = value
+            yield tuple(row)
+
+    def foreign_keys(self, n, s, t):
+        yield from super().foreign_keys(n, s, t)
+        for name, column, parent in self._extra_foreign_keys_.get(t, []):
+            yield (s, t, name, f"PK_{parent}", s, parent, "A", "A", column, "COL0", "Y", "Y", 1, "F", None)
+
+    def table_stats(self, n, s, t, names=()):
+        for row in super().table_stats(n, s, t, names):
+            yield row[:2] + self._override_(t, names, row[2:])
+
+    def index_stats(self, n, s, t, names=()):
+        for row in super().index_stats(n, s, t, names):
+            yield row[:4] + self._override_(row[1], names, row[4:])
+        for name, columns, include, attributes in self._extra_indexes_.get(t, []):
+            yield (s, name, s, t) + self._override_(name, names, tuple(self._stat_(x, n, 1) for x in names))
+
+    def stamps(self, n, s, t):
+        for row in super().stamps(n, s, t):
+            yield row[:2] + self._override_(t, ("alter_time",), row[2:3]) + row[3:]
+
+    def modified(self, n, s, t):
+        for row in super().modified(n, s, t):
+            yield row[:2] + self._override_(t, ("modified",), row[2:])
+
+    def _override_(self, name, names, values):
+        stats = self._stats_.get(name, dict())
+        return tuple(stats.get(x, v) for x, v in zip(names, values))
+
+
+def _register_(catalog):
+    # every catalog is registered under a database name of its own
+    dbname = f"TEST{next(_databases_)}"
+    ibm_db.register(dbname, catalog)
+    return dbname
+
+
+@pytest.fixture
+def extract():
+    """Extracts a catalog as a DB"""
+    def extract(catalog, **kwargs):
+        return DB("localhost", _register_(catalog), "50000", "user", "password", **kwargs)
+    return extract
+
+
+@pytest.fixture
+def connect():
+    """Opens a connection to a catalog"""
+    def connect(catalog):
+        return ibm_db.connect(f"DATABASE={_register_(catalog)};HOSTNAME=localhost;PORT=50000;PROTOCOL=TCPIP;"
+                              f"UID=user;PWD=password", "", "")
+    return connect
+
+
+class FailingCatalog(CraftedCatalog):
+    """A catalog whose columns cannot be read"""
+
+    def columns(self, n, s, t):
+        raise RuntimeError(f"{FAILING} {s}.{t}")
+
+
+@pytest.fixture
+def register():
+    """Registers a catalog and returns its database name"""
+    return _register_
+
+
+@pytest.fixture
+def run(monkeypatch):
+    """Runs one of the scripts with the given arguments and returns its exit code"""
+    def run(script, *args):
+        monkeypatch.setattr(sys, "argv", [script] + [str(x) for x in args])
+        # the reports default to the sys.stdout of the time they are imported, the modules of the
+        # script are imported again so that they write to the output of this test
+        top = os.path.dirname(HERE)
+        for name, module in list(sys.modules.items()):
+            if os.path.dirname(os.path.abspath(getattr(module, "__file__", None) or "/")) == top:
+                monkeypatch.delitem(sys.modules, name)
+        # what the script leaves for the exit of the interpreter is run when it ends
+        exits = []
+        monkeypatch.setattr(atexit, "register", lambda f, *args: exits.append((f, args)))
+        try:
+            runpy.run_path(os.path.join(HERE, "..", script), run_name="__main__")
+        except SystemExit as e:
+            return e.code
+        finally:
+            for f, args in reversed(exits):
+                f(*args)
+        return 0
+    return run
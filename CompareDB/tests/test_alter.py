@@ -0,0 +1,89 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBAlter import *
+
+
+def alter(extract, left, right):
+    return DBAlter(extract(left), extract(right)).get_statements()
+
+
+def test_identical(extract):
+    assert alter(extract, CraftedCatalog(), CraftedCatalog()) == []
+
+
+def test_primary_key_compression(extract):
+    statements = alter(extract, CraftedCatalog(), CraftedCatalog(attributes={"PK_TABLE0": {"compression": "N"}}))
+    assert [step for step, statement in statements] == [ALTER_TABLE]
+    assert statements[0][1].startswith("ALTER INDEX SCHEMA0.PK_TABLE0 COMPRESS YES @")
+
+
+def test_primary_key_index(extract):
+    statements = alter(extract, CraftedCatalog(), CraftedCatalog(attributes={"PK_TABLE0": {"reverse_scans": "N"}}))
+    assert [step for step, statement in statements] == [DROP_CONSTRAINT, CREATE_INDEX, ADD_KEY, ADD_FOREIGN_KEY,
+                                                        ADD_FOREIGN_KEY]
+    assert statements[0][1] == "ALTER TABLE SCHEMA0.TABLE0 DROP CONSTRAINT PK_TABLE0 @"
+    assert statements[1][1].startswith("CREATE UNIQUE INDEX SCHEMA0.PK_TABLE0 ON SCHEMA0.TABLE0")
+    assert "ALLOW REVERSE SCANS" in statements[1][1]
+    assert statements[2][1].startswith("ALTER TABLE SCHEMA0.TABLE0 ADD CONSTRAINT PK_TABLE0\n    PRIMARY KEY (COL0)")
+    # the foreign keys that referenced the dropped key
+    assert "ALTER TABLE SCHEMA0.TABLE1 ADD CONSTRAINT FK_TABLE1" in statements[3][1]
+    assert "ALTER TABLE SCHEMA0.TABLE2 ADD CONSTRAINT FK_TABLE2" in statements[4][1]
+
+
+def test_primary_key_index_created_before_the_key(extract):
+    left = CraftedCatalog(attributes={"PK_TABLE0": {"user_defined": "Y"}})
+    right = CraftedCatalog(attributes={"PK_TABLE0": {"user_defined": "Y", "reverse_scans": "N"}})
+    statements = alter(extract, left, right)
+    assert (DROP_INDEX, "DROP INDEX SCHEMA0.PK_TABLE0 @") in statements
+
+
+def test_primary_key_enforcement(extract):
+    statements = alter(extract, CraftedCatalog(), CraftedCatalog(attributes={"PK_TABLE0": {"enforced": "N"}}))
+    assert [step for step, statement in statements] == [DROP_CONSTRAINT, ADD_KEY, ADD_FOREIGN_KEY, ADD_FOREIGN_KEY]
+    assert statements[0][1] == "ALTER TABLE SCHEMA0.TABLE0 DROP CONSTRAINT PK_TABLE0 @"
+    assert "PRIMARY KEY (COL0)\nENFORCED" in statements[1][1]
+    # dropping the key dropped the foreign keys that reference it
+    assert "ALTER TABLE SCHEMA0.TABLE1 ADD CONSTRAINT FK_TABLE1" in statements[2][1]
+    assert "ALTER TABLE SCHEMA0.TABLE2 ADD CONSTRAINT FK_TABLE2" in statements[3][1]
+
+
+def test_foreign_key_added_once(extract):
+    # FK_TABLE1_X is dropped and added by the alter of its own table as well
+    left = CraftedCatalog(attributes={"PK_TABLE0": {"reverse_scans": "N"}},
+                          foreign_keys={"TABLE1": [("FK_TABLE1_X", "COL2", "TABLE0")]})
+    right = CraftedCatalog(foreign_keys={"TABLE1": [("FK_TABLE1_X", "COL1", "TABLE0")]})
+    statements = alter(extract, left, right)
+    assert (DROP_FOREIGN_KEY, "ALTER TABLE SCHEMA0.TABLE1 DROP CONSTRAINT FK_TABLE1_X @") in statements
+    assert len([s for step, s in statements if "ADD CONSTRAINT FK_TABLE1_X\n" in s]) == 1
+    assert len([s for step, s in statements if "ADD CONSTRAINT FK_TABLE1\n" in s]) == 1
+
+
+def test_index(extract):
+    left = CraftedCatalog(indexes={"TABLE1": [("IX_TABLE1", ["COL3"], [], {})]})
+    right = CraftedCatalog(indexes={"TABLE1": [("IX_TABLE1", ["COL3"], [], {"reverse_scans": "N"})]})
+    statements = alter(extract, left, right)
+    assert [step for step, statement in statements] == [DROP_INDEX, CREATE_INDEX]
+    assert statements[0][1] == "DROP INDEX SCHEMA0.IX_TABLE1 @"
+
+
+def test_add_not_null_column(extract):
+    left = CraftedCatalog(columns={"TABLE1": [("STATUS", "CHARACTER", 1, 0, "N", None)]})
+    statements = alter(extract, left, CraftedCatalog())
+    assert statements[0] == (ALTER_TABLE, "ALTER TABLE SCHEMA0.TABLE1 ADD COLUMN STATUS CHARACTER(1) NOT NULL @")
+    assert statements[1][0] == ALTER_TABLE and "SQL0193N" in statements[1][1]
+
+
+def test_add_not_null_column_with_default(extract):
+    left = CraftedCatalog(columns={"TABLE1": [("STATUS", "CHARACTER", 1, 0, "N", "'A'")]})
+    statements = alter(extract, left, CraftedCatalog())
+    assert statements == [(ALTER_TABLE, "ALTER TABLE SCHEMA0.TABLE1 ADD COLUMN STATUS CHARACTER(1) DEFAULT 'A' "
+                                        "NOT NULL @")]
+
+
+def test_drop_column(extract):
+    right = CraftedCatalog(columns={"TABLE1": [("STATUS", "CHARACTER", 1, 0, "Y", None)]})
+    db1, db2 = extract(CraftedCatalog()), extract(right)
+    a = DBAlter(db1, db2)
+    assert (ALTER_TABLE, "ALTER TABLE SCHEMA0.TABLE1 DROP COLUMN STATUS @") in a.get_statements()
+    assert a.get_reorg_pending() == {("SCHEMA0", "TABLE1"): ["DROP COLUMN STATUS"]}
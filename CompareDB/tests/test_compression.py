@@ -0,0 +1,24 @@
+#!/usr/bin/python3
+
+import io
+
+from conftest import *
+from DBCompression import *
+
+
+def test_compression(extract):
+    db = extract(CraftedCatalog(
+        attributes={"TABLE2": {"compression": "R", "rowcompmode": "A"},
+                    "PK_TABLE1": {"compression": "N"}, "IX_TABLE2_0": {"compression": "N"}},
+        stats={"TABLE1": {"npages": 5000}, "TABLE2": {"npages": 5000}, "PK_TABLE1": {"nleaf": 2500}}),
+        stats=True)
+    analysis = DBCompression(db)
+    assert [(kind, name, pages, saved) for kind, t, name, pages, saved, size in analysis.get_findings()] == \
+        [(TABLE, "SCHEMA0.TABLE1", 5000, 3000), (INDEX, "SCHEMA0.PK_TABLE1", 2500, 1000)]
+
+    out = io.StringIO()
+    analysis.script(out)
+    assert "ALTER TABLE SCHEMA0.TABLE1 COMPRESS YES ADAPTIVE @" in out.getvalue()
+    assert "ALTER INDEX SCHEMA0.PK_TABLE1 COMPRESS YES @" in out.getvalue()
+    assert "REORG TABLE SCHEMA0.TABLE1 RESETDICTIONARY" in out.getvalue()
+    assert "REORG INDEXES" not in out.getvalue()
@@ -0,0 +1,16 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBConfig import *
+
+
+def test_config_diff(connect):
+    conn1, conn2 = connect(CraftedCatalog()), connect(CraftedCatalog(drift=True))
+    diff = DBConfigDiff(DBConfig(conn1, SCHEMA), DBConfig(conn2, SCHEMA))
+    assert diff.get_differences() == [(HIGH, "DB CFG", "SORTHEAP", "AUTOMATIC", "4096"),
+                                      (HIGH, "BUFFERPOOL", "BP8K NPAGES", 100000, 50000),
+                                      (HIGH, "TABLESPACE", "TBSP_INDEX EXTENTSIZE", 16, 32)]
+
+    # without a schema no table space is known to matter
+    diff = DBConfigDiff(DBConfig(conn1), DBConfig(conn2))
+    assert diff.get_differences()[-1] == (LOW, "TABLESPACE", "TBSP_INDEX EXTENTSIZE", 16, 32)
@@ -0,0 +1,70 @@
+#!/usr/bin/python3
+
+import os
+
+from conftest import *
+from DDLParser import *
+from DBDiff import *
+
+CATALOG = dict(
+    indexes={"TABLE1": [("IX_TABLE1_DESC", ["COL3", "COL4 DESC"], ["COL5"], {"reverse_scans": "N"}),
+                        ("UX_TABLE1", ["COL6"], [], {"uniquerule": "U", "compression": "N"})]},
+    foreign_keys={"TABLE2": [("FK_TABLE2_TABLE1", "COL1", "TABLE1")]},
+    columns={"TABLE0": [("NOTE", "VARCHAR", 200, 0, "Y", "'none'")]},
+    attributes={"TABLE2": {"compression": "R", "rowcompmode": "A"}},
+)
+
+
+def test_dump_parse_compare(extract, tmp_path):
+    db = extract(CraftedCatalog(**CATALOG))
+    assert db.dump(tmp_path) == {"written": 3, "unchanged": 0, "pruned": 0}
+
+    repo = DDLDirectory(str(tmp_path))
+    assert repo.get_errors() == []
+    diff = DBDiff(repo, db)
+    assert diff.is_identical()
+    assert diff.get_left_only() == [] and diff.get_right_only() == [] and diff.get_changed() == []
+
+
+def test_dump_is_stable(extract, tmp_path):
+    db = extract(CraftedCatalog(**CATALOG))
+    db.dump(tmp_path)
+    assert extract(CraftedCatalog(**CATALOG)).dump(tmp_path) == {"written": 0, "unchanged": 3, "pruned": 0}
+
+
+def test_edited_file_differs(extract, tmp_path):
+    db = extract(CraftedCatalog(**CATALOG))
+    db.dump(tmp_path)
+    path = os.path.join(tmp_path, "SCHEMA0.TABLE1.sql")
+    with open(path) as f:
+        text = f.read()
+    with open(path, "w") as f:
+        f.write(text.replace("(COL3, COL4 DESC)", "(COL3, COL4)"))
+
+    diff = DBDiff(DDLDirectory(str(tmp_path)), db)
+    assert not diff.is_identical()
+    assert [d._left_.get_key() for d in diff.get_changed()] == [("SCHEMA0", "TABLE1")]
+
+
+def test_malformed_files_are_reported(extract, tmp_path):
+    db = extract(CraftedCatalog(**CATALOG))
+    db.dump(tmp_path)
+    edits = {"SCHEMA0.TABLE0.sql": ("VARCHAR(200)", "VARCHAR(x)"),
+             "SCHEMA0.TABLE1.sql": ("VARCHAR(100)", "VARCHAR()"),
+             "SCHEMA0.TABLE2.sql": ("ON DELETE NO ACTION", "ON DELETE BOGUS")}
+    for name, (old, new) in edits.items():
+        path = os.path.join(tmp_path, name)
+        with open(path) as f:
+            text = f.read()
+        assert old in text
+        with open(path, "w") as f:
+            f.write(text.replace(old, new, 1))
+    with open(os.path.join(tmp_path, "SCHEMA0.TABLE3.sql"), "w") as f:
+        f.write("CREATE TABLE SCHEMA0.TABLE3 (COL0 INTEGER NOT NULL INLINE LENGTH x);\n")
+    with open(os.path.join(tmp_path, "SCHEMA0.TABLE4.sql"), "w") as f:
+        f.write("CREATE TABLE SCHEMA0.TABLE4 (COL0 INTEGER NOT NULL);\n")
+
+    repo = DDLDirectory(str(tmp_path))
+    assert [name for name, error in repo.get_errors()] == ["SCHEMA0.TABLE0.sql", "SCHEMA0.TABLE1.sql",
+                                                          "SCHEMA0.TABLE2.sql", "SCHEMA0.TABLE3.sql"]
+    assert [t.get_key() for t in repo.get_all_tables()] == [("SCHEMA0", "TABLE4")]
@@ -0,0 +1,46 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBFingerprint import *
+
+
+def _changed_(connect, left, right):
+    return changed_tables(DBFingerprint(connect(left), SCHEMA), DBFingerprint(connect(right), SCHEMA))
+
+
+def test_identical(connect):
+    assert _changed_(connect, CraftedCatalog(), CraftedCatalog()) == []
+
+
+def test_changed_tables(connect):
+    right = CraftedCatalog(indexes={"TABLE1": [("IX_EXTRA", ["COL3"], [], {})]})
+    assert _changed_(connect, CraftedCatalog(), right) == [(SCHEMA, "TABLE1")]
+
+
+def _compare_(run, capsys, db1, db2, *args):
+    rc = run("compare_db.py", "--db1", db1, "--db2", db2, "-s", SCHEMA, *args)
+    return rc, capsys.readouterr().out
+
+
+def test_gate_reports_the_same(register, run, capsys):
+    db1 = register(CraftedCatalog())
+    db2 = register(CraftedCatalog(indexes={"TABLE1": [("IX_EXTRA", ["COL3"], [], {})]},
+                                  columns={"TABLE2": [("NOTE", "VARCHAR", 20, 0, "Y", None)]}))
+    full = _compare_(run, capsys, db1, db2)
+    assert full[0] == -1
+    assert _compare_(run, capsys, db1, db2, "-g") == full
+    assert _compare_(run, capsys, db1, register(CraftedCatalog()), "-g")[0] == 0
+
+
+def test_gate_above_the_table_list_limit(register, run, capsys, monkeypatch):
+    # every table differs, the schema is read without a list of tables
+    tables = MAX_TABLE_LIST + 10
+    right = CraftedCatalog(tables=tables, columns={f"TABLE{n:04}": [("NOTE", "VARCHAR", 20, 0, "Y", None)]
+                                                   for n in range(tables)})
+    statements = []
+    prepare = ibm_db.prepare
+    monkeypatch.setattr(ibm_db, "prepare", lambda conn, sql: statements.append(sql) or prepare(conn, sql))
+    rc, out = _compare_(run, capsys, register(CraftedCatalog(tables=tables)), register(right), "-g")
+    assert rc == -1
+    assert out.count("Difference in") == tables
+    assert not any("in (values" in x for x in statements)
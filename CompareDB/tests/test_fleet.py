@@ -0,0 +1,49 @@
+#!/usr/bin/python3
+
+import pytest
+
+from conftest import *
+
+
+def _config_(path, baseline, databases):
+    path.write_text(f"[config]\nusername = user\npassword = password\n\n"
+                    f"[fleet]\nbaseline = {baseline}\ndatabases = {', '.join(databases)}\n")
+    return path
+
+
+def test_fleet(register, run, tmp_path, capsys):
+    base = register(CraftedCatalog())
+    same = register(CraftedCatalog())
+    drifted = register(CraftedCatalog(indexes={"TABLE1": [("IX_EXTRA", ["COL3"], [], {})]},
+                                      columns={"TABLE2": [("NOTE", "VARCHAR", 20, 0, "Y", None)]}))
+    config = _config_(tmp_path / "fleet.ini", base, [same, drifted])
+
+    assert run("compare_db.py", "--fleet", "-f", config, "-s", SCHEMA, "-j", 2) == -1
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[0].startswith(f"Drift against {base}")
+    assert lines[1].split() == ["object", same, drifted]
+    assert [x.split() for x in lines[2:]] == [["SCHEMA0.TABLE1", "INDEX", "SCHEMA0.IX_EXTRA", ".", "+"],
+                                              ["SCHEMA0.TABLE2", "COLUMN", "NOTE", ".", "+"]]
+
+
+def test_fleet_identical(register, run, tmp_path, capsys):
+    config = _config_(tmp_path / "fleet.ini", register(CraftedCatalog()), [register(CraftedCatalog())])
+    assert run("compare_db.py", "--fleet", "-f", config, "-s", SCHEMA) == 0
+    assert len(capsys.readouterr().out.splitlines()) == 2
+
+
+def test_fleet_not_extracted(register, run, tmp_path, capsys):
+    failing = register(FailingCatalog())
+    config = _config_(tmp_path / "fleet.ini", register(CraftedCatalog()), [register(CraftedCatalog()), failing])
+
+    assert run("compare_db.py", "--fleet", "-f", config, "-s", SCHEMA) == -1
+    captured = capsys.readouterr()
+    assert captured.out.splitlines()[-1].split() == ["(not", "extracted)", "!"]
+    assert f"{failing}: {FAILING}" in captured.err
+
+
+@pytest.mark.parametrize("option", [["--gate"], ["--alter", "alter.sql"], ["--dbcfg"], ["--stats"]])
+def test_fleet_options(run, tmp_path, capsys, option):
+    config = _config_(tmp_path / "fleet.ini", "BASE", ["OTHER"])
+    assert run("compare_db.py", "--fleet", "-f", config, "-s", SCHEMA, *option) == 2
+    assert "cannot be combined with --fleet" in capsys.readouterr().err
@@ -0,0 +1,62 @@
+#!/usr/bin/python3
+
+import subprocess
+
+from conftest import *
+
+PRODUCT_PATH = "nya/src/main/resources/db/table/"
+
+
+def _git_(basedir, *args):
+    subprocess.run(["git", "-C", basedir, "-c", "user.name=test", "-c", "user.email=test@localhost"] + list(args),
+                   check=True, capture_output=True)
+
+
+@pytest.fixture
+def checkout(tmp_path):
+    """A git repository with the DDL of a database committed, returns (basedir, ddl directory)"""
+    def checkout(db):
+        ddldir = tmp_path / PRODUCT_PATH
+        ddldir.mkdir(parents=True)
+        db.dump(ddldir)
+        _git_(tmp_path, "init", "-q")
+        _git_(tmp_path, "add", ".")
+        _git_(tmp_path, "commit", "-q", "-m", "ddl")
+        return f"{tmp_path}/", ddldir
+    return checkout
+
+
+def _verify_(run, monkeypatch, dbname, basedir):
+    statements = []
+    prepare = ibm_db.prepare
+    monkeypatch.setattr(ibm_db, "prepare", lambda conn, sql: statements.append(sql) or prepare(conn, sql))
+    rc = run("compare_db_with_ddl.py", "-d", dbname, "-u", "user", "-p", "password", "-b", basedir,
+             "-g", "HEAD~1..HEAD")
+    return rc, statements
+
+
+def test_changed_files(register, extract, checkout, run, monkeypatch, capsys):
+    catalog = CraftedCatalog()
+    basedir, ddldir = checkout(extract(catalog))
+    path = ddldir / "SCHEMA0.TABLE1.sql"
+    path.write_text(path.read_text().replace("COMPRESS NO", "COMPRESS YES"))
+    _git_(basedir, "commit", "-q", "-a", "-m", "edit")
+
+    rc, statements = _verify_(run, monkeypatch, register(catalog), basedir)
+    out = capsys.readouterr().out
+    assert rc == -1
+    assert "Difference in SCHEMA0.TABLE1:" in out and "TABLE0" not in out and "TABLE2" not in out
+    assert any("in (values" in x for x in statements)
+
+
+def test_long_range(register, extract, checkout, run, monkeypatch, capsys):
+    # every file changes, the whole directory is verified
+    catalog = CraftedCatalog(tables=MAX_TABLE_LIST + 10)
+    basedir, ddldir = checkout(extract(catalog))
+    for path in ddldir.iterdir():
+        path.write_text(f"-- {path.name}\n" + path.read_text())
+    _git_(basedir, "commit", "-q", "-a", "-m", "header")
+
+    rc, statements = _verify_(run, monkeypatch, register(catalog), basedir)
+    assert rc == 0
+    assert not any("in (values" in x for x in statements)
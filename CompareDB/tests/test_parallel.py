@@ -0,0 +1,40 @@
+#!/usr/bin/python3
+
+import DBStatement
+from conftest import *
+from DBDiff import *
+
+CATALOG = dict(
+    tables=12,
+    indexes={"TABLE3": [("IX_TABLE3", ["COL3", "COL4 DESC"], ["COL5"], {"reverse_scans": "N"})]},
+    foreign_keys={"TABLE5": [("FK_TABLE5_TABLE4", "COL1", "TABLE4")]},
+    columns={"TABLE7": [("NOTE", "VARCHAR", 200, 0, "Y", "'none'")]},
+)
+
+
+def test_parallel_read_is_the_serial_read(extract):
+    serial = extract(CraftedCatalog(**CATALOG))
+    parallel = extract(CraftedCatalog(**CATALOG), parallel=True)
+    assert str(parallel) == str(serial)
+    assert parallel.get_hashes() == serial.get_hashes()
+    assert DBDiff(serial, parallel).is_identical()
+
+
+def test_parallel_read_of_one_schema(extract):
+    serial = extract(CraftedCatalog(**CATALOG), schemaname=SCHEMA)
+    parallel = extract(CraftedCatalog(**CATALOG), schemaname=SCHEMA, parallel=True)
+    assert len(serial.get_all_tables()) == 12
+    assert str(parallel) == str(serial)
+
+
+def test_parallel_connections_are_closed(extract, monkeypatch):
+    opened, closed = [], []
+    connect, close = ibm_db.connect, ibm_db.close
+    monkeypatch.setattr(ibm_db, "connect", lambda *args: opened.append(connect(*args)) or opened[-1])
+    monkeypatch.setattr(ibm_db, "close", lambda conn: closed.append(conn) or close(conn))
+
+    extract(CraftedCatalog(**CATALOG), parallel=True)
+    # the connection of the instance and one for each of the other catalog queries
+    assert len(opened) == 5
+    assert sorted(map(id, closed)) == sorted(map(id, opened))
+    assert not any(conn in DBStatement._statements_ for conn in opened)
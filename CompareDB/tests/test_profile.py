@@ -0,0 +1,54 @@
+#!/usr/bin/python3
+
+import json
+import tracemalloc
+
+import DBProfile
+from conftest import *
+
+
+@pytest.fixture
+def profile(run, tmp_path):
+    """Runs compare_db.py with --profile and returns its exit code and the report it wrote"""
+    tracing = tracemalloc.is_tracing()
+
+    def profile(*args):
+        path = tmp_path / "profile.json"
+        rc = run("compare_db.py", "--profile", path, *args)
+        with open(path) as f:
+            return rc, json.load(f)
+    yield profile
+    if not tracing:
+        tracemalloc.stop()
+
+
+def test_view():
+    assert DBProfile.view("select colname from syscat.columns c where c.tabschema = ?") == "syscat.columns"
+    # subqueries of the select list and strings are not the outermost FROM
+    assert DBProfile.view("select (select pagesize from syscat.tablespaces s), 'from x'\n"
+                          "  FROM SYSCAT.INDEXES i") == "syscat.indexes"
+    assert DBProfile.view("with fp as (select tabschema from syscat.columns) select * from fp") == "fp"
+    assert DBProfile.view("values 1") is None
+
+
+def test_profile(register, profile, capsys):
+    db1, db2 = register(CraftedCatalog()), register(CraftedCatalog(attributes={"TABLE1": {"compression": "R"}}))
+    rc, report = profile("--db1", db1, "--db2", db2, "-s", SCHEMA)
+    # written on exit when the databases differ as well
+    assert rc != 0
+    assert report["version"] == DBProfile.REPORT_VERSION
+    assert [x["phase"] for x in report["phases"]] == ["extract db1", "extract db2", "diff", "report"]
+
+    queries = report["queries"]
+    assert {"syscat.columns", "syscat.indexes"} <= set(q["view"] for q in queries)
+    assert set(q["statement"] for q in queries) == set(report["statements"])
+    assert report["totals"]["queries"] == len(queries)
+    assert report["totals"]["rows"] == sum(q["rows"] for q in queries) > 0
+
+
+def test_profile_gate(register, profile, capsys):
+    db1, db2 = register(CraftedCatalog()), register(CraftedCatalog())
+    rc, report = profile("--db1", db1, "--db2", db2, "-s", SCHEMA, "-g")
+    assert rc == 0
+    assert report["phases"][0]["phase"] == "gate"
+    assert "fp" in [q["view"] for q in report["queries"]]
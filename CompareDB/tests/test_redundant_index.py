@@ -0,0 +1,23 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBRedundantIndex import *
+
+
+def test_redundant_indexes(extract):
+    db = extract(CraftedCatalog(indexes={
+        # IX_TABLE1_0 is (COL1) INCLUDE (COL0)
+        "TABLE1": [("IX_TABLE1_A", ["COL1", "COL2"], [], {}),
+                   ("IX_TABLE1_B", ["COL1", "COL2"], ["COL0"], {})],
+        "TABLE2": [("UX_TABLE2", ["COL3"], ["COL4"], {"uniquerule": "U"}),
+                   ("IX_TABLE2_C", ["COL3", "COL4"], [], {})],
+    }), stats=True)
+    findings = {(b._indname_, a._indname_, reason) for t, b, a, reason in DBRedundantIndex(db).get_findings()}
+    assert findings == {("IX_TABLE1_A", "IX_TABLE1_B", DUPLICATE),
+                        ("IX_TABLE1_0", "IX_TABLE1_B", PREFIX),
+                        ("IX_TABLE2_C", "UX_TABLE2", UNIQUE_INCLUDE)}
+
+
+def test_prefix_needs_the_include_columns(extract):
+    db = extract(CraftedCatalog(indexes={"TABLE1": [("IX_TABLE1_A", ["COL1", "COL2"], [], {})]}), stats=True)
+    assert DBRedundantIndex(db).get_findings() == []
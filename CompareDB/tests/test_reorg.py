@@ -0,0 +1,19 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBReorg import *
+
+
+def test_reorg(extract):
+    # TABLE1 has 10% overflow rows, an index of TABLE2 pseudo deleted keys and one empty leaf pages
+    db = extract(CraftedCatalog(
+        attributes={"IX_TABLE1_1": {"indextype": "CLUS"}},
+        stats={"TABLE1": {"fpages": 1000, "npages": 1000, "overflow": 200},
+               "TABLE2": {"card": 40000, "fpages": 1000, "npages": 1000, "overflow": 0},
+               "PK_TABLE2": {"nlevels": 2}, "IX_TABLE2_0": {"nlevels": 2, "numrids_deleted": 20000},
+               "IX_TABLE2_1": {"nlevels": 2}}),
+        stats=True)
+    analysis = DBReorg(db)
+    assert {(t.get_key(), command) for t, command, benefit, ratio in analysis.get_findings()} == \
+        {((SCHEMA, "TABLE1"), "REORG TABLE SCHEMA0.TABLE1 INDEX SCHEMA0.IX_TABLE1_1"),
+         ((SCHEMA, "TABLE2"), "REORG INDEXES ALL FOR TABLE SCHEMA0.TABLE2 ALLOW WRITE ACCESS CLEANUP ALL")}
@@ -0,0 +1,83 @@
+#!/usr/bin/python3
+
+import DB as DBModule
+import DBStatement
+from conftest import *
+
+ALTERED = "2025-06-01-00.00.00.000000"
+
+
+@pytest.fixture
+def queries(monkeypatch):
+    """Catalog views read by each statement executed, with the parameters it was given"""
+    queries = []
+    execute = ibm_db.execute
+
+    def record(stmt, params=()):
+        queries.append((ibm_db._kind_(stmt.sql.lower()), tuple(params)))
+        return execute(stmt, params)
+    monkeypatch.setattr(ibm_db, "execute", record)
+    return queries
+
+
+def cached(dbname, cachedir):
+    # the snapshot is named after the database, every run reads the same registered name
+    return DB("localhost", dbname, "50000", "user", "password", schemaname=SCHEMA, cachedir=str(cachedir))
+
+
+def test_unchanged_catalog_is_not_read(register, tmp_path, queries):
+    dbname = register(CraftedCatalog())
+    first = cached(dbname, tmp_path)
+    assert len(os.listdir(tmp_path)) == 1
+
+    del queries[:]
+    second = cached(dbname, tmp_path)
+    assert [kind for kind, params in queries] == ["stamps"]
+    assert str(second) == str(first)
+
+
+def test_changed_table_is_read_again(register, extract, tmp_path, queries):
+    dbname = register(CraftedCatalog())
+    cached(dbname, tmp_path)
+
+    changed = CraftedCatalog(columns={"TABLE1": [("NOTE", "VARCHAR", 200, 0, "Y", None)]},
+                             stats={"TABLE1": {"alter_time": ALTERED}})
+    ibm_db.register(dbname, changed)
+    del queries[:]
+    db = cached(dbname, tmp_path)
+    assert "columns" in [kind for kind, params in queries]
+    for kind, params in queries:
+        if kind != "stamps":
+            # the schema, then the only changed table padded to a power of two
+            assert params == (SCHEMA, SCHEMA, "TABLE1")
+    assert str(db) == str(extract(changed, schemaname=SCHEMA))
+
+
+def test_dropped_table_disappears(register, tmp_path):
+    dbname = register(CraftedCatalog(tables=3))
+    cached(dbname, tmp_path)
+
+    ibm_db.register(dbname, CraftedCatalog(tables=2))
+    db = cached(dbname, tmp_path)
+    assert [t.get_key() for t in db.get_all_tables()] == [(SCHEMA, "TABLE0"), (SCHEMA, "TABLE1")]
+
+
+def test_many_changed_tables_are_read_in_full(register, tmp_path, queries, monkeypatch):
+    dbname = register(CraftedCatalog())
+    cached(dbname, tmp_path)
+
+    monkeypatch.setattr(DBModule, "SNAPSHOT_MAX_CHANGED", 1)
+    ibm_db.register(dbname, CraftedCatalog(stats={"TABLE1": {"alter_time": ALTERED},
+                                                  "TABLE2": {"alter_time": ALTERED}}))
+    del queries[:]
+    cached(dbname, tmp_path)
+    assert "columns" in [kind for kind, params in queries]
+    assert all(params == (SCHEMA,) for kind, params in queries)
+
+
+def test_connection_is_closed(register, tmp_path, monkeypatch):
+    opened = []
+    connect = ibm_db.connect
+    monkeypatch.setattr(ibm_db, "connect", lambda *args: opened.append(connect(*args)) or opened[-1])
+    cached(register(CraftedCatalog()), tmp_path)
+    assert len(opened) == 1 and opened[0] not in DBStatement._statements_
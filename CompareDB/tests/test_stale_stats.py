@@ -0,0 +1,15 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBStaleStats import *
+
+
+def test_stale_statistics(extract):
+    # TABLE0 has never been collected
+    db = extract(CraftedCatalog(stats={"TABLE1": {"modified": 500},
+                                       "TABLE2": {"modified": None, "stats_days": 45}}), stats=True)
+    findings = DBStaleStats(db).get_findings()
+    assert [(t.get_key(), reason) for t, reason, impact in findings] == \
+        [((SCHEMA, "TABLE0"), NEVER),
+         ((SCHEMA, "TABLE2"), "collected 45 days ago"),
+         ((SCHEMA, "TABLE1"), "500 rows modified, 25% of 2000")]
@@ -0,0 +1,19 @@
+#!/usr/bin/python3
+
+from conftest import *
+
+
+def test_fetch_buffer(extract, monkeypatch):
+    options = []
+    monkeypatch.setattr(ibm_db, "set_option", lambda conn, o, is_conn: options.append((o, is_conn)) or True)
+    db = extract(CraftedCatalog(), fetchbuffer=65536)
+    assert options == [({ibm_db.SQL_ATTR_FET_BUF_SIZE: 65536}, 1)]
+    assert len(db.get_all_tables()) == 3
+
+
+def test_fetch_buffer_unsupported(extract, monkeypatch, capsys):
+    monkeypatch.delattr(ibm_db, "SQL_ATTR_FET_BUF_SIZE")
+    db = extract(CraftedCatalog(), fetchbuffer=65536)
+    assert "fetch buffer size 65536 is not supported" in capsys.readouterr().err
+    assert len(db.get_all_tables()) == 3
+
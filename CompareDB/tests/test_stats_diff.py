@@ -0,0 +1,14 @@
+#!/usr/bin/python3
+
+from conftest import *
+from DBStatsDiff import *
+
+
+def test_stats_diff(extract):
+    db1 = extract(CraftedCatalog(), stats=True)
+    db2 = extract(CraftedCatalog(stats={"TABLE1": {"card": 10000}, "PK_TABLE2": {"nleaf": 100}}), stats=True)
+    findings = DBStatsDiff(db1, db2).get_findings()
+    assert [(key, differences) for key, time1, time2, differences in findings] == \
+        [((SCHEMA, "TABLE1"), [("CARD", 2000, 10000)]),
+         ((SCHEMA, "TABLE2"), [("INDEX SCHEMA0.PK_TABLE2 NLEAF", 16, 100)])]
+    assert DBStatsDiff(db1, db2, threshold=10).is_identical()
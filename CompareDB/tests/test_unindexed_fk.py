@@ -0,0 +1,18 @@
+#!/usr/bin/python3
+
+import io
+
+from conftest import *
+from DBUnindexedFK import *
+
+
+def test_unindexed_foreign_keys(extract):
+    db = extract(CraftedCatalog(foreign_keys={"TABLE1": [("FK_TABLE1_COL1", "COL1", "TABLE0")],
+                                              "TABLE2": [("FK_TABLE2_COL3", "COL3", "TABLE1")]}), stats=True)
+    analysis = DBUnindexedFK(db)
+    assert [(t.get_key(), c._constname_) for t, c in analysis.get_findings()] == \
+        [((SCHEMA, "TABLE2"), "FK_TABLE2_COL3")]
+
+    out = io.StringIO()
+    analysis.script(out)
+    assert "CREATE INDEX SCHEMA0.IX_FK_TABLE2_COL3 ON SCHEMA0.TABLE2\n    (COL3)" in out.getvalue()